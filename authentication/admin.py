@@ -11,14 +11,29 @@ class UserAdmin(BaseUserAdmin):
     form = CustomUserChangeForm
     add_form = CreateUserForm
 
-    list_display = ("email", "first_name", "last_name", "is_staff", "is_superuser")
-    list_filter = ("is_staff", "is_superuser", "groups")
+    list_display = (
+        "email",
+        "first_name",
+        "last_name",
+        "is_active",
+        "is_staff",
+        "is_superuser",
+    )
+    list_filter = ("is_active", "is_staff", "is_superuser", "groups")
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         ("Personal info", {"fields": ("first_name", "last_name", "profile_image")}),
         (
             "Permissions",
-            {"fields": ("is_staff", "is_superuser", "groups", "user_permissions")},
+            {
+                "fields": (
+                    "is_active",
+                    "is_staff",
+                    "is_superuser",
+                    "groups",
+                    "user_permissions",
+                )
+            },
         ),
         ("Important dates", {"fields": ("last_login",)}),
     )
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+from django.http import HttpRequest, HttpResponse
+from ninja import Router, Schema
+
+from authentication.tokens import refresh_tokens, revoke_token
+
+router = Router()
+INVALID_TOKEN = "Invalid or expired token."  # noqa: S105
+
+
+class TokenRefreshIn(Schema):
+    """Schema to exchange a refresh token."""
+
+    refresh_token: str
+
+
+class TokenRevokeIn(Schema):
+    """Schema to revoke a signed access or refresh token."""
+
+    token: str
+
+
+class TokenOut(Schema):
+    """Schema for signed tokens."""
+
+    access_token: str
+    refresh_token: str
+    token_type: str
+    expires_in: int
+
+
+class Message(Schema):
+    """Generic schema for messages."""
+
+    message: str
+
+
+@router.post(
+    "/token/refresh",
+    url_name="token_refresh",
+    auth=None,
+    response={HTTPStatus.OK: TokenOut, HTTPStatus.UNAUTHORIZED: Message},
+)
+def refresh_token(request: HttpRequest, payload: TokenRefreshIn) -> HttpResponse:  # noqa: ARG001
+    """Token refresh API, each refresh token can be used once.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        payload (TokenRefreshIn): Refresh token.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    tokens = refresh_tokens(payload.refresh_token)
+    if tokens is None:
+        return HTTPStatus.UNAUTHORIZED, {"message": INVALID_TOKEN}
+    return HTTPStatus.OK, tokens
+
+
+@router.post(
+    "/token/revoke",
+    url_name="token_revoke",
+    auth=None,
+    response={HTTPStatus.OK: None, HTTPStatus.BAD_REQUEST: Message},
+)
+def revoke(request: HttpRequest, payload: TokenRevokeIn) -> HttpResponse:  # noqa: ARG001
+    """Token revoke API, holding a token is enough to revoke it.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        payload (TokenRevokeIn): Signed access or refresh token.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    if not revoke_token(payload.token):
+        return HTTPStatus.BAD_REQUEST, {"message": INVALID_TOKEN}
+    return HTTPStatus.OK
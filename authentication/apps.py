@@ -1,3 +1,5 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
@@ -6,3 +8,15 @@ class AuthenticationConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "authentication"
+
+    def ready(self: Self) -> None:
+        """Invalidate cached permissions when they change.
+
+        Profile image renditions of deleted users are deleted too.
+        """
+        from authentication.backends import connect_permission_signals
+        from authentication.models import User
+        from common.renditions import delete_renditions_on_delete
+
+        connect_permission_signals()
+        delete_renditions_on_delete(User, "profile_image")
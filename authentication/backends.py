@@ -0,0 +1,160 @@
+from functools import partial
+from typing import Any, Self
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from authentication.models import User
+from main_project.cache import bump_namespace, namespace_versions
+from main_project.settings import PERMISSION_CACHE_TIMEOUT
+
+
+class CachedModelBackend(ModelBackend):
+    """Model backend keeping the resolved permissions of each user in the cache.
+
+    The first permission check of a request reads a single cache key instead
+    of querying user and group permissions. Keys are dropped when the
+    permissions of a user change, and all of them are left behind by bumping
+    the Group namespace when group permissions or permissions themselves
+    change, see ``connect_permission_signals``.
+    """
+
+    def get_all_permissions(
+        self: Self,
+        user_obj: User,
+        obj: models.Model | None = None,
+    ) -> set[str]:
+        """Get the permission names of a user, from the cache when possible.
+
+        Args:
+            user_obj (User): User.
+            obj (models.Model | None, optional): Object permissions are not
+                supported. Defaults to None.
+
+        Returns:
+            set[str]: Permission names as "app_label.codename".
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = permissions_key(user_obj.pk)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
+            user_obj._perm_cache = permissions  # noqa: SLF001
+        return user_obj._perm_cache  # noqa: SLF001
+
+    async def aget_all_permissions(
+        self: Self,
+        user_obj: User,
+        obj: models.Model | None = None,
+    ) -> set[str]:
+        """Async ``get_all_permissions``, also used by ``ahas_perm``.
+
+        Args:
+            user_obj (User): User.
+            obj (models.Model | None, optional): Object permissions are not
+                supported. Defaults to None.
+
+        Returns:
+            set[str]: Permission names as "app_label.codename".
+        """
+        if obj is None and hasattr(user_obj, "_perm_cache"):
+            return user_obj._perm_cache  # noqa: SLF001
+        return await sync_to_async(self.get_all_permissions)(user_obj, obj)
+
+
+def permissions_key(user_pk: int) -> str:
+    """Get the cache key of the permissions of a user.
+
+    Args:
+        user_pk (int): User primary key.
+
+    Returns:
+        str: Cache key, versioned with the Group namespace.
+    """
+    (version,) = namespace_versions((Group,))
+    return f"auth:perms:{version}:{user_pk}"
+
+
+def invalidate_permissions(*user_pks: int) -> None:
+    """Forget the cached permissions of users, now and after commit.
+
+    Args:
+        *user_pks (int): User primary keys.
+    """
+    _delete_permissions(user_pks)
+    transaction.on_commit(partial(_delete_permissions, user_pks))
+
+
+def invalidate_all_permissions() -> None:
+    """Forget the cached permissions of every user, now and after commit."""
+    bump_namespace(Group)
+    transaction.on_commit(partial(bump_namespace, Group))
+
+
+def connect_permission_signals() -> None:
+    """Invalidate cached permissions when users, groups or permissions change."""
+    m2m_changed.connect(
+        _user_relation_changed,
+        sender=User.groups.through,
+        dispatch_uid="permission_cache_user_groups",
+    )
+    m2m_changed.connect(
+        _user_relation_changed,
+        sender=User.user_permissions.through,
+        dispatch_uid="permission_cache_user_permissions",
+    )
+    m2m_changed.connect(
+        _group_permissions_changed,
+        sender=Group.permissions.through,
+        dispatch_uid="permission_cache_group_permissions",
+    )
+    for model in [Group, Permission]:
+        post_delete.connect(
+            _group_permissions_changed,
+            sender=model,
+            dispatch_uid=f"permission_cache_{model.__name__}_delete",
+        )
+    # Superusers have every permission, including new ones.
+    post_save.connect(
+        _group_permissions_changed,
+        sender=Permission,
+        dispatch_uid="permission_cache_permission_save",
+    )
+
+
+def _user_relation_changed(
+    instance: models.Model,
+    action: str,
+    reverse: bool,  # noqa: FBT001
+    pk_set: set[int] | None,
+    **kwargs: Any,  # noqa: ANN401, ARG001
+) -> None:
+    """Signal receiver for changes of the groups or permissions of users."""
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_permissions(instance.pk)
+    elif pk_set is not None:
+        invalidate_permissions(*pk_set)
+    else:
+        # A group or permission lost all its users, they are unknown.
+        invalidate_all_permissions()
+
+
+def _group_permissions_changed(**kwargs: Any) -> None:  # noqa: ANN401
+    """Signal receiver for changes affecting the permissions of many users."""
+    action = kwargs.get("action")
+    if action is None or action.startswith("post_"):
+        invalidate_all_permissions()
+
+
+def _delete_permissions(user_pks: tuple[int, ...]) -> None:
+    """Remove cached permissions of users."""
+    cache.delete_many([permissions_key(pk) for pk in user_pks])
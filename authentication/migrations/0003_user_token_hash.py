@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 00:58
+
+from hashlib import sha256
+
+from django.db import migrations, models
+
+
+def hash_tokens(apps, schema_editor):
+    """Replace existing plain tokens with their prefix and hash."""
+    User = apps.get_model("authentication", "User")
+    users = list(User.objects.exclude(token="").only("pk", "token"))
+    for user in users:
+        user.token_prefix = user.token[:8]
+        user.token_hash = sha256(user.token.encode()).hexdigest()
+    User.objects.bulk_update(users, ["token_prefix", "token_hash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_user_profile_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_active',
+            field=models.BooleanField(blank=True, default=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='token_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='token_prefix',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=8),
+        ),
+        migrations.RunPython(hash_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='token',
+        ),
+    ]
@@ -1,4 +1,6 @@
-from typing import ClassVar, Self
+from collections.abc import Sequence
+from hashlib import sha256
+from typing import Any, ClassVar, Self
 
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -7,6 +9,28 @@ from django.contrib.auth.models import (
 )
 from django.db import models
 
+from common.renditions import prepare_renditions, schedule_renditions
+
+PROFILE_IMAGE_WIDTHS = [32, 64, 128, 256]
+TOKEN_PREFIX_LENGTH = 8
+# Flags copied into signed access tokens, changing them revokes the tokens.
+ROLE_FIELDS = ("is_staff", "is_superuser")
+
+
+def hash_token(token: str) -> str:
+    """Hash an API token.
+
+    Tokens are random, so a fast unsalted hash is enough to keep them secret
+    and still look them up.
+
+    Args:
+        token (str): Plain token.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    return sha256(token.encode()).hexdigest()
+
 
 class UserManager(BaseUserManager):
     """Custom User manager."""
@@ -75,8 +99,22 @@ class User(AbstractBaseUser, PermissionsMixin):
     last_name = models.CharField(max_length=50)
     email = models.EmailField(unique=True, blank=False, null=False)
     profile_image = models.ImageField(upload_to="authentication")
-    token = models.CharField(max_length=50, blank=True, null=False)
+    profile_image_width = models.PositiveIntegerField(
+        blank=True, null=True, editable=False
+    )
+    profile_image_height = models.PositiveIntegerField(
+        blank=True, null=True, editable=False
+    )
+    profile_image_renditions = models.JSONField(
+        blank=True, default=dict, editable=False
+    )
+    # Indexed start of the plain token, narrowing the hash comparisons.
+    token_prefix = models.CharField(
+        max_length=TOKEN_PREFIX_LENGTH, blank=True, db_index=True, editable=False
+    )
+    token_hash = models.CharField(max_length=64, blank=True, editable=False)
     objects = UserManager()
+    is_active = models.BooleanField(default=True, blank=True)
     is_staff = models.BooleanField(default=False, blank=True)
     is_superuser = models.BooleanField(default=False, blank=True)
     USERNAME_FIELD = "email"
@@ -85,3 +123,97 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self: Self) -> str:
         """String representation."""
         return f"{self.email}"
+
+    @property
+    def token(self: Self) -> str:
+        """Plain API token, only known by the instance it was set on."""
+        return getattr(self, "_token", "")
+
+    @token.setter
+    def token(self: Self, token: str) -> None:
+        """Set the API token, only its prefix and hash are stored.
+
+        Args:
+            token (str): Plain token, empty to remove it.
+        """
+        if not hasattr(self, "_replaced_token_hash"):
+            self._replaced_token_hash = self.token_hash
+        self._token = token
+        self.token_prefix = token[:TOKEN_PREFIX_LENGTH]
+        self.token_hash = hash_token(token) if token else ""
+
+    @classmethod
+    def from_db(
+        cls: type[Self],
+        db: str | None,
+        field_names: Sequence[str],
+        values: Sequence[Any],
+    ) -> Self:
+        """Load a user, remembering its saved roles."""
+        user = super().from_db(db, field_names, values)
+        user._saved_roles = user._roles()  # noqa: SLF001
+        return user
+
+    def _roles(self: Self) -> dict[str, bool]:
+        """Get the loaded role flags, deferred ones are left out."""
+        return {
+            name: self.__dict__[name] for name in ROLE_FIELDS if name in self.__dict__
+        }
+
+    def set_password(self: Self, raw_password: str | None) -> None:
+        """Set the password, remembering the replaced hash until saved.
+
+        Args:
+            raw_password (str | None): Plain password, None for an unusable one.
+        """
+        if not hasattr(self, "_replaced_password"):
+            self._replaced_password = self.password
+        super().set_password(raw_password)
+
+    def save(self: Self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Save user, forget its cached token lookups and render a new image.
+
+        Signed tokens of inactive users and of users whose password or roles
+        changed are revoked. Cached permissions are dropped as they follow the
+        superuser flag.
+        """
+        from authentication.backends import invalidate_permissions
+        from authentication.tasks import render_profile_image
+        from authentication.tokens import invalidate_tokens, revoke_user_tokens
+
+        update_fields = kwargs.get("update_fields")
+        image_changed = update_fields is None or "profile_image" in update_fields
+        if image_changed:
+            kwargs["update_fields"] = prepare_renditions(
+                self, "profile_image", update_fields
+            )
+        password_changed = not self._state.adding and self.password != getattr(
+            self, "_replaced_password", self.password
+        )
+        saved_roles = getattr(self, "_saved_roles", {})
+        roles = self._roles()
+        roles_changed = any(
+            saved_roles.get(name, value) != value for name, value in roles.items()
+        )
+        super().save(*args, **kwargs)
+        invalidate_tokens(self.token_hash, getattr(self, "_replaced_token_hash", ""))
+        self.__dict__.pop("_replaced_token_hash", None)
+        self.__dict__.pop("_replaced_password", None)
+        self._saved_roles = {**saved_roles, **roles}
+        invalidate_permissions(self.pk)
+        if not self.is_active or password_changed or roles_changed:
+            revoke_user_tokens(self.pk)
+        if image_changed:
+            schedule_renditions(self, "profile_image", render_profile_image)
+
+    def delete(self: Self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:  # noqa: ANN401
+        """Delete user, forget its cached token lookups and revoke signed tokens."""
+        from authentication.backends import invalidate_permissions
+        from authentication.tokens import invalidate_tokens, revoke_user_tokens
+
+        token_hash, pk = self.token_hash, self.pk
+        deleted = super().delete(*args, **kwargs)
+        invalidate_tokens(token_hash)
+        revoke_user_tokens(pk)
+        invalidate_permissions(pk)
+        return deleted
@@ -0,0 +1,9 @@
+from authentication.models import PROFILE_IMAGE_WIDTHS, User
+from celery import shared_task  # type: ignore[attr-defined]
+from common.renditions import render_field
+
+
+@shared_task
+def render_profile_image(user_id: int) -> None:
+    """Create user profile image renditions."""
+    render_field(User, user_id, "profile_image", PROFILE_IMAGE_WIDTHS)
@@ -3,10 +3,17 @@ from collections.abc import Generator
 from pathlib import Path
 
 import pytest
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from ninja.testing import TestAsyncClient
+from pytest_django.fixtures import SettingsWrapper
 
 from authentication.models import User
+from authentication.tokens import local_tokens
+from blog.api.api_v1_async import router as blog_async_router
+from main_project.api import build_api
 from main_project.settings import MEDIA_ROOT
+from todo.api.api_v1_async import router as todo_async_router
 
 pytestmark = pytest.mark.django_db
 
@@ -17,6 +24,12 @@ USER_PASSWORD = "password"  # noqa: S105
 TOKEN = "foo"  # noqa: S105
 
 
+@pytest.fixture(autouse=True)
+def clear_local_tokens() -> None:
+    """Forget token lookups of users created by previous tests."""
+    local_tokens.clear()
+
+
 @pytest.fixture
 def user_fixture() -> User:
     """User fixture."""
@@ -37,6 +50,26 @@ def user_fixture2() -> User:
     return user
 
 
+@pytest.fixture
+def locmem_cache(settings: SettingsWrapper) -> None:
+    """Use an empty local memory cache instead of the dummy test cache."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+@pytest.fixture(scope="session")
+def async_api_client() -> TestAsyncClient:
+    """Client of the async API routes, built once as routers attach to one API."""
+    api = build_api(
+        {"/todo/": todo_async_router, "/blog/": blog_async_router},
+        asynchronous=True,
+        urls_namespace="api-async-test",
+    )
+    return TestAsyncClient(api)
+
+
 @pytest.fixture
 def image_upload_fixture() -> Generator[SimpleUploadedFile]:
     """Image upload fixture."""
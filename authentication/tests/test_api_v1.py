@@ -0,0 +1,172 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+from django.urls import reverse_lazy
+from pytest_django import DjangoAssertNumQueries
+
+from authentication.models import User
+from authentication.tests.fixtures import USER_PASSWORD
+from authentication.tokens import authenticate_access_token, issue_tokens
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("locmem_cache")]
+
+TOPIC_LIST_URL = reverse_lazy("api-1.0.0:topic_list")
+TOPIC_CREATE_URL = reverse_lazy("api-1.0.0:topic_create")
+REFRESH_URL = reverse_lazy("api-1.0.0:token_refresh")
+REVOKE_URL = reverse_lazy("api-1.0.0:token_revoke")
+
+
+def bearer(token: str) -> dict:
+    """Authorization header of a token."""
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestSignedTokens:
+    """Test signed access and refresh tokens."""
+
+    @staticmethod
+    def test_generate_token_view(client: Client, user_fixture: User) -> None:
+        """Test the token view mints a signed pair accepted by the API."""
+        client.post(
+            reverse_lazy("authentication:login"),
+            data={"email": user_fixture.email, "password": USER_PASSWORD},
+        )
+        response = client.get(reverse_lazy("authentication:generate_token"))
+        signed = response.context["signed"]
+        assert signed["refresh_token"] in response.content.decode()
+        response = client.get(TOPIC_LIST_URL, headers=bearer(signed["access_token"]))
+        assert response.status_code == HTTPStatus.OK
+
+    @staticmethod
+    def test_access_without_queries(
+        user_fixture: User, django_assert_num_queries: DjangoAssertNumQueries
+    ) -> None:
+        """Test access tokens are checked without loading the user."""
+        token = issue_tokens(user_fixture)["access_token"]
+        with django_assert_num_queries(0):
+            user = authenticate_access_token(token, "write")
+            assert user is not None
+            assert user.pk == user_fixture.pk
+            assert not user.is_staff
+        with django_assert_num_queries(1):
+            assert user.email == user_fixture.email
+
+    @staticmethod
+    def test_invalid_tokens(
+        client: Client, user_fixture: User, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test tampered, expired and refresh tokens are rejected."""
+        tokens = issue_tokens(user_fixture)
+        tampered = f"{tokens['access_token'][:-1]}x"
+        for token in [tampered, tokens["refresh_token"]]:
+            response = client.get(TOPIC_LIST_URL, headers=bearer(token))
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+        monkeypatch.setattr("authentication.tokens.API_ACCESS_TOKEN_LIFETIME", -1)
+        expired = issue_tokens(user_fixture)["access_token"]
+        response = client.get(TOPIC_LIST_URL, headers=bearer(expired))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @staticmethod
+    def test_scopes(client: Client, user_fixture: User) -> None:
+        """Test read only tokens can not write."""
+        token = issue_tokens(user_fixture, ["read"])["access_token"]
+        response = client.get(TOPIC_LIST_URL, headers=bearer(token))
+        assert response.status_code == HTTPStatus.OK
+        response = client.post(
+            TOPIC_CREATE_URL,
+            {"name": "topic"},
+            content_type="application/json",
+            headers=bearer(token),
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @staticmethod
+    def test_refresh_once(client: Client, user_fixture: User) -> None:
+        """Test refresh tokens are exchanged once for new tokens."""
+        refresh = issue_tokens(user_fixture, ["read"])["refresh_token"]
+        response = client.post(
+            REFRESH_URL, {"refresh_token": refresh}, content_type="application/json"
+        )
+        assert response.status_code == HTTPStatus.OK
+        tokens = response.json()
+        assert tokens["token_type"] == "Bearer"  # noqa: S105
+        assert authenticate_access_token(tokens["access_token"], "write") is None
+        assert authenticate_access_token(tokens["access_token"], "read")
+        response = client.post(
+            REFRESH_URL, {"refresh_token": refresh}, content_type="application/json"
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @staticmethod
+    def test_revoke(client: Client, user_fixture: User) -> None:
+        """Test revoked tokens stop working."""
+        tokens = issue_tokens(user_fixture)
+        response = client.post(
+            REVOKE_URL,
+            {"token": tokens["access_token"]},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(TOPIC_LIST_URL, headers=bearer(tokens["access_token"]))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = client.post(
+            REVOKE_URL, {"token": "invalid"}, content_type="application/json"
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @staticmethod
+    def test_deactivated_user(client: Client, user_fixture: User) -> None:
+        """Test deactivating a user revokes its signed tokens."""
+        tokens = issue_tokens(user_fixture)
+        user_fixture.is_active = False
+        user_fixture.save()
+        response = client.get(TOPIC_LIST_URL, headers=bearer(tokens["access_token"]))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = client.post(
+            REFRESH_URL,
+            {"refresh_token": tokens["refresh_token"]},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        user_fixture.is_active = True
+        user_fixture.save()
+        token = issue_tokens(user_fixture)["access_token"]
+        assert authenticate_access_token(token, "read") is not None
+
+    @staticmethod
+    def test_demoted_superuser(client: Client, user_fixture: User) -> None:
+        """Test removing the superuser flag revokes the signed tokens."""
+        user_fixture.is_superuser = True
+        user_fixture.save()
+        tokens = issue_tokens(user_fixture)
+        user = authenticate_access_token(tokens["access_token"], "write")
+        assert user is not None
+        assert user.is_superuser
+        demoted = User.objects.get(pk=user_fixture.pk)
+        demoted.is_superuser = False
+        demoted.save()
+        assert authenticate_access_token(tokens["access_token"], "write") is None
+        response = client.post(
+            REFRESH_URL,
+            {"refresh_token": tokens["refresh_token"]},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @staticmethod
+    def test_password_change(client: Client, user_fixture: User) -> None:
+        """Test changing the password revokes the signed tokens of the user."""
+        tokens = issue_tokens(user_fixture)
+        user_fixture.first_name = "Renamed"
+        user_fixture.save()
+        assert authenticate_access_token(tokens["access_token"], "read") is not None
+        user_fixture.set_password(f"{USER_PASSWORD}-new")
+        user_fixture.save()
+        assert authenticate_access_token(tokens["access_token"], "read") is None
+        response = client.post(
+            REFRESH_URL,
+            {"refresh_token": tokens["refresh_token"]},
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,96 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group, Permission
+from pytest_django import DjangoAssertNumQueries
+
+from authentication.models import User
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("locmem_cache")]
+
+ADD_TOPIC = "blog.add_topic"
+
+
+@pytest.fixture
+def add_topic() -> Permission:
+    """Permission to add topics."""
+    return Permission.objects.get(codename="add_topic", content_type__app_label="blog")
+
+
+def fresh(user: User) -> User:
+    """Load a user again, as a new request would."""
+    return User.objects.get(pk=user.pk)
+
+
+class TestCachedModelBackend:
+    """Test cached permissions."""
+
+    @staticmethod
+    def test_permissions_are_cached(
+        user_fixture: User,
+        add_topic: Permission,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test permissions are queried once across requests."""
+        user_fixture.user_permissions.add(add_topic)
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        user = fresh(user_fixture)
+        with django_assert_num_queries(0):
+            assert user.has_perm(ADD_TOPIC)
+            assert not user.has_perm("blog.delete_topic")
+
+    @staticmethod
+    def test_async_permissions_are_cached(
+        user_fixture: User,
+        add_topic: Permission,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test async checks read the same cached permissions."""
+        user_fixture.user_permissions.add(add_topic)
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        user = fresh(user_fixture)
+        with django_assert_num_queries(0):
+            assert async_to_sync(user.ahas_perm)(ADD_TOPIC)
+            assert not async_to_sync(user.ahas_perm)("blog.delete_topic")
+
+    @staticmethod
+    def test_user_permissions_invalidate(
+        user_fixture: User, add_topic: Permission
+    ) -> None:
+        """Test adding and removing user permissions from both sides."""
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+        user_fixture.user_permissions.add(add_topic)
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        add_topic.user_set.remove(user_fixture)
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+        add_topic.user_set.add(user_fixture)
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        add_topic.user_set.clear()
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+
+    @staticmethod
+    def test_group_permissions_invalidate(
+        user_fixture: User, add_topic: Permission
+    ) -> None:
+        """Test group membership, group permissions and group deletion."""
+        group = Group.objects.create(name="editors")
+        user_fixture.groups.add(group)
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+        group.permissions.add(add_topic)
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        user_fixture.groups.remove(group)
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+        user_fixture.groups.add(group)
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        group.delete()
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+
+    @staticmethod
+    def test_superuser_and_inactive(user_fixture: User) -> None:
+        """Test superuser and active flags apply at once."""
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
+        user_fixture.is_superuser = True
+        user_fixture.save()
+        assert fresh(user_fixture).has_perm(ADD_TOPIC)
+        user_fixture.is_active = False
+        user_fixture.save()
+        assert not fresh(user_fixture).has_perm(ADD_TOPIC)
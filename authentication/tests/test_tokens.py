@@ -0,0 +1,80 @@
+import pytest
+from pytest_django import DjangoAssertNumQueries
+
+from authentication.models import User, hash_token
+from authentication.tests.fixtures import TOKEN
+from authentication.tokens import authenticate_token, local_tokens
+from main_project.cache import LocalCache
+
+pytestmark = pytest.mark.django_db
+
+
+def test_token_is_hashed(user_fixture: User) -> None:
+    """Test only the prefix and hash of a token are stored."""
+    user = User.objects.get(pk=user_fixture.pk)
+    assert user.token == ""
+    assert user.token_prefix == TOKEN[:8]
+    assert user.token_hash == hash_token(TOKEN)
+
+
+@pytest.mark.usefixtures("locmem_cache")
+def test_lookups_are_cached(
+    user_fixture: User, django_assert_num_queries: DjangoAssertNumQueries
+) -> None:
+    """Test known and unknown tokens are looked up once."""
+    with django_assert_num_queries(1):
+        user = authenticate_token(TOKEN)
+        assert authenticate_token(TOKEN) == user_fixture
+        assert authenticate_token(TOKEN) is not user
+    with django_assert_num_queries(1):
+        assert authenticate_token("unknown") is None
+        assert authenticate_token("unknown") is None
+    local_tokens.clear()
+    with django_assert_num_queries(0):
+        assert authenticate_token(TOKEN) == user_fixture
+
+
+def test_regenerated_token(user_fixture: User) -> None:
+    """Test the replaced token stops authenticating at once."""
+    assert authenticate_token(TOKEN) == user_fixture
+    user_fixture.token = "new token"  # noqa: S105
+    user_fixture.save()
+    assert authenticate_token(TOKEN) is None
+    assert authenticate_token("new token") == user_fixture
+
+
+def test_prefix_collision(user_fixture: User, user_fixture2: User) -> None:
+    """Test users sharing a token prefix are told apart by the hash."""
+    user_fixture.token = "prefix00-first"  # noqa: S105
+    user_fixture.save()
+    user_fixture2.token = "prefix00-second"  # noqa: S105
+    user_fixture2.save()
+    assert authenticate_token("prefix00-second") == user_fixture2
+    assert authenticate_token("prefix00-third") is None
+
+
+def test_deactivated_and_deleted_users(user_fixture: User) -> None:
+    """Test inactive and deleted users are rejected at once."""
+    assert authenticate_token(TOKEN) == user_fixture
+    user_fixture.is_active = False
+    user_fixture.save()
+    assert authenticate_token(TOKEN) is None
+    user_fixture.is_active = True
+    user_fixture.save()
+    assert authenticate_token(TOKEN) == user_fixture
+    user_fixture.delete()
+    assert authenticate_token(TOKEN) is None
+
+
+def test_local_cache_eviction_and_expiry() -> None:
+    """Test the least recently used and expired entries are dropped."""
+    local = LocalCache(max_size=2, timeout=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1
+    local.set("c", 3)
+    assert local.get("b") is None
+    assert (local.get("a"), local.get("c")) == (1, 3)
+    expired = LocalCache(max_size=2, timeout=-1)
+    expired.set("a", 1)
+    assert expired.get("a", "missing") == "missing"
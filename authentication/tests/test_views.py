@@ -6,7 +6,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test.client import Client
 from django.urls import reverse_lazy
 
-from authentication.models import User
+from authentication.models import User, hash_token
 from authentication.tests.fixtures import USER_PASSWORD
 
 pytestmark = pytest.mark.django_db
@@ -241,7 +241,7 @@ class TestGenerateTokenView:
         user_fixture.token = ""
         user_fixture.save()
         user_fixture.refresh_from_db()
-        assert user_fixture.token == ""
+        assert user_fixture.token_hash == ""
         login_url = reverse_lazy("authentication:login")
         client.post(
             login_url, data={"email": user_fixture.email, "password": USER_PASSWORD}
@@ -250,4 +250,4 @@ class TestGenerateTokenView:
         response = client.get(url)
         user_fixture.refresh_from_db()
         assert response.status_code == HTTPStatus.OK
-        assert user_fixture.token != ""
+        assert user_fixture.token_hash == hash_token(response.context["token"])
@@ -0,0 +1,360 @@
+import time
+from collections.abc import Sequence
+from copy import copy
+from functools import partial
+from hmac import compare_digest
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+
+from authentication.models import TOKEN_PREFIX_LENGTH, User, hash_token
+from main_project.cache import LocalCache
+from main_project.settings import (
+    API_ACCESS_TOKEN_LIFETIME,
+    API_REFRESH_TOKEN_LIFETIME,
+    API_TOKEN_SCOPES,
+    TOKEN_CACHE_TIMEOUT,
+    TOKEN_LOCAL_CACHE_SIZE,
+    TOKEN_LOCAL_CACHE_TIMEOUT,
+)
+
+ACCESS_SALT = "authentication.tokens.access"
+REFRESH_SALT = "authentication.tokens.refresh"
+# Fields an access token carries, the others are loaded on first access.
+ACCESS_USER_FIELDS = ("id", "is_active", "is_staff", "is_superuser")
+
+# Users of recently seen token hashes, None for unknown tokens.
+local_tokens = LocalCache(TOKEN_LOCAL_CACHE_SIZE, TOKEN_LOCAL_CACHE_TIMEOUT)
+_missing = object()
+
+
+def is_signed_token(token: str) -> bool:
+    """Tell signed access tokens from stored API tokens, UUIDs have no ":".
+
+    Args:
+        token (str): Bearer token.
+
+    Returns:
+        bool: True if the token is signed.
+    """
+    return ":" in token
+
+
+def issue_tokens(user: User, scopes: Sequence[str] = API_TOKEN_SCOPES) -> dict:
+    """Sign a short lived access token and a refresh token for a user.
+
+    Args:
+        user (User): Token owner.
+        scopes (Sequence[str], optional): Granted scopes. Defaults to
+            API_TOKEN_SCOPES.
+
+    Returns:
+        dict: Access and refresh tokens and the access token lifetime.
+    """
+    now = time.time()
+    scopes = sorted(set(scopes))
+    access = {
+        "sub": user.pk,
+        "scp": scopes,
+        "stf": user.is_staff,
+        "su": user.is_superuser,
+        "iat": now,
+        "exp": int(now) + API_ACCESS_TOKEN_LIFETIME,
+        "jti": uuid4().hex,
+    }
+    refresh = {
+        "sub": user.pk,
+        "scp": scopes,
+        "iat": now,
+        "exp": int(now) + API_REFRESH_TOKEN_LIFETIME,
+        "jti": uuid4().hex,
+    }
+    return {
+        "access_token": signing.Signer(salt=ACCESS_SALT).sign_object(access),
+        "refresh_token": signing.Signer(salt=REFRESH_SALT).sign_object(refresh),
+        "token_type": "Bearer",
+        "expires_in": API_ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def authenticate_access_token(token: str, scope: str) -> User | None:
+    """Get the user of a signed access token without querying it.
+
+    The token is checked by signature, expiry, scope and one cache round
+    trip for revocations. The user carries the id, active, staff and
+    superuser flags of the token, other fields are deferred.
+
+    Args:
+        token (str): Signed access token.
+        scope (str): Scope the request needs.
+
+    Returns:
+        User | None: User, None if the token is invalid, expired, revoked or
+            lacks the scope.
+    """
+    claims = _verify(token, ACCESS_SALT)
+    return _access_user(claims, scope)
+
+
+async def aauthenticate_access_token(token: str, scope: str) -> User | None:
+    """Async ``authenticate_access_token``.
+
+    Args:
+        token (str): Signed access token.
+        scope (str): Scope the request needs.
+
+    Returns:
+        User | None: User, None if the token is invalid, expired, revoked or
+            lacks the scope.
+    """
+    claims = _unsign(token, ACCESS_SALT)
+    if claims is None:
+        return None
+    revoked = await cache.aget_many(_revocation_keys(claims))
+    return _access_user(None if _is_revoked(claims, revoked) else claims, scope)
+
+
+def refresh_tokens(refresh_token: str) -> dict | None:
+    """Exchange a refresh token for new tokens, the refresh token is revoked.
+
+    Args:
+        refresh_token (str): Signed refresh token.
+
+    Returns:
+        dict | None: New tokens, as ``issue_tokens``, None if the refresh
+            token is invalid, expired, revoked or its user is inactive.
+    """
+    claims = _verify(refresh_token, REFRESH_SALT)
+    if claims is None:
+        return None
+    user = User.objects.filter(pk=claims["sub"], is_active=True).first()
+    # Only the first exchange of a refresh token succeeds.
+    if user is None or not cache.add(
+        _revoked_key(claims["jti"]), 1, _remaining(claims)
+    ):
+        return None
+    return issue_tokens(user, claims["scp"])
+
+
+def revoke_token(token: str) -> bool:
+    """Revoke a signed access or refresh token until it expires.
+
+    Args:
+        token (str): Signed token.
+
+    Returns:
+        bool: True if the token was valid and is now revoked.
+    """
+    claims = _verify(token, ACCESS_SALT) or _verify(token, REFRESH_SALT)
+    if claims is None:
+        return False
+    cache.set(_revoked_key(claims["jti"]), 1, _remaining(claims))
+    return True
+
+
+def revoke_user_tokens(user_pk: int) -> None:
+    """Revoke every signed token issued to a user until now.
+
+    Args:
+        user_pk (int): User primary key.
+    """
+    cache.set(_revoked_user_key(user_pk), time.time(), API_REFRESH_TOKEN_LIFETIME)
+
+
+def authenticate_token(token: str) -> User | None:
+    """Get the active user of an API token.
+
+    Lookups, including failed ones, are cached by token hash in the process
+    and in the shared cache, so repeated requests run no query.
+
+    Args:
+        token (str): Plain token.
+
+    Returns:
+        User | None: A copy of the cached user, None if no active user has it.
+    """
+    if not token:
+        return None
+    key = _token_key(hash_token(token))
+    user = local_tokens.get(key, _missing)
+    if user is _missing:
+        user = _lookup_token(key, token)
+    # Requests must not share the cached instance.
+    return copy(user)
+
+
+async def aauthenticate_token(token: str) -> User | None:
+    """Async ``authenticate_token``, hits of the process cache stay on the loop.
+
+    Args:
+        token (str): Plain token.
+
+    Returns:
+        User | None: A copy of the cached user, None if no active user has it.
+    """
+    if not token:
+        return None
+    key = _token_key(hash_token(token))
+    user = local_tokens.get(key, _missing)
+    if user is _missing:
+        user = await sync_to_async(_lookup_token)(key, token)
+    return copy(user)
+
+
+def invalidate_tokens(*token_hashes: str) -> None:
+    """Forget the cached lookups of token hashes.
+
+    They are removed now and once more after commit, so a concurrent request
+    can not cache the state replaced by the current transaction.
+
+    Args:
+        *token_hashes (str): Token hashes, empty ones are skipped.
+    """
+    keys = [_token_key(token_hash) for token_hash in token_hashes if token_hash]
+    if not keys:
+        return
+    _delete(keys)
+    transaction.on_commit(partial(_delete, keys))
+
+
+def _lookup_token(key: str, token: str) -> User | None:
+    """Get the user of a token from the shared cache or the database.
+
+    Args:
+        key (str): Cache key of the token hash.
+        token (str): Plain token.
+
+    Returns:
+        User | None: User, None if no active user has the token.
+    """
+    user = cache.get(key, _missing)
+    if user is _missing:
+        user = _find_user(token)
+        cache.set(key, user, TOKEN_CACHE_TIMEOUT)
+    local_tokens.set(key, user)
+    return user
+
+
+def _find_user(token: str) -> User | None:
+    """Query the active user of a token.
+
+    Args:
+        token (str): Plain token.
+
+    Returns:
+        User | None: User, None if no active user has the token.
+    """
+    token_hash = hash_token(token)
+    candidates = User.objects.filter(
+        token_prefix=token[:TOKEN_PREFIX_LENGTH], is_active=True
+    )
+    for user in candidates:
+        if compare_digest(user.token_hash, token_hash):
+            return user
+    return None
+
+
+def _delete(keys: list[str]) -> None:
+    """Remove token lookups from the local and shared caches."""
+    for key in keys:
+        local_tokens.delete(key)
+    cache.delete_many(keys)
+
+
+def _token_key(token_hash: str) -> str:
+    """Get the cache key of a token hash."""
+    return f"auth:token:{token_hash}"
+
+
+def _verify(token: str, salt: str) -> dict | None:
+    """Get the claims of an unexpired and unrevoked signed token.
+
+    Args:
+        token (str): Signed token.
+        salt (str): Salt of the token type.
+
+    Returns:
+        dict | None: Claims, None if the token is not valid.
+    """
+    claims = _unsign(token, salt)
+    if claims is None:
+        return None
+    if _is_revoked(claims, cache.get_many(_revocation_keys(claims))):
+        return None
+    return claims
+
+
+def _unsign(token: str, salt: str) -> dict | None:
+    """Get the claims of an unexpired signed token, revocations are not checked.
+
+    Args:
+        token (str): Signed token.
+        salt (str): Salt of the token type.
+
+    Returns:
+        dict | None: Claims, None if the signature is bad or the token expired.
+    """
+    try:
+        claims = signing.Signer(salt=salt).unsign_object(token)
+    except signing.BadSignature:
+        return None
+    if claims["exp"] <= time.time():
+        return None
+    return claims
+
+
+def _is_revoked(claims: dict, revoked: dict) -> bool:
+    """Tell if a token is revoked by itself or with every token of its user.
+
+    Args:
+        claims (dict): Token claims.
+        revoked (dict): Values of the ``_revocation_keys`` of the claims.
+
+    Returns:
+        bool: True if the token is revoked.
+    """
+    if _revoked_key(claims["jti"]) in revoked:
+        return True
+    return revoked.get(_revoked_user_key(claims["sub"]), -1) >= claims["iat"]
+
+
+def _access_user(claims: dict | None, scope: str) -> User | None:
+    """Build the user of valid access token claims granting a scope.
+
+    Args:
+        claims (dict | None): Verified claims, None if the token is not valid.
+        scope (str): Scope the request needs.
+
+    Returns:
+        User | None: User with the token fields, other fields are deferred.
+    """
+    if claims is None or scope not in claims["scp"]:
+        return None
+    return User.from_db(
+        "default",
+        ACCESS_USER_FIELDS,
+        (claims["sub"], True, claims["stf"], claims["su"]),
+    )
+
+
+def _revocation_keys(claims: dict) -> list[str]:
+    """Get the cache keys that revoke a token, read in one round trip."""
+    return [_revoked_key(claims["jti"]), _revoked_user_key(claims["sub"])]
+
+
+def _remaining(claims: dict) -> int:
+    """Get the seconds left before a token expires."""
+    return max(int(claims["exp"] - time.time()), 1)
+
+
+def _revoked_key(jti: str) -> str:
+    """Get the cache key marking a signed token as revoked."""
+    return f"auth:revoked:{jti}"
+
+
+def _revoked_user_key(user_pk: int) -> str:
+    """Get the cache key holding when the signed tokens of a user were revoked."""
+    return f"auth:revoked-user:{user_pk}"
@@ -14,6 +14,7 @@ from authentication.forms import (
     ResetPasswordForm,
 )
 from authentication.models import User
+from authentication.tokens import issue_tokens
 from main_project.settings import MEDIA_ROOT
 
 HOME = reverse_lazy("common:home")
@@ -158,7 +159,7 @@ def edit_user(request: HttpRequest) -> HttpResponse:
 
 @login_required
 def generate_token(request: HttpRequest) -> HttpResponse:
-    """Generate a token for user.
+    """Generate a token for user, with a signed access and refresh token pair.
 
     Args:
         request (HttpRequest): HttpRequest object.
@@ -173,5 +174,5 @@ def generate_token(request: HttpRequest) -> HttpResponse:
     return render(
         request=request,
         template_name="authentication/generate_token.html",
-        context={"token": token},
+        context={"token": token, "signed": issue_tokens(user)},
     )
@@ -1,15 +1,49 @@
 from datetime import datetime
 from http import HTTPStatus
 
+from django.core.exceptions import ValidationError
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from ninja import Field, File, Form, Router, Schema, UploadedFile
 from ninja.pagination import paginate
 
-from blog.models import BlogPost, Topic
+from blog.autocomplete import get_choices
+from blog.models import (
+    SERIES_CYCLE_ERROR,
+    TOPIC_CYCLE_ERROR,
+    BlogPost,
+    Comment,
+    Topic,
+)
+from main_project.cache import cache_response
+from main_project.conditional import check_conditions, precondition
+from main_project.export import ExportFormat, export_response
+from main_project.optimizer import optimize, optimize_queryset
+from main_project.pagination import CursorPagination
+from main_project.settings import AUTOCOMPLETE_SIZE
 
 router = Router()
 NO_PERMISSION = "User does not have permission."
+# Modification times of the items and of the related items their schemas show
+TOPIC_VALIDATORS = ("updated_at", "parent_topic__updated_at")
+POST_VALIDATORS = ("updated_at", "topic__updated_at", "previous__updated_at")
+POST_EXPORT_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "topic": "topic__name",
+    "author": "author__email",
+    "content": "content",
+    "comment_count": "comment_count",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+COMMENT_EXPORT_COLUMNS = {
+    "id": "id",
+    "blog_post": "blog_post_id",
+    "author": "author__email",
+    "content": "content",
+    "created_at": "created_at",
+}
 
 
 class TopicIn(Schema):
@@ -34,6 +68,14 @@ class TopicOut(Schema):
     parent_topic: str | None = Field(None, alias="parent_topic.name")
 
 
+class TopicTreeOut(Schema):
+    """Topic tree API output schema."""
+
+    id: int
+    name: str
+    children: list["TopicTreeOut"] = Field(default_factory=list)
+
+
 class BlogPostIn(Schema):
     """BlogPost API input schema."""
 
@@ -64,6 +106,21 @@ class BlogPostOut(Schema):
     previous: str | None = Field(None, alias="previous.title")
 
 
+class SeriesPostOut(Schema):
+    """Series post API output schema."""
+
+    id: int
+    title: str
+    position: int = Field(..., alias="series_position")
+
+
+class AutocompleteOut(Schema):
+    """Autocomplete API output schema."""
+
+    id: int
+    label: str
+
+
 class Message(Schema):
     """Generic schema for messages."""
 
@@ -71,33 +128,91 @@ class Message(Schema):
 
 
 @router.get("/topic", response=list[TopicOut], url_name="topic_list")
-@paginate()
-def list_topic(request: HttpRequest, sort: str = "id") -> HttpResponse:  # noqa:ARG001
+@cache_response(Topic)
+@paginate(CursorPagination)
+@optimize_queryset(TopicOut)
+def list_topic(
+    request: HttpRequest, response: HttpResponse, sort: str = "id"
+) -> HttpResponse:
     """Topic list API.
 
     Args:
         request (HttpRequest): HttpRequest object.
-        sort (str, optional): Sort list by sort value. Defaults to "id".
+        response (HttpResponse): Temporal response for the validator headers.
+        sort (str, optional): Sort list by sort value, "id", "name",
+            "post_count" and "tree_post_count" are indexed for cursor
+            pagination. Defaults to "id".
 
     Returns:
         HttpResponse: HttpResponse object.
     """
-    query_set = Topic.objects.all()
-    return query_set.order_by(sort)
+    query_set = Topic.objects.order_by(sort)
+    check_conditions(request, query_set, TOPIC_VALIDATORS, response)
+    return query_set
+
+
+@router.get("/topic/tree", response=list[TopicTreeOut], url_name="topic_tree")
+@cache_response(Topic)
+def tree_topic(request: HttpRequest, root: int | None = None) -> list[dict]:  # noqa:ARG001
+    """Topic tree API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        root (int | None, optional): Only return the tree below this topic.
+            Defaults to None.
+
+    Returns:
+        list[dict]: Nested topic trees.
+    """
+    if root is None:
+        return Topic.objects.tree()
+    topic = get_object_or_404(Topic, pk=root)
+    return [topic.tree()]
+
+
+@router.get(
+    "/topic/autocomplete",
+    response=list[AutocompleteOut],
+    url_name="topic_autocomplete",
+)
+def autocomplete_topic(
+    request: HttpRequest,  # noqa:ARG001
+    q: str = "",
+    limit: int = AUTOCOMPLETE_SIZE,
+) -> list[dict]:
+    """Topic autocomplete API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        q (str, optional): Text typed by the user. Defaults to "".
+        limit (int, optional): Max number of results. Defaults to AUTOCOMPLETE_SIZE.
+
+    Returns:
+        list[dict]: Best matching topics.
+    """
+    choices = get_choices(Topic, "name", q, limit)
+    return [{"id": pk, "label": label} for pk, label in choices]
 
 
 @router.get("/topic/{topic_id}", response=TopicOut, url_name="topic_detail")
-def detail_topic(request: HttpRequest, topic_id: int) -> HttpResponse:  # noqa:ARG001
+@cache_response(Topic)
+def detail_topic(
+    request: HttpRequest, topic_id: int, response: HttpResponse
+) -> HttpResponse:
     """Topic detail API.
 
     Args:
         request (HttpRequest): HttpRequest object.
         topic_id (int): Topic id.
+        response (HttpResponse): Temporal response for the validator headers.
 
     Returns:
         HttpResponse: HttpResponse object.
     """
-    topic = get_object_or_404(Topic, pk=topic_id)
+    check_conditions(
+        request, Topic.objects.filter(pk=topic_id), TOPIC_VALIDATORS, response
+    )
+    topic = get_object_or_404(optimize(Topic.objects.all(), TopicOut), pk=topic_id)
     return HTTPStatus.OK, topic
 
 
@@ -139,6 +254,7 @@ def create_topic(request: HttpRequest, payload: TopicIn) -> HttpResponse:
         HTTPStatus.UNAUTHORIZED: Message,
     },
 )
+@precondition(Topic, "topic_id", TOPIC_VALIDATORS)
 def update_topic(request: HttpRequest, topic_id: int, payload: TopicIn) -> HttpResponse:
     """Topic update API.
 
@@ -159,7 +275,10 @@ def update_topic(request: HttpRequest, topic_id: int, payload: TopicIn) -> HttpR
         topic.parent_topic = parent_topic
     else:
         topic.parent_topic = None
-    topic.save()
+    try:
+        topic.save()
+    except ValidationError:
+        return HTTPStatus.BAD_REQUEST, {"message": TOPIC_CYCLE_ERROR}
     return HTTPStatus.OK, topic
 
 
@@ -172,6 +291,7 @@ def update_topic(request: HttpRequest, topic_id: int, payload: TopicIn) -> HttpR
         HTTPStatus.UNAUTHORIZED: Message,
     },
 )
+@precondition(Topic, "topic_id", TOPIC_VALIDATORS)
 def patch_topic(
     request: HttpRequest,
     topic_id: int,
@@ -193,8 +313,11 @@ def patch_topic(
     if payload.name:
         topic.name = payload.name
     if payload.parent_topic:
-        topic.parent_topic = payload.parent_topic
-    topic.save()
+        topic.parent_topic = get_object_or_404(Topic, pk=payload.parent_topic)
+    try:
+        topic.save()
+    except ValidationError:
+        return HTTPStatus.BAD_REQUEST, {"message": TOPIC_CYCLE_ERROR}
     return HTTPStatus.OK, topic
 
 
@@ -203,6 +326,7 @@ def patch_topic(
     url_name="topic_delete",
     response={HTTPStatus.OK: None, HTTPStatus.UNAUTHORIZED: Message},
 )
+@precondition(Topic, "topic_id", TOPIC_VALIDATORS)
 def delete_topic(request: HttpRequest, topic_id: int) -> HttpResponse:
     """Topic delete API.
 
@@ -221,36 +345,134 @@ def delete_topic(request: HttpRequest, topic_id: int) -> HttpResponse:
 
 
 @router.get("/blog_post", response=list[BlogPostOut], url_name="blog_post_list")
-@paginate()
-def list_blog_post(request: HttpRequest, sort: str = "id") -> HttpResponse:  # noqa:ARG001
+@cache_response(BlogPost, Topic)
+@paginate(CursorPagination)
+@optimize_queryset(BlogPostOut)
+def list_blog_post(
+    request: HttpRequest,
+    response: HttpResponse,
+    sort: str = "id",
+    q: str | None = None,
+    topic: int | None = None,
+) -> HttpResponse:
     """Blog post list API.
 
     Args:
         request (HttpRequest): HttpRequest object.
-        sort (str, optional): Sort list by sort value. Defaults to "id".
+        response (HttpResponse): Temporal response for the validator headers.
+        sort (str, optional): Sort list by sort value, "id", "title",
+            "created_at" and "comment_count" are indexed for cursor
+            pagination. Defaults to "id".
+        q (str | None, optional): Full text search, results are sorted by
+            relevance. Defaults to None.
+        topic (int | None, optional): Filter by topic, including its subtopics.
+            Defaults to None.
 
     Returns:
         HttpResponse: HttpResponse object.
     """
     query_set = BlogPost.objects.all()
-    return query_set.order_by(sort)
+    if topic:
+        query_set = query_set.in_topic(get_object_or_404(Topic, pk=topic))
+    query_set = query_set.search(q) if q else query_set.order_by(sort)
+    check_conditions(request, query_set, POST_VALIDATORS, response)
+    return query_set
+
+
+@router.get(
+    "/blog_post/export",
+    url_name="blog_post_export",
+    response={HTTPStatus.UNAUTHORIZED: Message},
+)
+def export_blog_post(
+    request: HttpRequest,
+    file_format: ExportFormat = "ndjson",
+    gzip: bool = False,  # noqa: FBT001, FBT002
+) -> HttpResponse:
+    """Blog post export API streaming every blog post.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        file_format (ExportFormat, optional): "ndjson" or "csv". Defaults to
+            "ndjson".
+        gzip (bool, optional): Gzip the file. Defaults to False.
+
+    Returns:
+        HttpResponse: Blog posts file, or 401 without the view permission.
+    """
+    if not request.user.has_perm("blog.view_blogpost"):
+        return HTTPStatus.UNAUTHORIZED, {"message": NO_PERMISSION}
+    query_set = BlogPost.objects.order_by("pk")
+    return export_response(
+        query_set, POST_EXPORT_COLUMNS, "blog_posts", file_format, compress=gzip
+    )
+
+
+@router.get(
+    "/blog_post/autocomplete",
+    response=list[AutocompleteOut],
+    url_name="blog_post_autocomplete",
+)
+def autocomplete_blog_post(
+    request: HttpRequest,  # noqa:ARG001
+    q: str = "",
+    limit: int = AUTOCOMPLETE_SIZE,
+) -> list[dict]:
+    """Blog post autocomplete API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        q (str, optional): Text typed by the user. Defaults to "".
+        limit (int, optional): Max number of results. Defaults to AUTOCOMPLETE_SIZE.
+
+    Returns:
+        list[dict]: Best matching blog posts.
+    """
+    choices = get_choices(BlogPost, "title", q, limit)
+    return [{"id": pk, "label": label} for pk, label in choices]
 
 
 @router.get("/blog_post/{post_id}", response=BlogPostOut, url_name="blog_post_detail")
-def detail_blog_post(request: HttpRequest, post_id: int) -> HttpResponse:  # noqa:ARG001
+@cache_response(BlogPost, Topic)
+def detail_blog_post(
+    request: HttpRequest, post_id: int, response: HttpResponse
+) -> HttpResponse:
     """Blog post detail API.
 
     Args:
         request (HttpRequest): HttpRequest object.
         post_id (int): BlogPost id.
+        response (HttpResponse): Temporal response for the validator headers.
 
     Returns:
         HttpResponse: HttpResponse object.
     """
-    post = get_object_or_404(BlogPost, pk=post_id)
+    check_conditions(
+        request, BlogPost.objects.filter(pk=post_id), POST_VALIDATORS, response
+    )
+    post = get_object_or_404(optimize(BlogPost.objects.all(), BlogPostOut), pk=post_id)
     return HTTPStatus.OK, post
 
 
+@router.get(
+    "/blog_post/{post_id}/series",
+    response=list[SeriesPostOut],
+    url_name="blog_post_series",
+)
+def series_blog_post(request: HttpRequest, post_id: int) -> HttpResponse:  # noqa:ARG001
+    """Blog post series API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        post_id (int): BlogPost id.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    post = get_object_or_404(BlogPost.objects.only("series"), pk=post_id)
+    return optimize(post.series_posts(), SeriesPostOut)
+
+
 @router.post(
     "/blog_post",
     url_name="blog_post_create",
@@ -302,6 +524,7 @@ def create_blog_post(
         HTTPStatus.UNAUTHORIZED: Message,
     },
 )
+@precondition(BlogPost, "post_id", POST_VALIDATORS)
 def update_blog_post(
     request: HttpRequest,
     post_id: int,
@@ -327,7 +550,10 @@ def update_blog_post(
     if payload.previous:
         previous = get_object_or_404(BlogPost, pk=payload.previous)
         post.previous = previous
-    post.save()
+    try:
+        post.save()
+    except ValidationError:
+        return HTTPStatus.BAD_REQUEST, {"message": SERIES_CYCLE_ERROR}
     return HTTPStatus.OK, post
 
 
@@ -340,6 +566,7 @@ def update_blog_post(
         HTTPStatus.UNAUTHORIZED: Message,
     },
 )
+@precondition(BlogPost, "post_id", POST_VALIDATORS)
 def patch_blog_post(
     request: HttpRequest,
     post_id: int,
@@ -368,7 +595,10 @@ def patch_blog_post(
     if payload.previous:
         previous = get_object_or_404(BlogPost, pk=payload.previous)
         post.previous = previous
-    post.save()
+    try:
+        post.save()
+    except ValidationError:
+        return HTTPStatus.BAD_REQUEST, {"message": SERIES_CYCLE_ERROR}
     return HTTPStatus.OK, post
 
 
@@ -381,6 +611,7 @@ def patch_blog_post(
         HTTPStatus.OK: None,
     },
 )
+@precondition(BlogPost, "post_id", POST_VALIDATORS)
 def delete_blog_post(request: HttpRequest, post_id: int) -> HttpResponse:
     """Topic delete API.
 
@@ -396,3 +627,32 @@ def delete_blog_post(request: HttpRequest, post_id: int) -> HttpResponse:
     post = get_object_or_404(BlogPost, pk=post_id)
     post.delete()
     return HTTPStatus.NO_CONTENT, None
+
+
+@router.get(
+    "/comment/export",
+    url_name="comment_export",
+    response={HTTPStatus.UNAUTHORIZED: Message},
+)
+def export_comment(
+    request: HttpRequest,
+    file_format: ExportFormat = "ndjson",
+    gzip: bool = False,  # noqa: FBT001, FBT002
+) -> HttpResponse:
+    """Comment export API streaming every comment.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        file_format (ExportFormat, optional): "ndjson" or "csv". Defaults to
+            "ndjson".
+        gzip (bool, optional): Gzip the file. Defaults to False.
+
+    Returns:
+        HttpResponse: Comments file, or 401 without the view permission.
+    """
+    if not request.user.has_perm("blog.view_comment"):
+        return HTTPStatus.UNAUTHORIZED, {"message": NO_PERMISSION}
+    query_set = Comment.objects.order_by("pk")
+    return export_response(
+        query_set, COMMENT_EXPORT_COLUMNS, "comments", file_format, compress=gzip
+    )
@@ -0,0 +1,306 @@
+from http import HTTPStatus
+
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import aget_object_or_404
+from ninja import Router
+from ninja.pagination import paginate
+
+from blog.api import api_v1
+from blog.api.api_v1 import (
+    COMMENT_EXPORT_COLUMNS,
+    NO_PERMISSION,
+    POST_EXPORT_COLUMNS,
+    POST_VALIDATORS,
+    TOPIC_VALIDATORS,
+    AutocompleteOut,
+    BlogPostOut,
+    Message,
+    SeriesPostOut,
+    TopicIn,
+    TopicOut,
+    TopicTreeOut,
+)
+from blog.models import BlogPost, Comment, Topic
+from main_project.auth import GlobalAuth
+from main_project.cache import cache_response
+from main_project.conditional import acheck_conditions
+from main_project.export import ExportFormat, aexport_response
+from main_project.optimizer import optimize, optimize_queryset
+from main_project.pagination import CursorPagination
+
+# Served with API_ASYNC on an ASGI server. Writes that lock rows or run in a
+# transaction, and routes built on synchronous helpers, reuse the api_v1
+# routes, Ninja runs them in a worker thread.
+router = Router()
+# Reused sync routes can not await the authentication.
+sync_auth = GlobalAuth()
+TOPIC_WRITE_RESPONSES = {
+    HTTPStatus.OK: TopicOut,
+    HTTPStatus.BAD_REQUEST: Message,
+    HTTPStatus.UNAUTHORIZED: Message,
+}
+POST_WRITE_RESPONSES = {
+    HTTPStatus.OK: BlogPostOut,
+    HTTPStatus.BAD_REQUEST: Message,
+    HTTPStatus.UNAUTHORIZED: Message,
+}
+
+
+@router.get("/topic", response=list[TopicOut], url_name="topic_list")
+@cache_response(Topic)
+@paginate(CursorPagination)
+@optimize_queryset(TopicOut)
+async def list_topic(
+    request: HttpRequest, response: HttpResponse, sort: str = "id"
+) -> HttpResponse:
+    """Topic list API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        response (HttpResponse): Temporal response for the validator headers.
+        sort (str, optional): Sort list by sort value, "id", "name",
+            "post_count" and "tree_post_count" are indexed for cursor
+            pagination. Defaults to "id".
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    query_set = Topic.objects.order_by(sort)
+    await acheck_conditions(request, query_set, TOPIC_VALIDATORS, response)
+    return query_set
+
+
+router.get(
+    "/topic/tree", response=list[TopicTreeOut], url_name="topic_tree", auth=sync_auth
+)(api_v1.tree_topic)
+router.get(
+    "/topic/autocomplete",
+    response=list[AutocompleteOut],
+    url_name="topic_autocomplete",
+    auth=sync_auth,
+)(api_v1.autocomplete_topic)
+
+
+@router.get("/topic/{topic_id}", response=TopicOut, url_name="topic_detail")
+@cache_response(Topic)
+async def detail_topic(
+    request: HttpRequest, topic_id: int, response: HttpResponse
+) -> HttpResponse:
+    """Topic detail API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        topic_id (int): Topic id.
+        response (HttpResponse): Temporal response for the validator headers.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    await acheck_conditions(
+        request, Topic.objects.filter(pk=topic_id), TOPIC_VALIDATORS, response
+    )
+    topic = await aget_object_or_404(
+        optimize(Topic.objects.all(), TopicOut), pk=topic_id
+    )
+    return HTTPStatus.OK, topic
+
+
+@router.post("/topic", url_name="topic_create", response=TOPIC_WRITE_RESPONSES)
+async def create_topic(request: HttpRequest, payload: TopicIn) -> HttpResponse:
+    """Topic create API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        payload (TopicIn): Topic creation schema.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    if not await request.user.ahas_perm("blog.add_topic"):
+        return HTTPStatus.UNAUTHORIZED, {"message": NO_PERMISSION}
+    parent_topic = None
+    if payload.parent_topic:
+        parent_topic = await aget_object_or_404(Topic, pk=payload.parent_topic)
+    topic = await Topic.objects.acreate(name=payload.name, parent_topic=parent_topic)
+    return HTTPStatus.OK, topic
+
+
+router.put(
+    "/topic/{topic_id}",
+    url_name="topic_update",
+    response=TOPIC_WRITE_RESPONSES,
+    auth=sync_auth,
+)(api_v1.update_topic)
+router.patch(
+    "/topic/{topic_id}",
+    url_name="topic_patch",
+    response=TOPIC_WRITE_RESPONSES,
+    auth=sync_auth,
+)(api_v1.patch_topic)
+router.delete(
+    "/topic/{topic_id}",
+    url_name="topic_delete",
+    response={HTTPStatus.OK: None, HTTPStatus.UNAUTHORIZED: Message},
+    auth=sync_auth,
+)(api_v1.delete_topic)
+
+
+@router.get("/blog_post", response=list[BlogPostOut], url_name="blog_post_list")
+@cache_response(BlogPost, Topic)
+@paginate(CursorPagination)
+@optimize_queryset(BlogPostOut)
+async def list_blog_post(
+    request: HttpRequest,
+    response: HttpResponse,
+    sort: str = "id",
+    q: str | None = None,
+    topic: int | None = None,
+) -> HttpResponse:
+    """Blog post list API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        response (HttpResponse): Temporal response for the validator headers.
+        sort (str, optional): Sort list by sort value, "id", "title",
+            "created_at" and "comment_count" are indexed for cursor
+            pagination. Defaults to "id".
+        q (str | None, optional): Full text search, results are sorted by
+            relevance. Defaults to None.
+        topic (int | None, optional): Filter by topic, including its subtopics.
+            Defaults to None.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    query_set = BlogPost.objects.all()
+    if topic:
+        query_set = query_set.in_topic(await aget_object_or_404(Topic, pk=topic))
+    query_set = query_set.search(q) if q else query_set.order_by(sort)
+    await acheck_conditions(request, query_set, POST_VALIDATORS, response)
+    return query_set
+
+
+@router.get(
+    "/blog_post/export",
+    url_name="blog_post_export",
+    response={HTTPStatus.UNAUTHORIZED: Message},
+)
+async def export_blog_post(
+    request: HttpRequest,
+    file_format: ExportFormat = "ndjson",
+    gzip: bool = False,  # noqa: FBT001, FBT002
+) -> HttpResponse:
+    """Blog post export API streaming every blog post.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        file_format (ExportFormat, optional): "ndjson" or "csv". Defaults to
+            "ndjson".
+        gzip (bool, optional): Gzip the file. Defaults to False.
+
+    Returns:
+        HttpResponse: Blog posts file, or 401 without the view permission.
+    """
+    if not await request.user.ahas_perm("blog.view_blogpost"):
+        return HTTPStatus.UNAUTHORIZED, {"message": NO_PERMISSION}
+    query_set = BlogPost.objects.order_by("pk")
+    return aexport_response(
+        query_set, POST_EXPORT_COLUMNS, "blog_posts", file_format, compress=gzip
+    )
+
+
+router.get(
+    "/blog_post/autocomplete",
+    response=list[AutocompleteOut],
+    url_name="blog_post_autocomplete",
+    auth=sync_auth,
+)(api_v1.autocomplete_blog_post)
+
+
+@router.get("/blog_post/{post_id}", response=BlogPostOut, url_name="blog_post_detail")
+@cache_response(BlogPost, Topic)
+async def detail_blog_post(
+    request: HttpRequest, post_id: int, response: HttpResponse
+) -> HttpResponse:
+    """Blog post detail API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        post_id (int): BlogPost id.
+        response (HttpResponse): Temporal response for the validator headers.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    await acheck_conditions(
+        request, BlogPost.objects.filter(pk=post_id), POST_VALIDATORS, response
+    )
+    post = await aget_object_or_404(
+        optimize(BlogPost.objects.all(), BlogPostOut), pk=post_id
+    )
+    return HTTPStatus.OK, post
+
+
+router.get(
+    "/blog_post/{post_id}/series",
+    response=list[SeriesPostOut],
+    url_name="blog_post_series",
+    auth=sync_auth,
+)(api_v1.series_blog_post)
+router.post(
+    "/blog_post",
+    url_name="blog_post_create",
+    response=POST_WRITE_RESPONSES,
+    auth=sync_auth,
+)(api_v1.create_blog_post)
+router.put(
+    "/blog_post/{post_id}",
+    url_name="blog_post_update",
+    response=POST_WRITE_RESPONSES,
+    auth=sync_auth,
+)(api_v1.update_blog_post)
+router.patch(
+    "/blog_post/{post_id}",
+    url_name="blog_post_patch",
+    response=POST_WRITE_RESPONSES,
+    auth=sync_auth,
+)(api_v1.patch_blog_post)
+router.delete(
+    "/blog_post/{post_id}",
+    url_name="blog_post_delete",
+    response={
+        HTTPStatus.UNAUTHORIZED: Message,
+        HTTPStatus.NO_CONTENT: None,
+        HTTPStatus.OK: None,
+    },
+    auth=sync_auth,
+)(api_v1.delete_blog_post)
+
+
+@router.get(
+    "/comment/export",
+    url_name="comment_export",
+    response={HTTPStatus.UNAUTHORIZED: Message},
+)
+async def export_comment(
+    request: HttpRequest,
+    file_format: ExportFormat = "ndjson",
+    gzip: bool = False,  # noqa: FBT001, FBT002
+) -> HttpResponse:
+    """Comment export API streaming every comment.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        file_format (ExportFormat, optional): "ndjson" or "csv". Defaults to
+            "ndjson".
+        gzip (bool, optional): Gzip the file. Defaults to False.
+
+    Returns:
+        HttpResponse: Comments file, or 401 without the view permission.
+    """
+    if not await request.user.ahas_perm("blog.view_comment"):
+        return HTTPStatus.UNAUTHORIZED, {"message": NO_PERMISSION}
+    query_set = Comment.objects.order_by("pk")
+    return aexport_response(
+        query_set, COMMENT_EXPORT_COLUMNS, "comments", file_format, compress=gzip
+    )
@@ -1,3 +1,5 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
@@ -6,3 +8,15 @@ class BlogConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "blog"
+
+    def ready(self: Self) -> None:
+        """Invalidate cached API responses and fragments when blog models change.
+
+        Image renditions of deleted posts are deleted too.
+        """
+        from blog.models import BlogPost, Comment, Topic
+        from common.renditions import delete_renditions_on_delete
+        from main_project.cache import invalidate_on_change
+
+        invalidate_on_change(Topic, BlogPost, Comment)
+        delete_renditions_on_delete(BlogPost, "image")
@@ -0,0 +1,47 @@
+from hashlib import md5
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db.models import Model, Q
+
+from main_project.settings import AUTOCOMPLETE_CACHE_TIMEOUT, AUTOCOMPLETE_SIZE
+
+
+def get_choices(
+    model: type[Model], field: str, text: str, limit: int = AUTOCOMPLETE_SIZE
+) -> list[tuple[int, str]]:
+    """Get the best matches of a text field using the trigram index.
+
+    Results are cached briefly, so a burst of keystrokes hits the database once.
+
+    Args:
+        model (type[Model]): Model to search.
+        field (str): Trigram indexed field name.
+        text (str): Text typed by the user.
+        limit (int, optional): Max number of choices.
+            Defaults to AUTOCOMPLETE_SIZE.
+
+    Returns:
+        list[tuple[int, str]]: Primary key and field value of each match.
+    """
+    text = " ".join(text.split()).lower()
+    limit = max(1, min(limit, AUTOCOMPLETE_SIZE))
+    digest = md5(text.encode(), usedforsecurity=False).hexdigest()
+    key = f"autocomplete:{model._meta.label_lower}:{limit}:{digest}"  # noqa: SLF001
+
+    def query() -> list[tuple[int, str]]:
+        query_set = model.objects.all()
+        if text:
+            query_set = (
+                query_set.filter(
+                    Q(**{f"{field}__icontains": text})
+                    | Q(**{f"{field}__trigram_similar": text})
+                )
+                .annotate(similarity=TrigramSimilarity(field, text))
+                .order_by("-similarity", field)
+            )
+        else:
+            query_set = query_set.order_by(field)
+        return list(query_set.values_list("pk", field)[:limit])
+
+    return cache.get_or_set(key, query, AUTOCOMPLETE_CACHE_TIMEOUT)
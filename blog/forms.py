@@ -1,14 +1,38 @@
-from typing import ClassVar
+from typing import Any, ClassVar, Self
 
 from django import forms
 
 from blog.models import BlogPost, Comment, Topic
 
 
+class LazySelect(forms.Select):
+    """Select widget rendering only the selected option.
+
+    Other options are loaded on demand by the autocomplete views, so rendering
+    a form does not load the whole table.
+    """
+
+    def optgroups(
+        self: Self, name: str, value: list[str], attrs: dict[str, Any] | None = None
+    ) -> list[tuple[str | None, list[dict[str, Any]], int]]:
+        """Build options from the empty choice and the selected objects."""
+        options = [self.create_option(name, "", "--", not any(value), 0, attrs=attrs)]
+        selected = [item for item in value if item]
+        if selected:
+            query_set = self.choices.queryset.filter(pk__in=selected)
+            options += [
+                self.create_option(name, obj.pk, str(obj), True, index, attrs=attrs)  # noqa: FBT003
+                for index, obj in enumerate(query_set, start=1)
+            ]
+        return [(None, options, 0)]
+
+
 class TopicForm(forms.ModelForm):
     """Topic form."""
 
-    parent_topic = forms.ModelChoiceField(queryset=Topic.objects.all(), required=False)
+    parent_topic = forms.ModelChoiceField(
+        queryset=Topic.objects.all(), required=False, widget=LazySelect
+    )
 
     class Meta:
         """Class meta data."""
@@ -31,6 +55,10 @@ class BlogPostForm(forms.ModelForm):
             "content",
             "previous",
         ]
+        widgets: ClassVar[dict[str, type[forms.Widget]]] = {
+            "topic": LazySelect,
+            "previous": LazySelect,
+        }
 
 
 class CommentForm(forms.ModelForm):
@@ -0,0 +1,342 @@
+import json
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import batched
+from pathlib import Path, PurePosixPath
+from typing import Any, Self
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from authentication.models import User
+from blog.models import PATH_SEPARATOR, BlogPost, Topic
+from main_project.cache import invalidate
+
+BATCH_SIZE = 5000
+IMAGE_WORKERS = 8
+FRONT_MATTER = "---"
+INVALID_SOURCE = "Source must be a .jsonl file or a directory of .md files."
+NEXT_IDS_SQL = """
+SELECT nextval(pg_get_serial_sequence('blog_blogpost', 'id'))
+FROM generate_series(1, %(count)s)
+"""
+COPY_POSTS_SQL = """
+COPY blog_blogpost (
+    id, title, topic_id, author_id, created_at, updated_at, content,
+    image_renditions, series_position, comment_count, content_html, content_hash
+) FROM STDIN
+"""
+LINK_PREVIOUS_SQL = """
+UPDATE blog_blogpost post SET previous_id = link.previous_id
+FROM unnest(%(ids)s::bigint[], %(previous)s::bigint[]) AS link(id, previous_id)
+WHERE post.id = link.id
+"""
+# Number the imported series from their first post, like BlogPost.save.
+SERIES_SQL = """
+WITH RECURSIVE chain(id, series_id, position) AS (
+    SELECT id, id, 0 FROM blog_blogpost
+    WHERE id = ANY(%(ids)s) AND previous_id IS NULL
+    UNION ALL
+    SELECT post.id, chain.series_id, chain.position + 1
+    FROM blog_blogpost post JOIN chain ON post.previous_id = chain.id
+)
+UPDATE blog_blogpost
+SET series_id = chain.series_id, series_position = chain.position
+FROM chain WHERE blog_blogpost.id = chain.id
+"""
+# Posts never reached from a first post follow a loop, they start a series.
+BREAK_LOOPS_SQL = """
+UPDATE blog_blogpost SET previous_id = NULL, series_id = id, series_position = 0
+WHERE id = ANY(%(ids)s) AND series_id IS NULL
+"""
+
+
+class Command(BaseCommand):
+    """Bulk import blog posts and topics."""
+
+    help = (
+        "Import blog posts from a JSONL file or a directory of Markdown files "
+        "with front-matter. Each post has a title and content, and optionally a "
+        "key, topic path (e.g. Python/Django), author email, created_at, the key "
+        "of its previous post and an image path relative to the source. Posts "
+        "are loaded with COPY in a single transaction, run render_posts and "
+        "render_images afterwards to render their HTML and image renditions."
+    )
+
+    def add_arguments(self: Self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        parser.add_argument("source", type=Path, help="JSONL file or directory.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=IMAGE_WORKERS,
+            help="Threads copying images to the storage.",
+        )
+
+    def handle(self: Self, *args: str, **options: Any) -> None:  # noqa: ARG002, ANN401
+        """Django handle command.
+
+        Raises:
+            CommandError: Raised if the source is not a JSONL file or directory.
+        """
+        source = options["source"]
+        if source.is_dir():
+            records, base = _read_markdown(source), source
+        elif source.suffix == ".jsonl":
+            records, base = _read_jsonl(source), source.parent
+        else:
+            raise CommandError(INVALID_SOURCE)
+        importer = Importer()
+        with transaction.atomic():
+            for batch in batched(records, options["batch_size"], strict=False):
+                importer.copy_posts(batch)
+            importer.link_previous()
+            invalidate(Topic)
+            invalidate(BlogPost)
+        images = importer.attach_images(base, options["workers"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {len(importer.post_ids)} posts, "
+                f"{importer.created_topics} topics and {images} images."
+            )
+        )
+        for warning in importer.warnings():
+            self.stdout.write(self.style.WARNING(warning))
+
+
+class Importer:
+    """Load posts with COPY, resolving topics and authors per batch."""
+
+    def __init__(self: Self) -> None:
+        """Create an importer."""
+        self.topics: dict[str, tuple[int, str]] = {}
+        self.authors: dict[str, int | None] = {}
+        self.keys: dict[str, int] = {}
+        self.post_ids: list[int] = []
+        self.previous: list[tuple[int, str]] = []
+        self.images: list[tuple[int, str]] = []
+        self.created_topics = 0
+        self.unknown_authors: set[str] = set()
+        self.unknown_previous = 0
+        self.missing_images = 0
+
+    def copy_posts(self: Self, records: tuple[dict, ...]) -> None:
+        """Insert a batch of posts with a single COPY.
+
+        Primary keys are taken from the sequence beforehand, so previous links
+        and images can be attached to the copied rows.
+
+        Args:
+            records (tuple[dict, ...]): Post records.
+        """
+        self._resolve_topics({record["topic"] for record in records})
+        self._resolve_authors({record["author"] for record in records})
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(NEXT_IDS_SQL, {"count": len(records)})
+            ids = [pk for (pk,) in cursor.fetchall()]
+            with cursor.copy(COPY_POSTS_SQL) as copy:
+                for pk, record in zip(ids, records, strict=True):
+                    copy.write_row(
+                        (
+                            pk,
+                            record["title"],
+                            self._topic_id(record["topic"]),
+                            self.authors.get(record["author"]),
+                            _created_at(record["created_at"]) or now,
+                            now,
+                            record["content"],
+                            "{}",
+                            0,
+                            0,
+                            "",
+                            "",
+                        )
+                    )
+        for pk, record in zip(ids, records, strict=True):
+            if record["key"]:
+                self.keys[record["key"]] = pk
+            if record["previous"]:
+                self.previous.append((pk, record["previous"]))
+            if record["image"]:
+                self.images.append((pk, record["image"]))
+        self.post_ids.extend(ids)
+
+    def link_previous(self: Self) -> None:
+        """Set the previous post and series of every imported post at once."""
+        links = [(pk, self.keys[key]) for pk, key in self.previous if key in self.keys]
+        self.unknown_previous = len(self.previous) - len(links)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                LINK_PREVIOUS_SQL,
+                {
+                    "ids": [pk for pk, _ in links],
+                    "previous": [previous for _, previous in links],
+                },
+            )
+            cursor.execute(SERIES_SQL, {"ids": self.post_ids})
+            cursor.execute(BREAK_LOOPS_SQL, {"ids": self.post_ids})
+
+    def attach_images(self: Self, base: Path, workers: int) -> int:
+        """Copy the images of imported posts to the storage in a thread pool.
+
+        Args:
+            base (Path): Directory image paths are relative to.
+            workers (int): Number of threads.
+
+        Returns:
+            int: Number of attached images.
+        """
+        stored = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            names = executor.map(_store_image, (base / path for _, path in self.images))
+            for (pk, _), name in zip(self.images, names, strict=True):
+                if name is None:
+                    self.missing_images += 1
+                else:
+                    stored.append(BlogPost(pk=pk, image=name))
+        BlogPost.objects.bulk_update(stored, ["image"], batch_size=BATCH_SIZE)
+        return len(stored)
+
+    def warnings(self: Self) -> list[str]:
+        """Describe the records imported partially."""
+        warnings = []
+        if self.unknown_authors:
+            warnings.append(
+                f"{len(self.unknown_authors)} unknown authors, their posts have "
+                "no author."
+            )
+        if self.unknown_previous:
+            warnings.append(
+                f"{self.unknown_previous} previous posts not found in the source."
+            )
+        if self.missing_images:
+            warnings.append(f"{self.missing_images} image files not found.")
+        return warnings
+
+    def _resolve_topics(self: Self, paths: set[str | None]) -> None:
+        """Load the topics of paths by name, creating the missing ones.
+
+        Missing topics are created with one insert per tree level. Topics that
+        already exist keep their parent.
+
+        Args:
+            paths (set[str | None]): Topic paths, names split by "/".
+        """
+        chains = [names for path in paths if path and (names := _topic_names(path))]
+        missing = {name for chain in chains for name in chain} - self.topics.keys()
+        self.topics.update(
+            (name, (pk, path))
+            for name, pk, path in Topic.objects.filter(name__in=missing).values_list(
+                "name", "pk", "path"
+            )
+        )
+        for level in range(max(map(len, chains), default=0)):
+            parents = {
+                chain[level]: chain[level - 1] if level else None
+                for chain in chains
+                if len(chain) > level and chain[level] not in self.topics
+            }
+            topics = Topic.objects.bulk_create(
+                Topic(
+                    name=name,
+                    parent_topic_id=parent and self.topics[parent][0],
+                )
+                for name, parent in parents.items()
+            )
+            for topic in topics:
+                parent = parents[topic.name]
+                parent_path = self.topics[parent][1] if parent else ""
+                topic.path = f"{parent_path}{topic.pk}{PATH_SEPARATOR}"
+                self.topics[topic.name] = (topic.pk, topic.path)
+            Topic.objects.bulk_update(topics, ["path"])
+            self.created_topics += len(topics)
+
+    def _resolve_authors(self: Self, emails: set[str | None]) -> None:
+        """Load the primary keys of authors by email."""
+        new_emails = {email for email in emails if email} - self.authors.keys()
+        found = dict(
+            User.objects.filter(email__in=new_emails).values_list("email", "pk")
+        )
+        for email in new_emails:
+            self.authors[email] = found.get(email)
+            if email not in found:
+                self.unknown_authors.add(email)
+
+    def _topic_id(self: Self, path: str | None) -> int | None:
+        """Get the primary key of the last topic of a path."""
+        names = _topic_names(path) if path else []
+        return self.topics[names[-1]][0] if names else None
+
+
+def _read_jsonl(path: Path) -> Iterator[dict]:
+    """Read post records of a JSONL file, one object per line."""
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield _record(json.loads(line))
+
+
+def _read_markdown(directory: Path) -> Iterator[dict]:
+    """Read post records of Markdown files, keyed by file name.
+
+    Front-matter is a block of "name: value" lines between "---" lines at the
+    start of the file, the rest of the file is the post content.
+    """
+    for path in sorted(directory.glob("*.md")):
+        text = path.read_text(encoding="utf-8")
+        fields = {"key": path.stem}
+        first, _, rest = text.partition("\n")
+        if first.strip() == FRONT_MATTER:
+            front_matter, _, text = rest.partition(f"\n{FRONT_MATTER}\n")
+            for line in front_matter.splitlines():
+                name, _, value = line.partition(":")
+                if value.strip():
+                    fields[name.strip()] = value.strip()
+        yield _record({**fields, "content": text.strip()})
+
+
+def _record(fields: dict) -> dict:
+    """Normalize a post record, optional fields default to None."""
+    optional = ("key", "topic", "author", "created_at", "previous", "image")
+    record = {name: fields.get(name) or None for name in optional}
+    record["key"] = record["key"] and str(record["key"])
+    record["previous"] = record["previous"] and str(record["previous"])
+    return {**record, "title": fields["title"], "content": fields["content"]}
+
+
+def _topic_names(path: str) -> list[str]:
+    """Split a topic path in names, from the root topic."""
+    return [name.strip() for name in path.split(PATH_SEPARATOR) if name.strip()]
+
+
+def _created_at(value: str | None) -> datetime | None:
+    """Parse a creation date, naive dates are in the current time zone."""
+    created_at = parse_datetime(value) if value else None
+    if created_at and timezone.is_naive(created_at):
+        return timezone.make_aware(created_at)
+    return created_at
+
+
+def _store_image(path: Path) -> str | None:
+    """Copy an image file to the storage.
+
+    Args:
+        path (Path): Image file.
+
+    Returns:
+        str | None: Storage name, None if the file does not exist.
+    """
+    if not path.is_file():
+        return None
+    with path.open("rb") as file:
+        return default_storage.save(
+            str(PurePosixPath(BlogPost.image.field.upload_to, path.name)), File(file)
+        )
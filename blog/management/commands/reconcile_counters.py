@@ -0,0 +1,61 @@
+from typing import Self
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+# Writers are blocked while counting, so no trigger update is lost.
+LOCK_SQL = "LOCK TABLE blog_topic, blog_blogpost, blog_comment IN SHARE MODE"
+RECONCILE_POSTS_SQL = """
+UPDATE blog_blogpost post
+SET comment_count = counted.comment_count, last_comment_at = counted.last_comment_at
+FROM (
+    SELECT
+        post.id,
+        count(comment.id) AS comment_count,
+        max(comment.created_at) AS last_comment_at
+    FROM blog_blogpost post
+    LEFT JOIN blog_comment comment ON comment.blog_post_id = post.id
+    GROUP BY post.id
+) counted
+WHERE post.id = counted.id
+AND (post.comment_count, post.last_comment_at)
+    IS DISTINCT FROM (counted.comment_count, counted.last_comment_at)
+"""
+RECONCILE_TOPICS_SQL = """
+UPDATE blog_topic topic
+SET post_count = counted.post_count, tree_post_count = counted.tree_post_count
+FROM (
+    SELECT
+        topic.id,
+        count(post.id) FILTER (WHERE post.topic_id = topic.id) AS post_count,
+        count(post.id) AS tree_post_count
+    FROM blog_topic topic
+    JOIN blog_topic sub ON starts_with(sub.path, topic.path)
+    LEFT JOIN blog_blogpost post ON post.topic_id = sub.id
+    GROUP BY topic.id
+) counted
+WHERE topic.id = counted.id
+AND (topic.post_count, topic.tree_post_count)
+    IS DISTINCT FROM (counted.post_count, counted.tree_post_count)
+"""
+
+
+class Command(BaseCommand):
+    """Repair the comment and post counters."""
+
+    help = (
+        "Recount the comments of posts and the posts of topics and repair the "
+        "counters that drifted. Writes to blog tables wait until it finishes."
+    )
+
+    def handle(self: Self, *args: str, **options: str) -> None:  # noqa:ARG002
+        """Django handle command."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(LOCK_SQL)
+            cursor.execute(RECONCILE_POSTS_SQL)
+            posts = cursor.rowcount
+            cursor.execute(RECONCILE_TOPICS_SQL)
+            topics = cursor.rowcount
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired {posts} posts and {topics} topics.")
+        )
@@ -0,0 +1,55 @@
+from argparse import ArgumentParser
+from typing import Any, Self
+
+from django.core.management.base import BaseCommand
+
+from blog.models import BlogPost
+from blog.rendering import content_hash, render_markdown
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """Render blog post Markdown to HTML."""
+
+    help = "Render stale blog post HTML, e.g. after Markdown extensions change."
+
+    def add_arguments(self: Self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Render every post, not only the ones with a stale hash.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self: Self, *args: str, **options: Any) -> None:  # noqa: ARG002, ANN401
+        """Django handle command."""
+        posts = BlogPost.objects.only("content", "content_hash").order_by("pk")
+        batch: list[BlogPost] = []
+        rendered = 0
+        for post in posts.iterator(chunk_size=options["batch_size"]):
+            digest = content_hash(post.content)
+            if not options["all"] and post.content_hash == digest:
+                continue
+            post.content_html = render_markdown(post.content)
+            post.content_hash = digest
+            batch.append(post)
+            if len(batch) >= options["batch_size"]:
+                rendered += self._update(batch)
+        rendered += self._update(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} posts."))
+
+    @staticmethod
+    def _update(batch: list[BlogPost]) -> int:
+        """Store a batch of rendered posts and empty it.
+
+        Args:
+            batch (list[BlogPost]): Rendered posts.
+
+        Returns:
+            int: Number of stored posts.
+        """
+        count = BlogPost.objects.bulk_update(batch, ["content_html", "content_hash"])
+        batch.clear()
+        return count
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    """Build materialized paths of existing topics, breaking parent cycles."""
+    Topic = apps.get_model("blog", "Topic")
+    parents = dict(Topic.objects.values_list("pk", "parent_topic_id"))
+    paths = {}
+
+    def build_path(pk, visited):
+        if pk in paths:
+            return paths[pk]
+        parent = parents[pk]
+        if parent is None or parent in visited:
+            paths[pk] = f"{pk}/"
+        else:
+            paths[pk] = f"{build_path(parent, visited | {pk})}{pk}/"
+        return paths[pk]
+
+    topics = list(Topic.objects.all())
+    for topic in topics:
+        topic.path = build_path(topic.pk, {topic.pk})
+    Topic.objects.bulk_update(topics, ["path"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-17 23:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_series(apps, schema_editor):
+    """Number existing posts along their previous chains, breaking cycles."""
+    BlogPost = apps.get_model("blog", "BlogPost")
+    previous = dict(BlogPost.objects.values_list("pk", "previous_id"))
+    series = {}
+
+    def build_series(pk, visited):
+        if pk in series:
+            return series[pk]
+        parent = previous[pk]
+        if parent is None or parent in visited:
+            series[pk] = (pk, 0)
+        else:
+            series_id, position = build_series(parent, visited | {pk})
+            series[pk] = (series_id, position + 1)
+        return series[pk]
+
+    posts = list(BlogPost.objects.only("pk", "previous"))
+    for post in posts:
+        post.series_id, post.series_position = build_series(post.pk, {post.pk})
+    BlogPost.objects.bulk_update(
+        posts, ["series", "series_position"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_topic_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='series',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.blogpost'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='series_position',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='previous',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_posts', to='blog.blogpost'),
+        ),
+        migrations.RunPython(populate_series, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['series', 'series_position'], name='blog_post_series_idx'),
+        ),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 5.2 on 2026-10-18 00:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+COMMENT_COUNTERS_SQL = """
+CREATE FUNCTION blog_comment_counters() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE blog_blogpost SET
+            comment_count = greatest(comment_count - 1, 0),
+            last_comment_at = CASE
+                WHEN last_comment_at > OLD.created_at THEN last_comment_at
+                ELSE (
+                    SELECT max(created_at) FROM blog_comment
+                    WHERE blog_post_id = OLD.blog_post_id
+                )
+            END
+        WHERE id = OLD.blog_post_id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        UPDATE blog_blogpost SET
+            comment_count = comment_count + 1,
+            last_comment_at = greatest(last_comment_at, NEW.created_at)
+        WHERE id = NEW.blog_post_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER blog_comment_counters
+AFTER INSERT OR DELETE ON blog_comment
+FOR EACH ROW EXECUTE FUNCTION blog_comment_counters();
+
+CREATE TRIGGER blog_comment_counters_move
+AFTER UPDATE OF blog_post_id ON blog_comment
+FOR EACH ROW WHEN (OLD.blog_post_id IS DISTINCT FROM NEW.blog_post_id)
+EXECUTE FUNCTION blog_comment_counters();
+"""
+DROP_COMMENT_COUNTERS_SQL = """
+DROP TRIGGER blog_comment_counters_move ON blog_comment;
+DROP TRIGGER blog_comment_counters ON blog_comment;
+DROP FUNCTION blog_comment_counters();
+"""
+# The topic and its ancestors are the primary keys of its materialized path.
+POST_COUNTERS_SQL = """
+CREATE FUNCTION blog_post_counters() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.topic_id IS NOT NULL THEN
+        UPDATE blog_topic SET
+            post_count = greatest(post_count - (id = OLD.topic_id)::int, 0),
+            tree_post_count = greatest(tree_post_count - 1, 0)
+        WHERE id = OLD.topic_id OR id = ANY(string_to_array(rtrim(
+            (SELECT path FROM blog_topic WHERE id = OLD.topic_id), '/'
+        ), '/')::bigint[]);
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.topic_id IS NOT NULL THEN
+        UPDATE blog_topic SET
+            post_count = post_count + (id = NEW.topic_id)::int,
+            tree_post_count = tree_post_count + 1
+        WHERE id = NEW.topic_id OR id = ANY(string_to_array(rtrim(
+            (SELECT path FROM blog_topic WHERE id = NEW.topic_id), '/'
+        ), '/')::bigint[]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER blog_post_counters
+AFTER INSERT OR DELETE ON blog_blogpost
+FOR EACH ROW EXECUTE FUNCTION blog_post_counters();
+
+CREATE TRIGGER blog_post_counters_move
+AFTER UPDATE OF topic_id ON blog_blogpost
+FOR EACH ROW WHEN (OLD.topic_id IS DISTINCT FROM NEW.topic_id)
+EXECUTE FUNCTION blog_post_counters();
+"""
+DROP_POST_COUNTERS_SQL = """
+DROP TRIGGER blog_post_counters_move ON blog_blogpost;
+DROP TRIGGER blog_post_counters ON blog_blogpost;
+DROP FUNCTION blog_post_counters();
+"""
+POPULATE_COUNTERS_SQL = """
+UPDATE blog_blogpost post
+SET comment_count = counted.comment_count, last_comment_at = counted.last_comment_at
+FROM (
+    SELECT blog_post_id, count(*) AS comment_count, max(created_at) AS last_comment_at
+    FROM blog_comment GROUP BY blog_post_id
+) counted
+WHERE post.id = counted.blog_post_id;
+
+UPDATE blog_topic topic
+SET post_count = counted.post_count, tree_post_count = counted.tree_post_count
+FROM (
+    SELECT
+        topic.id,
+        count(post.id) FILTER (WHERE post.topic_id = topic.id) AS post_count,
+        count(post.id) AS tree_post_count
+    FROM blog_topic topic
+    JOIN blog_topic sub ON starts_with(sub.path, topic.path)
+    JOIN blog_blogpost post ON post.topic_id = sub.id
+    GROUP BY topic.id
+) counted
+WHERE topic.id = counted.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_comment_post_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='tree_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(COMMENT_COUNTERS_SQL, DROP_COMMENT_COUNTERS_SQL),
+        migrations.RunSQL(POST_COUNTERS_SQL, DROP_POST_COUNTERS_SQL),
+        migrations.RunSQL(POPULATE_COUNTERS_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['comment_count', 'id'], name='blog_post_comment_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['post_count', 'id'], name='blog_topic_post_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['tree_post_count', 'id'], name='blog_topic_tree_count_id_idx'),
+        ),
+    ]
@@ -1,48 +1,527 @@
-from typing import ClassVar, Self
+from collections.abc import Iterable
+from functools import partial
+from typing import Any, ClassVar, Self
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models.functions import Cast, Concat, Greatest, Length, Substr, Upper
+from django.utils import timezone
+from django.utils.functional import cached_property
 
 from authentication.models import User
+from blog.rendering import content_hash
+from common.renditions import prepare_renditions, schedule_renditions
+
+PATH_SEPARATOR = "/"
+TOPIC_CYCLE_ERROR = "A topic cannot be its own parent or a parent of its ancestors."
+TOPIC_COUNTERS = ("post_count", "tree_post_count")
+POST_COUNTERS = ("comment_count", "last_comment_at")
+
+
+def _saved_fields(
+    instance: models.Model,
+    update_fields: Iterable[str] | None,
+    counters: tuple[str, ...],
+) -> Iterable[str] | None:
+    """Get the fields to save, leaving out trigger maintained counters.
+
+    Saving a loaded instance would otherwise write back stale counter values.
+
+    Args:
+        instance (models.Model): Instance being saved.
+        update_fields (Iterable[str] | None): Fields passed to ``save()``.
+        counters (tuple[str, ...]): Counter field names.
+
+    Returns:
+        Iterable[str] | None: Update fields, unchanged for new instances or
+            explicit fields.
+    """
+    if update_fields is not None or instance._state.adding:  # noqa: SLF001
+        return update_fields
+    deferred = instance.get_deferred_fields()
+    return [
+        field.name
+        for field in instance._meta.concrete_fields  # noqa: SLF001
+        if not field.primary_key
+        and not field.generated
+        and field.attname not in deferred
+        and field.name not in counters
+    ]
+
+
+class TopicQuerySet(models.QuerySet):
+    """Topic queryset."""
+
+    def tree(self: Self) -> list[dict]:
+        """Build nested topic trees with a single query.
+
+        Topics whose parent is not part of the queryset are returned as roots.
+
+        Returns:
+            list[dict]: Root nodes with id, name and children keys.
+        """
+        nodes: dict[str, dict] = {}
+        roots: list[dict] = []
+        for pk, name, path in self.order_by("path").values_list("pk", "name", "path"):
+            node = {"id": pk, "name": name, "children": []}
+            nodes[path] = node
+            parent_path = path[: path.rstrip(PATH_SEPARATOR).rfind(PATH_SEPARATOR) + 1]
+            parent = nodes.get(parent_path)
+            if parent is None:
+                roots.append(node)
+            else:
+                parent["children"].append(node)
+        return roots
 
 
 class Topic(models.Model):
-    """Topic model."""
+    """Topic model.
+
+    The path field stores the materialized path of primary keys from the root
+    topic down to the instance, e.g. "1/5/12/". It is kept in sync on save and
+    delete, so subtrees are fetched with a single prefix query on its index.
+
+    post_count counts the posts of the topic and tree_post_count the posts of
+    the topic and all of its subtopics. Both are maintained by database
+    triggers on blog posts, moves and deletes of topics are applied on save
+    and delete.
+    """
 
     name = models.CharField(max_length=50, blank=False, unique=True)
     parent_topic = models.ForeignKey(
         "Topic", blank=True, null=True, on_delete=models.SET_NULL
     )
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    tree_post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = TopicQuerySet.as_manager()
+
+    class Meta:
+        """Model meta data."""
+
+        indexes: ClassVar[list[models.Index]] = [
+            GinIndex(
+                fields=["name"],
+                name="blog_topic_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            # Serves icontains, that compares UPPER() of the name.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="blog_topic_name_upper_trgm_idx",
+            ),
+            models.Index(fields=["name", "id"], name="blog_topic_name_id_idx"),
+            models.Index(
+                fields=["post_count", "id"], name="blog_topic_post_count_id_idx"
+            ),
+            models.Index(
+                fields=["tree_post_count", "id"], name="blog_topic_tree_count_id_idx"
+            ),
+        ]
 
     def __str__(self: Self) -> str:
         """String representation of the model."""
         return f"{self.name}"
 
+    def save(self: Self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Save topic and keep materialized paths of the subtree in sync.
+
+        Raises:
+            ValidationError: Raised if the parent topic is a descendant.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "parent_topic" not in update_fields:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            parent_path = ""
+            if self.parent_topic_id:
+                parent_path = Topic.objects.values_list("path", flat=True).get(
+                    pk=self.parent_topic_id
+                )
+                if self._is_ancestor_of(parent_path):
+                    raise ValidationError({"parent_topic": TOPIC_CYCLE_ERROR})
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                self.path = f"{parent_path}{self.pk}{PATH_SEPARATOR}"
+                Topic.objects.filter(pk=self.pk).update(path=self.path)
+                return
+            old_path, tree_post_count = (
+                Topic.objects.select_for_update()
+                .values_list("path", "tree_post_count")
+                .get(pk=self.pk)
+            )
+            self.path = f"{parent_path}{self.pk}{PATH_SEPARATOR}"
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "path"}
+            kwargs["update_fields"] = _saved_fields(
+                self, kwargs.get("update_fields"), TOPIC_COUNTERS
+            )
+            super().save(*args, **kwargs)
+            if old_path != self.path:
+                self._descendants(old_path).update(
+                    path=Concat(
+                        models.Value(self.path),
+                        Substr("path", len(old_path) + 1),
+                        output_field=models.CharField(),
+                    )
+                )
+                self._add_tree_posts(old_path, -tree_post_count)
+                self._add_tree_posts(parent_path, tree_post_count)
+
+    def delete(self: Self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:  # noqa: ANN401
+        """Delete topic, its children become root topics.
+
+        The posts of the topic itself are removed from the ancestor counters
+        by the trigger when their topic is set to null.
+        """
+        with transaction.atomic():
+            post_count, tree_post_count = (
+                Topic.objects.select_for_update()
+                .values_list("post_count", "tree_post_count")
+                .get(pk=self.pk)
+            )
+            self._add_tree_posts(self.path, post_count - tree_post_count)
+            # Their topic is set to null, it shows in their API responses.
+            now = timezone.now()
+            Topic.objects.filter(parent_topic=self).update(updated_at=now)
+            BlogPost.objects.filter(topic=self).update(updated_at=now)
+            self._descendants(self.path).update(path=Substr("path", len(self.path) + 1))
+            return super().delete(*args, **kwargs)
+
+    @property
+    def depth(self: Self) -> int:
+        """Number of ancestors of the topic."""
+        return self.path.count(PATH_SEPARATOR) - 1
+
+    def clean(self: Self) -> None:
+        """Validate the parent topic does not create a cycle.
+
+        Raises:
+            ValidationError: Raised if the parent topic is a descendant.
+        """
+        if self.parent_topic_id and self._is_ancestor_of(self.parent_topic.path):
+            raise ValidationError({"parent_topic": TOPIC_CYCLE_ERROR})
+
+    def ancestors(self: Self) -> TopicQuerySet:
+        """Get ancestors ordered from the root topic down to the parent topic."""
+        pks = self._path_pks(self.path)[:-1]
+        return Topic.objects.filter(pk__in=pks).order_by(Length("path"))
+
+    def descendants(self: Self, *, include_self: bool = False) -> TopicQuerySet:
+        """Get all topics below this topic, ordered by path."""
+        query_set = Topic.objects.filter(path__startswith=self.path)
+        if not include_self:
+            query_set = query_set.exclude(pk=self.pk)
+        return query_set.order_by("path")
+
+    def tree(self: Self) -> dict:
+        """Get this topic and its descendants as a nested tree."""
+        return self.descendants(include_self=True).tree()[0]
+
+    def _is_ancestor_of(self: Self, path: str) -> bool:
+        """Check if the instance is part of the given materialized path."""
+        return self.pk is not None and str(self.pk) in path.split(PATH_SEPARATOR)
+
+    def _add_tree_posts(self: Self, path: str, count: int) -> None:
+        """Add posts to the subtree counters of the topics of a path.
+
+        Args:
+            path (str): Materialized path, the instance itself is skipped.
+            count (int): Number of posts to add, negative to remove.
+        """
+        pks = [pk for pk in self._path_pks(path) if pk != self.pk]
+        if pks and count:
+            Topic.objects.filter(pk__in=pks).update(
+                tree_post_count=Greatest(models.F("tree_post_count") + count, 0)
+            )
+
+    @staticmethod
+    def _path_pks(path: str) -> list[int]:
+        """Get the primary keys of a materialized path, root first."""
+        return [int(pk) for pk in path.split(PATH_SEPARATOR) if pk]
+
+    @staticmethod
+    def _descendants(path: str) -> TopicQuerySet:
+        """Get descendants of a path, the topic itself excluded."""
+        return Topic.objects.filter(path__startswith=path).exclude(path=path)
+
+
+SERIES_CYCLE_ERROR = "A post cannot follow itself or one of its next posts."
+# Walk the previous chain upwards, UNION stops on rows already visited.
+SERIES_CHAIN_SQL = """
+WITH RECURSIVE chain(id, previous_id) AS (
+    SELECT id, previous_id FROM blog_blogpost WHERE id = %(start)s
+    UNION
+    SELECT post.id, post.previous_id
+    FROM blog_blogpost post JOIN chain ON post.id = chain.previous_id
+)
+SELECT EXISTS (SELECT 1 FROM chain WHERE id = %(post)s)
+"""
+# Number every post following the given post and move them to its series.
+SERIES_UPDATE_SQL = """
+WITH RECURSIVE chain(id, depth) AS (
+    SELECT %(post)s::bigint, 0
+    UNION ALL
+    SELECT post.id, chain.depth + 1
+    FROM blog_blogpost post JOIN chain ON post.previous_id = chain.id
+)
+UPDATE blog_blogpost
+SET series_id = %(series)s, series_position = %(position)s + chain.depth
+FROM chain WHERE blog_blogpost.id = chain.id
+"""
+SEARCH_CONFIG = "english"
+# Control characters never typed in posts, escaped content is safe to highlight.
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+POST_IMAGE_WIDTHS = [150, 300, 450, 900]
+
+
+class BlogPostQuerySet(models.QuerySet):
+    """Blog post queryset."""
+
+    def search(self: Self, text: str) -> Self:
+        """Full text search ranked by relevance.
+
+        Args:
+            text (str): Search text, parsed with web search syntax.
+
+        Returns:
+            Self: Matching posts annotated with rank and headline.
+        """
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        # ts_rank returns a real, cast it so the rank round trips exactly
+        # through API cursors.
+        return (
+            self.filter(search_vector=query)
+            .annotate(
+                rank=Cast(
+                    SearchRank(models.F("search_vector"), query), models.FloatField()
+                ),
+                headline=SearchHeadline(
+                    "content",
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HEADLINE_START,
+                    stop_sel=HEADLINE_STOP,
+                    max_words=35,
+                    min_words=15,
+                ),
+            )
+            .order_by("-rank", "id")
+        )
+
+    def in_topic(self: Self, topic: Topic) -> Self:
+        """Filter posts of a topic and all of its subtopics.
+
+        Args:
+            topic (Topic): Topic object.
+
+        Returns:
+            Self: Posts filtered by the topic path prefix.
+        """
+        return self.filter(topic__path__startswith=topic.path)
+
 
 class BlogPost(models.Model):
-    """Post model."""
+    """Post model.
+
+    comment_count and last_comment_at are maintained by database triggers on
+    comments, so they stay exact for bulk and cascading deletes too.
+    """
 
     title = models.CharField(max_length=200, blank=False)
     topic = models.ForeignKey(Topic, blank=True, null=True, on_delete=models.SET_NULL)
     author = models.ForeignKey(User, blank=False, null=True, on_delete=models.SET_NULL)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     image = models.ImageField(blank=True, null=True, upload_to="posts")
+    image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_renditions = models.JSONField(blank=True, default=dict, editable=False)
     content = models.CharField(blank=False)
     previous = models.ForeignKey(
-        "BlogPost", blank=True, null=True, on_delete=models.SET_NULL
+        "BlogPost",
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="next_posts",
+    )
+    series = models.ForeignKey(
+        "BlogPost",
+        null=True,
+        editable=False,
+        db_index=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
     )
+    series_position = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(blank=True, null=True, editable=False)
+    content_html = models.TextField(blank=True, default="", editable=False)
+    content_hash = models.CharField(
+        max_length=64, blank=True, default="", editable=False
+    )
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("content", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = BlogPostQuerySet.as_manager()
+
+    class Meta:
+        """Model meta data."""
+
+        indexes: ClassVar[list[models.Index]] = [
+            GinIndex(fields=["search_vector"], name="blog_post_search_idx"),
+            models.Index(
+                fields=["series", "series_position"], name="blog_post_series_idx"
+            ),
+            GinIndex(
+                fields=["title"],
+                name="blog_post_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="blog_post_title_upper_trgm_idx",
+            ),
+            models.Index(fields=["title", "id"], name="blog_post_title_id_idx"),
+            models.Index(fields=["created_at", "id"], name="blog_post_created_id_idx"),
+            models.Index(
+                fields=["comment_count", "id"], name="blog_post_comment_count_id_idx"
+            ),
+        ]
 
     def __str__(self: Self) -> str:
         """String representation of the model."""
         return f"{self.title}"
 
-    @property
-    def next(self: Self) -> "BlogPost":
-        """Get post that references this instance as previoues.
+    def save(self: Self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Save post and keep its series in sync with the previous post.
+
+        When the content changes the rendered HTML is cleared and rendered
+        again in the background once the transaction commits, the same goes
+        for the image renditions when the image changes.
+
+        Raises:
+            ValidationError: Raised if the previous post follows this post.
+        """
+        from blog.tasks import render_post_content, render_post_image
+
+        update_fields = kwargs.get("update_fields")
+        image_changed = update_fields is None or "image" in update_fields
+        if image_changed:
+            kwargs["update_fields"] = prepare_renditions(self, "image", update_fields)
+        stale = (
+            update_fields is None or "content" in update_fields
+        ) and self.content_hash != content_hash(self.content)
+        if stale:
+            self.content_html, self.content_hash = "", ""
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"],
+                    "content_html",
+                    "content_hash",
+                }
+        kwargs["update_fields"] = _saved_fields(
+            self, kwargs.get("update_fields"), POST_COUNTERS
+        )
+        if update_fields is not None and "previous" not in update_fields:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                if self._follows_itself():
+                    raise ValidationError({"previous": SERIES_CYCLE_ERROR})
+                changed = (
+                    self._state.adding
+                    or self.series_id is None
+                    or BlogPost.objects.values_list("previous", flat=True).get(
+                        pk=self.pk
+                    )
+                    != self.previous_id
+                )
+                super().save(*args, **kwargs)
+                if changed:
+                    self._update_series()
+        if stale:
+            transaction.on_commit(partial(render_post_content.delay, self.pk))
+        if image_changed:
+            schedule_renditions(self, "image", render_post_image)
+
+    def delete(self: Self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:  # noqa: ANN401
+        """Delete post, the posts following it start new series."""
+        with transaction.atomic():
+            next_posts = list(self.next_posts.all())
+            self.next_posts.update(updated_at=timezone.now())
+            deleted = super().delete(*args, **kwargs)
+            for post in next_posts:
+                post.previous = None
+                post._update_series()  # noqa: SLF001
+            return deleted
+
+    @cached_property
+    def next(self: Self) -> "BlogPost | None":
+        """Get post that references this instance as previous.
+
+        Uses the next_posts prefetch when available.
 
         Returns:
-            Post: Post object.
+            BlogPost | None: Post object.
+        """
+        return next(iter(self.next_posts.all()), None)
+
+    def clean(self: Self) -> None:
+        """Validate the previous post does not create a cycle.
+
+        Raises:
+            ValidationError: Raised if the previous post follows this post.
         """
-        return BlogPost.objects.filter(previous=self).first()
+        if self._follows_itself():
+            raise ValidationError({"previous": SERIES_CYCLE_ERROR})
+
+    def series_posts(self: Self) -> BlogPostQuerySet:
+        """Get all posts of the series ordered by position."""
+        return BlogPost.objects.filter(series_id=self.series_id).order_by(
+            "series_position", "id"
+        )
+
+    def _follows_itself(self: Self) -> bool:
+        """Check if the previous chain leads back to this post."""
+        if self.pk is None or self.previous_id is None:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SERIES_CHAIN_SQL, {"start": self.previous_id, "post": self.pk}
+            )
+            return cursor.fetchone()[0]
+
+    def _update_series(self: Self) -> None:
+        """Move this post and the posts following it to the previous post series."""
+        series_id, position = self.pk, 0
+        if self.previous_id:
+            series_id, position = BlogPost.objects.values_list(
+                "series", "series_position"
+            ).get(pk=self.previous_id)
+            series_id, position = series_id or self.previous_id, position + 1
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SERIES_UPDATE_SQL,
+                {"post": self.pk, "series": series_id, "position": position},
+            )
+        self.series_id, self.series_position = series_id, position
 
 
 class Comment(models.Model):
@@ -57,7 +536,47 @@ class Comment(models.Model):
         """Model meta date."""
 
         ordering: ClassVar[list[str]] = ["created_at"]
+        indexes: ClassVar[list[models.Index]] = [
+            models.Index(fields=["blog_post", "id"], name="blog_comment_post_id_idx"),
+        ]
 
     def __str__(self: Self) -> str:
         """String representation of the model."""
         return f"{self.author.email} - {self.blog_post.title}"
+
+    def save(self: Self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Save comment, new comments are queued for the post author digest."""
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            recipient_id = self.blog_post.author_id
+            if adding and recipient_id not in {None, self.author_id}:
+                CommentNotification.objects.create(
+                    recipient_id=recipient_id, comment=self
+                )
+
+
+class CommentNotification(models.Model):
+    """Comment waiting for the next notification digest of its recipient.
+
+    Rows are deleted once the digest is sent, so the table only holds the
+    pending notifications.
+    """
+
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, related_name="+"
+    )
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        """Model meta data."""
+
+        constraints: ClassVar[list[models.BaseConstraint]] = [
+            models.UniqueConstraint(
+                fields=["recipient", "comment"], name="blog_notification_unique"
+            ),
+        ]
+
+    def __str__(self: Self) -> str:
+        """String representation of the model."""
+        return f"{self.recipient_id} - {self.comment_id}"
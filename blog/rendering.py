@@ -0,0 +1,40 @@
+import hashlib
+import threading
+
+import markdown
+
+MARKDOWN_EXTENSIONS = ["fenced_code"]
+
+_local = threading.local()
+
+
+def render_markdown(text: str) -> str:
+    """Convert Markdown to HTML with a per thread cached converter.
+
+    Args:
+        text (str): Markdown source.
+
+    Returns:
+        str: Rendered HTML.
+    """
+    md = getattr(_local, "markdown", None)
+    if md is None:
+        md = _local.markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return md.reset().convert(text)
+
+
+def content_hash(text: str) -> str:
+    """Hash Markdown source together with the extensions that render it.
+
+    Changing the extensions changes every hash, so stale HTML can be found.
+
+    Args:
+        text (str): Markdown source.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256(",".join(MARKDOWN_EXTENSIONS).encode())
+    digest.update(b"\0")
+    digest.update(text.encode())
+    return digest.hexdigest()
@@ -1,16 +1,9 @@
 from pathlib import Path
 
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete
 from django.dispatch import receiver
 
-from blog.models import BlogPost, Comment
-from blog.tasks import send_email
-
-
-@receiver(post_save, sender=Comment)
-def notification_email(sender: BlogPost, instance: BlogPost, **kwargs: str) -> None:  # noqa:ARG001
-    """Send email when comment is saved."""
-    send_email.delay_on_commit(instance.pk)
+from blog.models import BlogPost
 
 
 @receiver(post_delete, sender=BlogPost)
@@ -1,17 +1,93 @@
-from django.core.mail import EmailMultiAlternatives
+from smtplib import SMTPException
 
-from blog.models import Comment
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+
+from blog.models import POST_IMAGE_WIDTHS, BlogPost, CommentNotification
+from blog.rendering import content_hash, render_markdown
 from celery import shared_task  # type: ignore[attr-defined]
+from common.renditions import render_field
+from main_project.settings import COMMENT_DIGEST_SIZE
+
+
+@shared_task(autoretry_for=(SMTPException, OSError), retry_backoff=True, max_retries=5)
+def send_comment_digests() -> int:
+    """Send one email per recipient with their pending comment notifications.
+
+    Every digest is sent and its notifications deleted in a transaction of
+    its own, on a single reused SMTP connection, opened only if notifications
+    are pending. Pending rows are locked with SKIP LOCKED, so overlapping runs
+    and retries never send a comment twice.
+
+    Returns:
+        int: Number of digests sent.
+    """
+    sent = 0
+    if not CommentNotification.objects.exists():
+        return sent
+    with get_connection() as connection:
+        while True:
+            with transaction.atomic():
+                pending = CommentNotification.objects.select_for_update(
+                    skip_locked=True, of=("self",)
+                )
+                recipient_id = (
+                    pending.order_by("pk").values_list("recipient", flat=True).first()
+                )
+                if recipient_id is None:
+                    return sent
+                notifications = list(
+                    pending.filter(recipient_id=recipient_id)
+                    .select_related(
+                        "recipient", "comment__author", "comment__blog_post"
+                    )
+                    .order_by("pk")[:COMMENT_DIGEST_SIZE]
+                )
+                connection.send_messages([_digest_message(notifications)])
+                CommentNotification.objects.filter(
+                    pk__in=[notification.pk for notification in notifications]
+                ).delete()
+            sent += 1
+
+
+def _digest_message(notifications: list[CommentNotification]) -> EmailMessage:
+    """Build the digest email of a recipient.
+
+    Args:
+        notifications (list[CommentNotification]): Notifications of a recipient.
+
+    Returns:
+        EmailMessage: Digest email.
+    """
+    lines = [
+        f'{item.comment.author.email} on "{item.comment.blog_post.title}":\n'
+        f"{item.comment.content}\n"
+        for item in notifications
+    ]
+    return EmailMessage(
+        subject=f"{len(notifications)} new comments on your posts",
+        body="\n".join(lines),
+        to=[notifications[0].recipient.email],
+    )
 
 
 @shared_task
-def send_email(commment_id: int) -> None:
-    """Send email when comment is updated."""
-    commment = Comment.objects.get(pk=commment_id)
-    email = EmailMultiAlternatives(
-        subject="Test",
-        body=f"{commment.comment}",
-        from_email="test@email.com",
-        to=["vitors.monteiro1@gmail.com"],
+def render_post_content(post_id: int) -> None:
+    """Render blog post Markdown and store the HTML with the source hash.
+
+    Posts deleted before the task runs are skipped.
+    """
+    content = (
+        BlogPost.objects.values_list("content", flat=True).filter(pk=post_id).first()
+    )
+    if content is None:
+        return
+    BlogPost.objects.filter(pk=post_id, content=content).update(
+        content_html=render_markdown(content), content_hash=content_hash(content)
     )
-    email.send()
+
+
+@shared_task
+def render_post_image(post_id: int) -> None:
+    """Create blog post image renditions."""
+    render_field(BlogPost, post_id, "image", POST_IMAGE_WIDTHS)
@@ -1,13 +1,31 @@
-import markdown
 from django import template
+from django.utils.html import escape
 from django.utils.safestring import SafeText, mark_safe
 
+from blog.models import HEADLINE_START, HEADLINE_STOP, BlogPost
+from blog.rendering import render_markdown
+
 register = template.Library()
 
 
 @register.filter
 def markdown_content(value: str) -> SafeText:
     """Convert Markdown content."""
-    md = markdown.Markdown(extensions=["fenced_code"])
-    content = md.convert(value)
+    return mark_safe(render_markdown(value))  # noqa:S308
+
+
+@register.filter
+def post_content(post: BlogPost) -> SafeText:
+    """Blog post HTML, rendered on the fly until the stored HTML is ready."""
+    if post.content_html:
+        return mark_safe(post.content_html)  # noqa:S308
+    return markdown_content(post.content)
+
+
+@register.filter
+def search_headline(value: str) -> SafeText:
+    """Escape search headline and highlight matched words."""
+    content = escape(value)
+    content = content.replace(HEADLINE_START, "<mark>")
+    content = content.replace(HEADLINE_STOP, "</mark>")
     return mark_safe(content)  # noqa:S308
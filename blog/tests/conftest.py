@@ -2,6 +2,7 @@ import pytest
 
 from authentication.models import User
 from blog.models import BlogPost, Comment, Topic
+from common.tests.query_budget import PAGE_SIZES
 
 pytestmark = pytest.mark.django_db
 
@@ -43,3 +44,27 @@ def comment_fixture(blog_post_fixture: BlogPost, user_fixture: User) -> Comment:
     return Comment.objects.create(
         blog_post=blog_post_fixture, author=user_fixture, content="test"
     )
+
+
+@pytest.fixture
+def blog_posts_fixture(topic_fixture: Topic) -> list[BlogPost]:
+    """Blog posts filling the largest page, each with its own author and topic.
+
+    Every post has a comment of its author, so pages reaching related rows per
+    item run more queries as they grow.
+    """
+    authors = User.objects.bulk_create(
+        User(email=f"author{index}@bar.com") for index in range(PAGE_SIZES[-1])
+    )
+    posts = []
+    for index, author in enumerate(authors):
+        topic = Topic.objects.create(name=f"topic{index}", parent_topic=topic_fixture)
+        posts.append(
+            BlogPost.objects.create(
+                title=f"Post {index}", topic=topic, author=author, content="content"
+            )
+        )
+    Comment.objects.bulk_create(
+        Comment(blog_post=post, author=post.author, content="test") for post in posts
+    )
+    return posts
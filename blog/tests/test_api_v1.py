@@ -1,15 +1,30 @@
+import base64
 import json
+from collections.abc import Callable
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
 from django.contrib.auth.models import Permission
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import Client
 from django.urls import reverse_lazy
+from pytest_django import DjangoAssertNumQueries
 
 from authentication.models import User
 from blog.api.api_v1 import NO_PERMISSION
-from blog.models import BlogPost, Topic
+from blog.models import (
+    SERIES_CYCLE_ERROR,
+    TOPIC_CYCLE_ERROR,
+    BlogPost,
+    Comment,
+    Topic,
+)
+from common.tests.query_budget import PAGE_SIZES, QueryBudget
+from main_project.cache import cache_stats
+from main_project.export import JSON_ENCODER
+from main_project.pagination import INVALID_CURSOR_ERROR
 
 pytestmark = pytest.mark.django_db
 
@@ -80,6 +95,125 @@ class TestTopicList:
         assert response.status_code == HTTPStatus.OK
         assert response.json() == expected
 
+    @staticmethod
+    def test_topic_list_cursor(
+        client: Client, topic_fixture: Topic, topic_fixture2: Topic, user_fixture: User
+    ) -> None:
+        """Test topic list API in cursor pagination mode."""
+        url = reverse_lazy("api-1.0.0:topic_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        query_params = {"sort": "name", "limit": 1, "cursor": ""}
+        response = client.get(url, headers=headers, query_params=query_params)
+        assert response.status_code == HTTPStatus.OK
+        page = response.json()
+        assert "count" not in page
+        assert [item["id"] for item in page["items"]] == [topic_fixture2.pk]
+        query_params["cursor"] = page["next_cursor"]
+        response = client.get(url, headers=headers, query_params=query_params)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            "items": [
+                {
+                    "id": topic_fixture.pk,
+                    "name": topic_fixture.name,
+                    "parent_topic": topic_fixture.parent_topic,
+                },
+            ],
+        }
+
+    @staticmethod
+    def test_topic_list_invalid_cursor(client: Client, user_fixture: User) -> None:
+        """Test topic list API with malformed cursors or from another sort."""
+        url = reverse_lazy("api-1.0.0:topic_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        bad_values = base64.urlsafe_b64encode(b'[["name", "id"], ["a", "x"]]')
+        for cursor in ["foo", "W1siaWQiXSwgWzFdXQ==", bad_values.decode()]:
+            response = client.get(
+                url,
+                headers=headers,
+                query_params={"sort": "name", "cursor": cursor},
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert response.json() == {"detail": INVALID_CURSOR_ERROR}
+
+
+class TestTopicTree:
+    """Tests topic tree API."""
+
+    @staticmethod
+    def test_tree(
+        client: Client, topic_fixture: Topic, topic_fixture2: Topic, user_fixture: User
+    ) -> None:
+        """Test topic tree API."""
+        other = Topic.objects.create(name="other")
+        url = reverse_lazy("api-1.0.0:topic_tree")
+        response = client.get(
+            url, headers={"Authorization": f"Bearer {user_fixture.token}"}
+        )
+        expected = [
+            {
+                "id": topic_fixture.pk,
+                "name": topic_fixture.name,
+                "children": [
+                    {
+                        "id": topic_fixture2.pk,
+                        "name": topic_fixture2.name,
+                        "children": [],
+                    }
+                ],
+            },
+            {"id": other.pk, "name": other.name, "children": []},
+        ]
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected
+
+    @staticmethod
+    def test_tree_root(
+        client: Client, topic_fixture: Topic, topic_fixture2: Topic, user_fixture: User
+    ) -> None:
+        """Test topic tree API below a root topic."""
+        url = reverse_lazy("api-1.0.0:topic_tree")
+        response = client.get(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            query_params={"root": topic_fixture2.pk},
+        )
+        expected = [
+            {"id": topic_fixture2.pk, "name": topic_fixture2.name, "children": []}
+        ]
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected
+        assert topic_fixture.pk not in [item["id"] for item in response.json()]
+
+
+class TestTopicAutocomplete:
+    """Tests topic autocomplete API."""
+
+    @staticmethod
+    def test_autocomplete_with_bad_credentials(client: Client) -> None:
+        """Test autocomplete api with bad credentials."""
+        url = reverse_lazy("api-1.0.0:topic_autocomplete")
+        response = client.get(url, headers={"Authorization": "Bearer test"})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @staticmethod
+    def test_autocomplete(
+        client: Client, topic_fixture: Topic, topic_fixture2: Topic, user_fixture: User
+    ) -> None:
+        """Test topic autocomplete API."""
+        url = reverse_lazy("api-1.0.0:topic_autocomplete")
+        response = client.get(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            query_params={"q": "tes"},
+        )
+        expected = [
+            {"id": topic_fixture.pk, "label": topic_fixture.name},
+            {"id": topic_fixture2.pk, "label": topic_fixture2.name},
+        ]
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected
+
 
 class TestTopicDetail:
     """Tests for topic detail API."""
@@ -342,6 +476,23 @@ class TestTopicPartialUpdate:
         )
         assert response.status_code == HTTPStatus.OK
 
+    @staticmethod
+    def test_topic_partial_update_cycle(
+        client: Client, user_fixture: User, topic_fixture: Topic, topic_fixture2: Topic
+    ) -> None:
+        """Test topic partial update API rejects a descendant as parent topic."""
+        permission = Permission.objects.get(name="Can change topic")
+        user_fixture.user_permissions.add(permission)
+        url = reverse_lazy("api-1.0.0:topic_patch", args=[topic_fixture.pk])
+        response = client.patch(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            data=json.dumps({"parent_topic": topic_fixture2.pk}),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {"message": TOPIC_CYCLE_ERROR}
+
 
 class TestTopicDelete:
     """Tests for topic delete API."""
@@ -492,6 +643,171 @@ class TestBlogPostList:
         assert response.status_code == HTTPStatus.OK
         assert response.json() == expected
 
+    @staticmethod
+    def test_blog_post_list_search(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        user_fixture: User,
+    ) -> None:
+        """Test blog post list API with full text search."""
+        blog_post_fixture2.content = "Test content"
+        blog_post_fixture2.save()
+        url = reverse_lazy("api-1.0.0:blog_post_list")
+        response = client.get(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            query_params={"q": "test", "sort": "title"},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["count"] == 2  # noqa: PLR2004
+        assert [item["id"] for item in response.json()["items"]] == [
+            blog_post_fixture2.pk,
+            blog_post_fixture.pk,
+        ]
+
+    @staticmethod
+    def test_blog_post_list_cursor(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        user_fixture: User,
+    ) -> None:
+        """Test blog post list API in cursor pagination mode."""
+        url = reverse_lazy("api-1.0.0:blog_post_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        query_params = {"sort": "-created_at", "limit": 1, "cursor": ""}
+        ids = []
+        while query_params["cursor"] is not None:
+            response = client.get(url, headers=headers, query_params=query_params)
+            assert response.status_code == HTTPStatus.OK
+            ids += [item["id"] for item in response.json()["items"]]
+            query_params["cursor"] = response.json().get("next_cursor")
+        assert ids == [blog_post_fixture2.pk, blog_post_fixture.pk]
+
+    @staticmethod
+    def test_blog_post_list_comment_count_cursor(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        comment_fixture: Comment,  # noqa: ARG004
+        user_fixture: User,
+    ) -> None:
+        """Test blog post list API sorted by comment count."""
+        url = reverse_lazy("api-1.0.0:blog_post_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        query_params = {"sort": "-comment_count", "limit": 1, "cursor": ""}
+        ids = []
+        while query_params["cursor"] is not None:
+            response = client.get(url, headers=headers, query_params=query_params)
+            assert response.status_code == HTTPStatus.OK
+            ids += [item["id"] for item in response.json()["items"]]
+            query_params["cursor"] = response.json().get("next_cursor")
+        assert ids == [blog_post_fixture.pk, blog_post_fixture2.pk]
+
+    @staticmethod
+    def test_blog_post_list_search_cursor(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        user_fixture: User,
+    ) -> None:
+        """Test blog post list API search results in cursor pagination mode."""
+        blog_post_fixture2.content = "Test content"
+        blog_post_fixture2.save()
+        url = reverse_lazy("api-1.0.0:blog_post_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        query_params = {"q": "test", "limit": 1, "cursor": ""}
+        response = client.get(url, headers=headers, query_params=query_params)
+        assert [item["id"] for item in response.json()["items"]] == [
+            blog_post_fixture2.pk
+        ]
+        query_params["cursor"] = response.json()["next_cursor"]
+        response = client.get(url, headers=headers, query_params=query_params)
+        assert response.status_code == HTTPStatus.OK
+        assert [item["id"] for item in response.json()["items"]] == [
+            blog_post_fixture.pk
+        ]
+        assert "next_cursor" not in response.json()
+
+
+class TestBlogPostAutocomplete:
+    """Tests blog post autocomplete API."""
+
+    @staticmethod
+    def test_autocomplete(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        user_fixture: User,
+    ) -> None:
+        """Test blog post autocomplete API."""
+        url = reverse_lazy("api-1.0.0:blog_post_autocomplete")
+        response = client.get(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            query_params={"q": "another", "limit": 5},
+        )
+        expected = [{"id": blog_post_fixture2.pk, "label": blog_post_fixture2.title}]
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected
+        assert blog_post_fixture.pk not in [item["id"] for item in response.json()]
+
+
+class TestBlogPostSeries:
+    """Tests blog post series API."""
+
+    @staticmethod
+    def test_series(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        user_fixture: User,
+    ) -> None:
+        """Test blog post series API."""
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        url = reverse_lazy("api-1.0.0:blog_post_series", args=[blog_post_fixture2.pk])
+        response = client.get(
+            url, headers={"Authorization": f"Bearer {user_fixture.token}"}
+        )
+        expected = [
+            {
+                "id": blog_post_fixture.pk,
+                "title": blog_post_fixture.title,
+                "position": 0,
+            },
+            {
+                "id": blog_post_fixture2.pk,
+                "title": blog_post_fixture2.title,
+                "position": 1,
+            },
+        ]
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected
+
+    @staticmethod
+    def test_series_cycle(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        user_fixture: User,
+    ) -> None:
+        """Test blog post patch API rejects a following post as previous."""
+        permission = Permission.objects.get(name="Can change blog post")
+        user_fixture.user_permissions.add(permission)
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        url = reverse_lazy("api-1.0.0:blog_post_patch", args=[blog_post_fixture.pk])
+        response = client.patch(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            data=json.dumps({"previous": blog_post_fixture2.pk}),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {"message": SERIES_CYCLE_ERROR}
+
 
 class TestBlogPostDetail:
     """Tests for blog post detail API."""
@@ -664,6 +980,7 @@ class TestUpdateBlogPost:
         client: Client,
         user_fixture: User,
         blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
     ) -> None:
         """Test update blog post API."""
         url = reverse_lazy("api-1.0.0:blog_post_update", args=[blog_post_fixture.pk])
@@ -674,7 +991,7 @@ class TestUpdateBlogPost:
             "title": "foo",
             "topic": blog_post_fixture.topic.pk,
             "content": "bar",
-            "previous": blog_post_fixture.pk,
+            "previous": blog_post_fixture2.pk,
         }
         response = client.put(
             url,
@@ -692,7 +1009,7 @@ class TestUpdateBlogPost:
                 "%Y-%m-%dT%H:%M:%S.%fZ"
             )[:-4]
             + "Z",
-            "previous": blog_post_fixture.title,
+            "previous": blog_post_fixture2.title,
         }
         assert response.status_code == HTTPStatus.OK
         assert response.json() == excpected
@@ -860,3 +1177,216 @@ class TestBlogPostDelete:
         )
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {"message": NO_PERMISSION}
+
+
+class TestConditionalRequests:
+    """Test ETag and Last-Modified validators of the blog API."""
+
+    @staticmethod
+    def test_blog_post_detail_not_modified(
+        client: Client,
+        user_fixture: User,
+        blog_post_fixture: BlogPost,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test detail API answers 304 until the post or its topic change."""
+        url = reverse_lazy("api-1.0.0:blog_post_detail", args=[blog_post_fixture.pk])
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = client.get(url, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.headers["ETag"]
+        # Validators only, the token lookup is cached.
+        with django_assert_num_queries(1):
+            response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        last_modified = response.headers["Last-Modified"]
+        response = client.get(
+            url, headers={**headers, "If-Modified-Since": last_modified}
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        blog_post_fixture.topic.name = "renamed"
+        blog_post_fixture.topic.save()
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["topic"] == "renamed"
+
+    @staticmethod
+    def test_topic_list_not_modified(
+        client: Client, user_fixture: User, topic_fixture: Topic, topic_fixture2: Topic
+    ) -> None:
+        """Test list API answers 304 until a topic is changed or deleted."""
+        url = reverse_lazy("api-1.0.0:topic_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        etag = client.get(url, headers=headers).headers["ETag"]
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        topic_fixture2.delete()
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["ETag"] != etag
+        assert [item["id"] for item in response.json()["items"]] == [topic_fixture.pk]
+
+    @staticmethod
+    def test_blog_post_update_if_match(
+        client: Client, user_fixture: User, blog_post_fixture: BlogPost
+    ) -> None:
+        """Test updates with a stale If-Match are rejected."""
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        detail = reverse_lazy("api-1.0.0:blog_post_detail", args=[blog_post_fixture.pk])
+        etag = client.get(detail, headers=headers).headers["ETag"]
+        permission = Permission.objects.get(name="Can change blog post")
+        user_fixture.user_permissions.add(permission)
+        url = reverse_lazy("api-1.0.0:blog_post_patch", args=[blog_post_fixture.pk])
+        response = client.patch(
+            url,
+            headers={**headers, "If-Match": etag},
+            data=json.dumps({"title": "first"}),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.patch(
+            url,
+            headers={**headers, "If-Match": etag},
+            data=json.dumps({"title": "second"}),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.title == "first"
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class TestResponseCache:
+    """Test the API response cache."""
+
+    @staticmethod
+    def test_topic_list_cache(
+        client: Client,
+        user_fixture: User,
+        topic_fixture: Topic,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        django_capture_on_commit_callbacks: Callable,
+    ) -> None:
+        """Test cached responses are served until a topic changes."""
+        url = reverse_lazy("api-1.0.0:topic_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = client.get(url, {"sort": "name", "limit": 5}, headers=headers)
+        assert "X-Cache" not in response.headers
+        with django_assert_num_queries(0):
+            cached = client.get(url, {"limit": 5, "sort": "name"}, headers=headers)
+        assert cached.headers["X-Cache"] == "HIT"
+        assert cached.json() == response.json()
+        response = client.get(
+            url,
+            {"sort": "name", "limit": 5},
+            headers={**headers, "If-None-Match": response.headers["ETag"]},
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        topic_fixture.name = "renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            topic_fixture.save()
+        response = client.get(url, {"sort": "name", "limit": 5}, headers=headers)
+        assert "X-Cache" not in response.headers
+        assert response.json()["items"][0]["name"] == "renamed"
+        out = StringIO()
+        call_command("api_cache_stats", reset=True, stdout=out)
+        assert "list_topic: 2 hits, 2 misses (50% hit ratio)" in out.getvalue()
+        assert cache_stats()["list_topic"] == {"hit": 0, "miss": 0}
+
+    @staticmethod
+    def test_blog_post_detail_cache(
+        client: Client,
+        user_fixture: User,
+        blog_post_fixture: BlogPost,
+        django_capture_on_commit_callbacks: Callable,
+    ) -> None:
+        """Test cached post responses follow changes of their topic."""
+        url = reverse_lazy("api-1.0.0:blog_post_detail", args=[blog_post_fixture.pk])
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        client.get(url, headers=headers)
+        assert client.get(url, headers=headers).headers["X-Cache"] == "HIT"
+        blog_post_fixture.topic.name = "renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            blog_post_fixture.topic.save()
+        response = client.get(url, headers=headers)
+        assert "X-Cache" not in response.headers
+        assert response.json()["topic"] == "renamed"
+
+
+class TestExport:
+    """Tests blog post and comment export APIs."""
+
+    @staticmethod
+    def test_blog_post_export(
+        client: Client,
+        user_fixture: User,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+    ) -> None:
+        """Test blog post export needs the view permission."""
+        url = reverse_lazy("api-1.0.0:blog_post_export")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = client.get(url, headers=headers)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.json() == {"message": NO_PERMISSION}
+        user_fixture.user_permissions.add(
+            Permission.objects.get(codename="view_blogpost")
+        )
+        response = client.get(url, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        assert [row["id"] for row in rows] == [
+            blog_post_fixture.pk,
+            blog_post_fixture2.pk,
+        ]
+        assert rows[1]["topic"] == blog_post_fixture2.topic.name
+        assert rows[1]["author"] == user_fixture.email
+
+    @staticmethod
+    def test_comment_export_csv(
+        client: Client, user_fixture: User, comment_fixture: Comment
+    ) -> None:
+        """Test comment export as CSV."""
+        url = reverse_lazy("api-1.0.0:comment_export")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = client.get(f"{url}?file_format=csv", headers=headers)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        user_fixture.user_permissions.add(
+            Permission.objects.get(codename="view_comment")
+        )
+        response = client.get(f"{url}?file_format=csv", headers=headers)
+        assert response["Content-Type"] == "text/csv"
+        content = b"".join(response.streaming_content).decode()
+        assert content.splitlines()[:2] == [
+            "id,blog_post,author,content,created_at",
+            f"{comment_fixture.pk},{comment_fixture.blog_post_id},"
+            f"{user_fixture.email},{comment_fixture.content},"
+            f"{JSON_ENCODER.default(comment_fixture.created_at)}",
+        ]
+
+
+class TestQueryBudget:
+    """Test list APIs run the same queries for pages of any size."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "url_name", ["api-1.0.0:topic_list", "api-1.0.0:blog_post_list"]
+    )
+    @pytest.mark.usefixtures("blog_posts_fixture")
+    def test_list_page_sizes(
+        client: Client, user_fixture: User, query_budget: QueryBudget, url_name: str
+    ) -> None:
+        """Test pages of 1 and 50 items, with their own topics and authors."""
+        url = reverse_lazy(url_name)
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        # The first request also looks up the token.
+        client.get(url, headers=headers)
+        for size in PAGE_SIZES:
+            response = client.get(url, {"limit": size}, headers=headers)
+            assert len(response.json()["items"]) == size
+        assert len(set(query_budget.counts[1:])) == 1
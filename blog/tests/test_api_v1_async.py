@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Permission
+from ninja.testing import TestAsyncClient
+
+from authentication.models import User
+from blog.api.api_v1 import NO_PERMISSION
+from blog.models import BlogPost, Topic
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAsyncBlogAPI:
+    """Test the async blog API routes."""
+
+    @staticmethod
+    def test_topic_list(
+        async_api_client: TestAsyncClient, user_fixture: User, topic_fixture2: Topic
+    ) -> None:
+        """Test topic list API."""
+        response = async_to_sync(async_api_client.get)(
+            "/blog/topic", headers={"Authorization": f"Bearer {user_fixture.token}"}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["items"] == [
+            {
+                "id": topic_fixture2.parent_topic_id,
+                "name": "test",
+                "parent_topic": None,
+            },
+            {
+                "id": topic_fixture2.pk,
+                "name": topic_fixture2.name,
+                "parent_topic": "test",
+            },
+        ]
+
+    @staticmethod
+    def test_topic_detail_not_modified(
+        async_api_client: TestAsyncClient, user_fixture: User, topic_fixture: Topic
+    ) -> None:
+        """Test topic detail API answers 304 while the topic is unchanged."""
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        url = f"/blog/topic/{topic_fixture.pk}"
+        response = async_to_sync(async_api_client.get)(url, headers=headers)
+        assert response.json()["name"] == topic_fixture.name
+        response = async_to_sync(async_api_client.get)(
+            url, headers=headers, META={"HTTP_IF_NONE_MATCH": response["ETag"]}
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    @staticmethod
+    @pytest.mark.usefixtures("locmem_cache")
+    def test_topic_detail_cached(
+        async_api_client: TestAsyncClient, user_fixture: User, topic_fixture: Topic
+    ) -> None:
+        """Test async routes store and serve cached responses."""
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        url = f"/blog/topic/{topic_fixture.pk}"
+        response = async_to_sync(async_api_client.get)(url, headers=headers)
+        assert "X-Cache" not in response._response.headers  # noqa: SLF001
+        cached = async_to_sync(async_api_client.get)(url, headers=headers)
+        assert cached["X-Cache"] == "HIT"
+        assert cached.json() == response.json()
+
+    @staticmethod
+    def test_topic_create(
+        async_api_client: TestAsyncClient, user_fixture: User, topic_fixture: Topic
+    ) -> None:
+        """Test topic create API checks permissions asynchronously."""
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        data = {"name": "unittest", "parent_topic": topic_fixture.pk}
+        response = async_to_sync(async_api_client.post)(
+            "/blog/topic", json=data, headers=headers
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.json() == {"message": NO_PERMISSION}
+        user_fixture.user_permissions.add(Permission.objects.get(name="Can add topic"))
+        response = async_to_sync(async_api_client.post)(
+            "/blog/topic", json=data, headers=headers
+        )
+        created = Topic.objects.get(name=data["name"])
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            "id": created.pk,
+            "name": data["name"],
+            "parent_topic": topic_fixture.name,
+        }
+
+    @staticmethod
+    def test_blog_post_list_by_topic(
+        async_api_client: TestAsyncClient,
+        user_fixture: User,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+    ) -> None:
+        """Test blog post list API filtered by a topic and its subtopics."""
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = async_to_sync(async_api_client.get)(
+            f"/blog/blog_post?topic={blog_post_fixture2.topic_id}", headers=headers
+        )
+        assert [item["id"] for item in response.json()["items"]] == [
+            blog_post_fixture2.pk
+        ]
+        response = async_to_sync(async_api_client.get)(
+            f"/blog/blog_post/{blog_post_fixture.pk}", headers=headers
+        )
+        assert response.json()["author"] == user_fixture.email
+
+    @staticmethod
+    def test_topic_delete(
+        async_api_client: TestAsyncClient, user_fixture: User, topic_fixture: Topic
+    ) -> None:
+        """Test transactional writes run the sync route with its permission check."""
+        url = f"/blog/topic/{topic_fixture.pk}"
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = async_to_sync(async_api_client.delete)(url, headers=headers)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        user_fixture.user_permissions.add(
+            Permission.objects.get(name="Can delete topic")
+        )
+        response = async_to_sync(async_api_client.delete)(url, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        assert not Topic.objects.filter(pk=topic_fixture.pk).exists()
@@ -0,0 +1,33 @@
+import pytest
+
+from blog.autocomplete import get_choices
+from blog.models import BlogPost, Topic
+
+pytestmark = pytest.mark.django_db
+
+
+def test_get_choices_trigram(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+    """Test typos still match through trigram similarity."""
+    Topic.objects.create(name="python")
+    choices = get_choices(Topic, "name", "pyton")
+    assert [label for _, label in choices] == ["python"]
+    assert (topic_fixture.pk, topic_fixture.name) not in choices
+    assert (topic_fixture2.pk, topic_fixture2.name) not in choices
+
+
+def test_get_choices_contains(
+    blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost
+) -> None:
+    """Test substring matches rank by similarity."""
+    choices = get_choices(BlogPost, "title", " TEST ")
+    assert choices == [
+        (blog_post_fixture.pk, blog_post_fixture.title),
+        (blog_post_fixture2.pk, blog_post_fixture2.title),
+    ]
+
+
+def test_get_choices_limit(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+    """Test number of choices is limited."""
+    choices = get_choices(Topic, "name", "", limit=1)
+    assert choices == [(topic_fixture2.pk, topic_fixture2.name)]
+    assert topic_fixture.pk not in dict(choices)
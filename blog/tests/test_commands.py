@@ -0,0 +1,173 @@
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from pytest_django.fixtures import SettingsWrapper
+
+from authentication.models import User
+from blog.models import BlogPost, Comment, Topic
+from blog.rendering import content_hash
+
+pytestmark = pytest.mark.django_db
+
+
+def test_render_posts(
+    blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost
+) -> None:
+    """Test stale posts are rendered."""
+    BlogPost.objects.filter(pk=blog_post_fixture.pk).update(
+        content_html="<p>kept</p>", content_hash=content_hash(blog_post_fixture.content)
+    )
+    out = StringIO()
+    call_command("render_posts", batch_size=1, stdout=out)
+    assert out.getvalue() == "Rendered 1 posts.\n"
+    blog_post_fixture.refresh_from_db()
+    blog_post_fixture2.refresh_from_db()
+    assert blog_post_fixture.content_html == "<p>kept</p>"
+    assert blog_post_fixture2.content_html == "<p>content2</p>"
+    assert blog_post_fixture2.content_hash == content_hash("content2")
+
+
+def test_render_posts_all(blog_post_fixture: BlogPost) -> None:
+    """Test every post is rendered with the all option."""
+    BlogPost.objects.filter(pk=blog_post_fixture.pk).update(
+        content_html="<p>old</p>", content_hash=content_hash(blog_post_fixture.content)
+    )
+    call_command("render_posts", all=True, stdout=StringIO())
+    blog_post_fixture.refresh_from_db()
+    assert blog_post_fixture.content_html == "<p>content</p>"
+
+
+def test_render_images(
+    blog_post_fixture: BlogPost,
+    image_upload_fixture: SimpleUploadedFile,
+    settings: SettingsWrapper,
+    tmp_path: Path,
+) -> None:
+    """Test images without renditions are backfilled."""
+    settings.MEDIA_ROOT = tmp_path
+    blog_post_fixture.image = image_upload_fixture
+    blog_post_fixture.save()
+    out = StringIO()
+    call_command("render_images", stdout=out)
+    assert "BlogPost.image: 1 images." in out.getvalue()
+    assert "User.profile_image: 0 images." in out.getvalue()
+    blog_post_fixture.refresh_from_db()
+    assert blog_post_fixture.image_width == 612  # noqa: PLR2004
+    assert [item["width"] for item in blog_post_fixture.image_renditions["webp"]] == [
+        150,
+        300,
+        450,
+        612,
+    ]
+    out = StringIO()
+    call_command("render_images", stdout=out)
+    assert "BlogPost.image: 0 images." in out.getvalue()
+
+
+def test_reconcile_counters(
+    topic_fixture: Topic, blog_post_fixture: BlogPost, comment_fixture: Comment
+) -> None:
+    """Test drifted counters are repaired and exact ones are kept."""
+    BlogPost.objects.filter(pk=blog_post_fixture.pk).update(
+        comment_count=5, last_comment_at=None
+    )
+    Topic.objects.filter(pk=topic_fixture.pk).update(tree_post_count=3)
+    out = StringIO()
+    call_command("reconcile_counters", stdout=out)
+    assert out.getvalue() == "Repaired 1 posts and 1 topics.\n"
+    blog_post_fixture.refresh_from_db()
+    topic_fixture.refresh_from_db()
+    assert blog_post_fixture.comment_count == 1
+    assert blog_post_fixture.last_comment_at == comment_fixture.created_at
+    assert (topic_fixture.post_count, topic_fixture.tree_post_count) == (1, 1)
+    out = StringIO()
+    call_command("reconcile_counters", stdout=out)
+    assert out.getvalue() == "Repaired 0 posts and 0 topics.\n"
+
+
+def test_import_blog_jsonl(
+    topic_fixture: Topic,
+    user_fixture: User,
+    settings: SettingsWrapper,
+    tmp_path: Path,
+) -> None:
+    """Test posts, topics, series and images are imported in batches."""
+    settings.MEDIA_ROOT = tmp_path / "media"
+    (tmp_path / "image.jpg").write_bytes(b"image")
+    records = [
+        {
+            "key": "a",
+            "title": "A",
+            "content": "first",
+            "topic": f"{topic_fixture.name}/child",
+            "author": user_fixture.email,
+            "created_at": "2020-01-02T03:04:05Z",
+            "image": "image.jpg",
+        },
+        {"key": "b", "title": "B", "content": "second", "previous": "a"},
+        {"key": "c", "title": "C", "content": "third", "previous": "b"},
+        {"title": "D", "content": "lost", "previous": "missing"},
+        {"key": "e", "title": "E", "content": "loop", "previous": "f"},
+        {"key": "f", "title": "F", "content": "loop", "previous": "e"},
+        {"title": "G", "content": "nobody", "author": "nobody@example.com"},
+    ]
+    source = tmp_path / "posts.jsonl"
+    source.write_text("\n".join(json.dumps(record) for record in records))
+    out = StringIO()
+    call_command("import_blog", source, batch_size=2, stdout=out)
+    assert out.getvalue().splitlines() == [
+        "Imported 7 posts, 1 topics and 1 images.",
+        "1 unknown authors, their posts have no author.",
+        "1 previous posts not found in the source.",
+    ]
+    posts = {post.title: post for post in BlogPost.objects.all()}
+    child = Topic.objects.get(name="child")
+    assert child.parent_topic == topic_fixture
+    assert child.path == f"{topic_fixture.path}{child.pk}/"
+    topic_fixture.refresh_from_db()
+    assert (topic_fixture.post_count, topic_fixture.tree_post_count) == (0, 1)
+    assert posts["A"].topic == child
+    assert posts["A"].author == user_fixture
+    assert posts["A"].created_at.year == 2020  # noqa: PLR2004
+    assert posts["A"].image.read() == b"image"
+    assert posts["G"].author is None
+    assert [post.title for post in posts["A"].series_posts()] == ["A", "B", "C"]
+    assert posts["C"].previous == posts["B"]
+    assert posts["D"].previous is None
+    assert posts["D"].series_id == posts["D"].pk
+    assert {posts["E"].series_id, posts["F"].series_id} == {
+        posts["E"].pk,
+        posts["F"].pk,
+    }
+    assert posts["B"].search_vector
+
+
+def test_import_blog_markdown(tmp_path: Path) -> None:
+    """Test Markdown files are imported with their front-matter."""
+    (tmp_path / "01-intro.md").write_text(
+        "---\ntitle: Intro\ntopic: Guides / Setup\n---\n# Hello\n"
+    )
+    (tmp_path / "02-next.md").write_text(
+        "---\ntitle: Next\nprevious: 01-intro\n---\nMore: text\n"
+    )
+    call_command("import_blog", tmp_path, stdout=StringIO())
+    intro, following = BlogPost.objects.order_by("pk")
+    assert (intro.title, intro.content) == ("Intro", "# Hello")
+    assert intro.topic.name == "Setup"
+    assert intro.topic.parent_topic.name == "Guides"
+    assert following.content == "More: text"
+    assert following.previous == intro
+    assert following.series_position == 1
+
+
+def test_import_blog_invalid_source(tmp_path: Path) -> None:
+    """Test only JSONL files and directories are imported."""
+    source = tmp_path / "posts.csv"
+    source.write_text("title,content")
+    with pytest.raises(CommandError, match="Source must be"):
+        call_command("import_blog", source)
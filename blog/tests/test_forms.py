@@ -2,7 +2,7 @@ import pytest
 
 from authentication.models import User
 from blog.forms import BlogPostForm, TopicForm
-from blog.models import Topic
+from blog.models import TOPIC_CYCLE_ERROR, BlogPost, Topic
 
 pytestmark = pytest.mark.django_db
 
@@ -25,6 +25,14 @@ class TestTopicForm:
         assert form.is_valid() is False
         assert form.errors == {"name": ["Topic with this Name already exists."]}
 
+    @staticmethod
+    def test_topic_form_with_cycle(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+        """Test topic form rejects a descendant as parent topic."""
+        data = {"name": topic_fixture.name, "parent_topic": topic_fixture2.pk}
+        form = TopicForm(data=data, instance=topic_fixture)
+        assert form.is_valid() is False
+        assert form.errors == {"parent_topic": [TOPIC_CYCLE_ERROR]}
+
 
 class TestPostForm:
     """Test post form."""
@@ -57,3 +65,25 @@ class TestPostForm:
         form = BlogPostForm(data=data)
         assert form.is_valid() is False
         assert form.errors[field] == ["This field is required."]
+
+
+class TestLazySelect:
+    """Test lazy select widget."""
+
+    @staticmethod
+    def test_render_selected_only(
+        topic_fixture: Topic, topic_fixture2: Topic, blog_post_fixture: BlogPost
+    ) -> None:
+        """Test only the selected option is rendered."""
+        form = BlogPostForm(instance=blog_post_fixture)
+        content = str(form["topic"])
+        assert f'<option value="{topic_fixture.pk}" selected>' in content
+        assert f'value="{topic_fixture2.pk}"' not in content
+
+    @staticmethod
+    def test_render_empty(topic_fixture: Topic) -> None:
+        """Test no option is rendered without a selected value."""
+        form = TopicForm()
+        content = str(form["parent_topic"])
+        assert '<option value="" selected>--</option>' in content
+        assert f'value="{topic_fixture.pk}"' not in content
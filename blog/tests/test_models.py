@@ -1,8 +1,15 @@
+from collections.abc import Callable
+
 import pytest
+from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
+from pytest_django import DjangoAssertNumQueries
 
 from authentication.models import User
 from blog.models import BlogPost, Comment, Topic
+from blog.rendering import content_hash
+from blog.tasks import render_post_content
+from main_project import celery_app
 
 pytestmark = pytest.mark.django_db
 
@@ -35,6 +42,81 @@ class TestTopicModel:
         assert topic_fixture2.parent_topic is None
 
 
+class TestTopicHierarchy:
+    """Test topic materialized path hierarchy."""
+
+    @staticmethod
+    def test_path_on_create(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+        """Test path is set when topics are created."""
+        assert topic_fixture.path == f"{topic_fixture.pk}/"
+        assert topic_fixture2.path == f"{topic_fixture.pk}/{topic_fixture2.pk}/"
+        topic_fixture2.refresh_from_db()
+        assert topic_fixture2.path == f"{topic_fixture.pk}/{topic_fixture2.pk}/"
+        assert topic_fixture2.depth == 1
+
+    @staticmethod
+    def test_move_subtree(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+        """Test descendants paths are updated when a topic is moved."""
+        child = Topic.objects.create(name="child", parent_topic=topic_fixture2)
+        root = Topic.objects.create(name="root")
+        topic_fixture2.parent_topic = root
+        topic_fixture2.save()
+        child.refresh_from_db()
+        assert child.path == f"{root.pk}/{topic_fixture2.pk}/{child.pk}/"
+        assert list(topic_fixture.descendants()) == []
+
+    @staticmethod
+    def test_cycle_is_rejected(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+        """Test a topic cannot be moved below its descendants."""
+        topic_fixture.parent_topic = topic_fixture2
+        with pytest.raises(ValidationError):
+            topic_fixture.save()
+        with pytest.raises(ValidationError):
+            topic_fixture.clean()
+        topic_fixture2.parent_topic = topic_fixture2
+        with pytest.raises(ValidationError):
+            topic_fixture2.save()
+
+    @staticmethod
+    def test_delete_rebase_children(
+        topic_fixture: Topic, topic_fixture2: Topic
+    ) -> None:
+        """Test children of a deleted topic become roots."""
+        child = Topic.objects.create(name="child", parent_topic=topic_fixture2)
+        topic_fixture.delete()
+        topic_fixture2.refresh_from_db()
+        child.refresh_from_db()
+        assert topic_fixture2.path == f"{topic_fixture2.pk}/"
+        assert child.path == f"{topic_fixture2.pk}/{child.pk}/"
+
+    @staticmethod
+    def test_single_query_apis(
+        topic_fixture: Topic,
+        topic_fixture2: Topic,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test hierarchy APIs run a single query."""
+        child = Topic.objects.create(name="child", parent_topic=topic_fixture2)
+        with django_assert_num_queries(1):
+            assert list(child.ancestors()) == [topic_fixture, topic_fixture2]
+        with django_assert_num_queries(1):
+            assert list(topic_fixture.descendants()) == [topic_fixture2, child]
+        with django_assert_num_queries(1):
+            assert topic_fixture.tree() == {
+                "id": topic_fixture.pk,
+                "name": topic_fixture.name,
+                "children": [
+                    {
+                        "id": topic_fixture2.pk,
+                        "name": topic_fixture2.name,
+                        "children": [
+                            {"id": child.pk, "name": child.name, "children": []}
+                        ],
+                    }
+                ],
+            }
+
+
 class TestPostModel:
     """Test post model."""
 
@@ -58,6 +140,37 @@ class TestPostModel:
         blog_post_fixture.refresh_from_db()
         assert blog_post_fixture.next == blog_post_fixture2
 
+    @staticmethod
+    def test_search(blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost) -> None:
+        """Test full text search ranks title matches above content matches."""
+        blog_post_fixture.title = "Django tips"
+        blog_post_fixture.save()
+        blog_post_fixture2.content = "A short note about django."
+        blog_post_fixture2.save()
+        result = list(BlogPost.objects.search("django"))
+        assert result == [blog_post_fixture, blog_post_fixture2]
+        assert result[0].rank > result[1].rank
+        assert "django" in result[1].headline
+
+    @staticmethod
+    def test_search_no_match(blog_post_fixture: BlogPost) -> None:  # noqa: ARG004
+        """Test full text search without matches."""
+        assert BlogPost.objects.search("postgres").exists() is False
+
+    @staticmethod
+    def test_in_topic(
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        topic_fixture: Topic,
+        topic_fixture2: Topic,
+    ) -> None:
+        """Test posts of a topic include posts of its subtopics."""
+        assert set(BlogPost.objects.in_topic(topic_fixture)) == {
+            blog_post_fixture,
+            blog_post_fixture2,
+        }
+        assert list(BlogPost.objects.in_topic(topic_fixture2)) == [blog_post_fixture2]
+
     @staticmethod
     def test_set_topic_null_when_topic_is_removed(
         blog_post_fixture: BlogPost, topic_fixture: Topic
@@ -91,6 +204,157 @@ class TestPostModel:
         assert blog_post_fixture2.previous is None
 
 
+class TestPostSeries:
+    """Test post series index."""
+
+    @staticmethod
+    def test_series_on_create(blog_post_fixture: BlogPost, user_fixture: User) -> None:
+        """Test series and position are set when posts are created."""
+        post = BlogPost.objects.create(
+            title="Part 2", author=user_fixture, content="c", previous=blog_post_fixture
+        )
+        assert blog_post_fixture.series_id == blog_post_fixture.pk
+        assert blog_post_fixture.series_position == 0
+        post.refresh_from_db()
+        assert post.series_id == blog_post_fixture.pk
+        assert post.series_position == 1
+
+    @staticmethod
+    def test_series_follows_previous_changes(
+        blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost, user_fixture: User
+    ) -> None:
+        """Test following posts are renumbered when previous changes."""
+        post = BlogPost.objects.create(
+            title="Part 3",
+            author=user_fixture,
+            content="c",
+            previous=blog_post_fixture2,
+        )
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        assert list(blog_post_fixture.series_posts()) == [
+            blog_post_fixture,
+            blog_post_fixture2,
+            post,
+        ]
+        post.refresh_from_db()
+        assert post.series_position == 2  # noqa: PLR2004
+
+    @staticmethod
+    def test_series_cycle_is_rejected(
+        blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost
+    ) -> None:
+        """Test a post cannot follow one of its next posts."""
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        blog_post_fixture.previous = blog_post_fixture2
+        with pytest.raises(ValidationError):
+            blog_post_fixture.save()
+        with pytest.raises(ValidationError):
+            blog_post_fixture.clean()
+        blog_post_fixture2.previous = blog_post_fixture2
+        with pytest.raises(ValidationError):
+            blog_post_fixture2.save()
+
+    @staticmethod
+    def test_delete_starts_new_series(
+        blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost, user_fixture: User
+    ) -> None:
+        """Test posts following a deleted post start a new series."""
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        post = BlogPost.objects.create(
+            title="Part 3",
+            author=user_fixture,
+            content="c",
+            previous=blog_post_fixture2,
+        )
+        blog_post_fixture.delete()
+        post.refresh_from_db()
+        assert post.series_id == blog_post_fixture2.pk
+        assert post.series_position == 1
+
+    @staticmethod
+    def test_navigation_queries(
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test previous and next posts are prefetched."""
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        with django_assert_num_queries(2):
+            posts = list(
+                BlogPost.objects.select_related("previous")
+                .prefetch_related("next_posts")
+                .order_by("id")
+            )
+            assert posts[0].next == blog_post_fixture2
+            assert posts[1].next is None
+            assert posts[1].previous == blog_post_fixture
+
+
+def render_callbacks(callbacks: list[Callable]) -> list[Callable]:
+    """Keep the callbacks rendering post content, e.g. without cache bumps."""
+    return [
+        callback
+        for callback in callbacks
+        if getattr(callback, "func", None) == render_post_content.delay
+    ]
+
+
+class TestPostContentHtml:
+    """Test pre-rendered blog post HTML."""
+
+    @staticmethod
+    def test_content_rendered_on_commit(
+        blog_post_fixture: BlogPost,
+        django_capture_on_commit_callbacks: Callable,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test changed content is rendered again after commit."""
+        monkeypatch.setitem(celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", value=True)
+        blog_post_fixture.content = "**bold**"
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            blog_post_fixture.save()
+        assert len(render_callbacks(callbacks)) == 1
+        assert blog_post_fixture.content_html == ""
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.content_html == "<p><strong>bold</strong></p>"
+        assert blog_post_fixture.content_hash == content_hash("**bold**")
+
+    @staticmethod
+    def test_unchanged_content_is_kept(
+        blog_post_fixture: BlogPost, django_capture_on_commit_callbacks: Callable
+    ) -> None:
+        """Test saving without content changes keeps the rendered HTML."""
+        BlogPost.objects.filter(pk=blog_post_fixture.pk).update(
+            content_html="<p>content</p>",
+            content_hash=content_hash(blog_post_fixture.content),
+        )
+        blog_post_fixture.refresh_from_db()
+        blog_post_fixture.title = "New title"
+        with django_capture_on_commit_callbacks() as callbacks:
+            blog_post_fixture.save()
+        assert render_callbacks(callbacks) == []
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.content_html == "<p>content</p>"
+
+    @staticmethod
+    def test_update_fields_clears_html(blog_post_fixture: BlogPost) -> None:
+        """Test saving content with update_fields clears the stale HTML."""
+        BlogPost.objects.filter(pk=blog_post_fixture.pk).update(
+            content_html="<p>content</p>",
+            content_hash=content_hash(blog_post_fixture.content),
+        )
+        blog_post_fixture.refresh_from_db()
+        blog_post_fixture.content = "new content"
+        blog_post_fixture.save(update_fields=["content"])
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.content_html == ""
+        assert blog_post_fixture.content_hash == ""
+
+
 class TestCommentModel:
     """Test comment model."""
 
@@ -117,3 +381,89 @@ class TestCommentModel:
         assert Comment.objects.exists() is True
         comment_fixture.author.delete()
         assert Comment.objects.exists() is False
+
+
+class TestCounters:
+    """Test denormalized comment and post counters."""
+
+    @staticmethod
+    def test_comment_counters(
+        blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost, user_fixture: User
+    ) -> None:
+        """Test comment create, move and bulk delete keep post counters exact."""
+        first, second = (
+            Comment.objects.create(
+                blog_post=blog_post_fixture, author=user_fixture, content=content
+            )
+            for content in ["first", "second"]
+        )
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.comment_count == 2  # noqa: PLR2004
+        assert blog_post_fixture.last_comment_at == second.created_at
+        second.blog_post = blog_post_fixture2
+        second.save()
+        blog_post_fixture.refresh_from_db()
+        blog_post_fixture2.refresh_from_db()
+        assert blog_post_fixture.comment_count == 1
+        assert blog_post_fixture.last_comment_at == first.created_at
+        assert blog_post_fixture2.comment_count == 1
+        Comment.objects.all().delete()
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.comment_count == 0
+        assert blog_post_fixture.last_comment_at is None
+
+    @staticmethod
+    def test_save_keeps_counters(
+        blog_post_fixture: BlogPost, comment_fixture: Comment
+    ) -> None:
+        """Test saving a stale post instance does not overwrite its counters."""
+        blog_post_fixture.title = "changed"
+        blog_post_fixture.save()
+        blog_post_fixture.refresh_from_db()
+        assert blog_post_fixture.title == "changed"
+        assert blog_post_fixture.comment_count == 1
+        assert blog_post_fixture.last_comment_at == comment_fixture.created_at
+
+    @staticmethod
+    def test_post_counters(
+        topic_fixture: Topic,
+        topic_fixture2: Topic,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+    ) -> None:
+        """Test topic counters follow post create, move and delete."""
+        topic_fixture.refresh_from_db()
+        topic_fixture2.refresh_from_db()
+        assert (topic_fixture.post_count, topic_fixture.tree_post_count) == (1, 2)
+        assert (topic_fixture2.post_count, topic_fixture2.tree_post_count) == (1, 1)
+        blog_post_fixture.topic = topic_fixture2
+        blog_post_fixture.save()
+        topic_fixture.refresh_from_db()
+        topic_fixture2.refresh_from_db()
+        assert (topic_fixture.post_count, topic_fixture.tree_post_count) == (0, 2)
+        assert (topic_fixture2.post_count, topic_fixture2.tree_post_count) == (2, 2)
+        blog_post_fixture2.delete()
+        topic_fixture.refresh_from_db()
+        assert topic_fixture.tree_post_count == 1
+
+    @staticmethod
+    def test_topic_move_and_delete(
+        topic_fixture: Topic, topic_fixture2: Topic, blog_post_fixture2: BlogPost
+    ) -> None:
+        """Test subtree counters of ancestors follow topic moves and deletes."""
+        other = Topic.objects.create(name="other")
+        child = Topic.objects.create(name="child", parent_topic=topic_fixture2)
+        BlogPost.objects.create(title="Child", topic=child, content="content")
+        topic_fixture2.refresh_from_db()
+        topic_fixture2.parent_topic = other
+        topic_fixture2.save()
+        topic_fixture.refresh_from_db()
+        other.refresh_from_db()
+        assert topic_fixture.tree_post_count == 0
+        assert other.tree_post_count == 2  # noqa: PLR2004
+        topic_fixture2.delete()
+        other.refresh_from_db()
+        child.refresh_from_db()
+        assert other.tree_post_count == 0
+        assert (child.post_count, child.tree_post_count) == (1, 1)
+        assert blog_post_fixture2.topic_id is not None
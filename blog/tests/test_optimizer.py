@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+from django.urls import reverse_lazy
+from ninja import Field, Schema
+from pytest_django import DjangoAssertNumQueries
+
+from authentication.models import User
+from blog.api.api_v1 import BlogPostOut, SeriesPostOut
+from blog.models import BlogPost, Topic
+from main_project.optimizer import QueryCountError, check_queries, optimize
+
+pytestmark = pytest.mark.django_db
+
+
+class TopicPostsOut(Schema):
+    """Topic with its posts."""
+
+    name: str
+    parent: str | None = Field(None, alias="parent_topic.name")
+    posts: list[SeriesPostOut] = Field(..., alias="blogpost_set")
+
+
+class TopicResolverOut(Schema):
+    """Topic with a resolved field."""
+
+    name: str
+    label: str
+
+    @staticmethod
+    def resolve_label(obj: Topic) -> str:
+        """Resolve label."""
+        return obj.name.upper()
+
+
+def test_optimize_select_related(
+    blog_post_fixture: BlogPost,
+    blog_post_fixture2: BlogPost,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test dotted aliases are joined and unused columns deferred."""
+    query_set = optimize(BlogPost.objects.order_by("id"), BlogPostOut)
+    with django_assert_num_queries(1):
+        posts = [BlogPostOut.from_orm(post).model_dump() for post in query_set]
+    assert [post["topic"] for post in posts] == [
+        blog_post_fixture.topic.name,
+        blog_post_fixture2.topic.name,
+    ]
+    only, defer = query_set.query.deferred_loading
+    assert defer is False
+    assert "search_vector" not in only
+
+
+def test_optimize_prefetch_related(
+    blog_post_fixture: BlogPost,
+    blog_post_fixture2: BlogPost,  # noqa: ARG001
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test nested schemas over reverse relations are prefetched."""
+    query_set = optimize(Topic.objects.order_by("id"), TopicPostsOut)
+    with django_assert_num_queries(2):
+        topics = [TopicPostsOut.from_orm(topic).model_dump() for topic in query_set]
+    assert topics[0]["posts"] == [
+        {"id": blog_post_fixture.pk, "title": blog_post_fixture.title, "position": 0}
+    ]
+    assert topics[1]["parent"] == blog_post_fixture.topic.name
+
+
+def test_optimize_resolver_keeps_columns(topic_fixture: Topic) -> None:  # noqa: ARG001
+    """Test resolved fields keep every column loaded."""
+    query_set = optimize(Topic.objects.all(), TopicResolverOut)
+    assert query_set.query.deferred_loading == (frozenset(), True)
+    assert TopicResolverOut.from_orm(query_set.get()).label == "TEST"
+
+
+def test_check_queries(blog_post_fixture: BlogPost) -> None:  # noqa: ARG001
+    """Test schemas querying per item are flagged."""
+    check_queries(optimize(BlogPost.objects.all(), BlogPostOut), BlogPostOut, "ok")
+    with pytest.raises(QueryCountError, match="list_posts runs 2 queries per item"):
+        check_queries(BlogPost.objects.all(), BlogPostOut, "list_posts")
+
+
+@pytest.mark.parametrize("size", [1, 10])
+def test_blog_post_list_queries(
+    size: int,
+    client: Client,
+    topic_fixture: Topic,
+    user_fixture: User,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    """Test blog post list API queries do not grow with the page size."""
+    BlogPost.objects.bulk_create(
+        BlogPost(title=f"Post {index}", topic=topic_fixture, author=user_fixture)
+        for index in range(size)
+    )
+    url = reverse_lazy("api-1.0.0:blog_post_list")
+    # Authentication, validators, count, page and the query check probe.
+    with django_assert_num_queries(5):
+        response = client.get(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            query_params={"limit": size},
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()["items"]) == size
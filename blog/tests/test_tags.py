@@ -1,7 +1,8 @@
 import pytest
 from django.utils.safestring import SafeText
 
-from blog.templatetags.blog_tags import markdown_content
+from blog.models import HEADLINE_START, HEADLINE_STOP, BlogPost
+from blog.templatetags.blog_tags import markdown_content, post_content, search_headline
 
 
 @pytest.mark.parametrize(
@@ -17,3 +18,26 @@ def test_markdown_content(input_text: str, expected_output: str) -> None:
     result = markdown_content(input_text)
     assert isinstance(result, SafeText)
     assert result == expected_output
+
+
+def test_search_headline() -> None:
+    """Test search headline tag escapes content and highlights matches."""
+    result = search_headline(f"<i>a</i> {HEADLINE_START}django{HEADLINE_STOP}")
+    assert isinstance(result, SafeText)
+    assert result == "&lt;i&gt;a&lt;/i&gt; <mark>django</mark>"
+
+
+@pytest.mark.django_db
+def test_post_content(blog_post_fixture: BlogPost) -> None:
+    """Test post content uses the stored HTML."""
+    blog_post_fixture.content_html = "<p>stored</p>"
+    result = post_content(blog_post_fixture)
+    assert isinstance(result, SafeText)
+    assert result == "<p>stored</p>"
+
+
+@pytest.mark.django_db
+def test_post_content_fallback(blog_post_fixture: BlogPost) -> None:
+    """Test post content is rendered until the stored HTML is ready."""
+    blog_post_fixture.content = "**bold text**"
+    assert post_content(blog_post_fixture) == "<p><strong>bold text</strong></p>"
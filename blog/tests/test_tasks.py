@@ -0,0 +1,79 @@
+import pytest
+from django.core import mail
+
+from authentication.models import User
+from blog.models import BlogPost, Comment, CommentNotification
+from blog.rendering import content_hash
+from blog.tasks import render_post_content, send_comment_digests
+
+pytestmark = pytest.mark.django_db
+
+
+def test_render_post_content(blog_post_fixture: BlogPost) -> None:
+    """Test post Markdown is rendered and stored with its hash."""
+    BlogPost.objects.filter(pk=blog_post_fixture.pk).update(content="# Title")
+    render_post_content(blog_post_fixture.pk)
+    blog_post_fixture.refresh_from_db()
+    assert blog_post_fixture.content_html == "<h1>Title</h1>"
+    assert blog_post_fixture.content_hash == content_hash("# Title")
+
+
+def test_render_post_content_deleted(blog_post_fixture: BlogPost) -> None:
+    """Test posts deleted before the task runs are skipped."""
+    post_id = blog_post_fixture.pk
+    blog_post_fixture.delete()
+    render_post_content(post_id)
+    assert not BlogPost.objects.filter(pk=post_id).exists()
+
+
+def test_comment_notifications(
+    blog_post_fixture: BlogPost, user_fixture: User, user_fixture2: User
+) -> None:
+    """Test only comments created by other users are queued for the author."""
+    comment = Comment.objects.create(
+        blog_post=blog_post_fixture, author=user_fixture2, content="first"
+    )
+    comment.content = "edited"
+    comment.save()
+    Comment.objects.create(
+        blog_post=blog_post_fixture, author=user_fixture, content="own"
+    )
+    assert list(CommentNotification.objects.values_list("recipient", "comment")) == [
+        (user_fixture.pk, comment.pk)
+    ]
+
+
+def test_send_comment_digests(
+    blog_post_fixture: BlogPost,
+    blog_post_fixture2: BlogPost,
+    user_fixture: User,
+    user_fixture2: User,
+) -> None:
+    """Test pending comments are sent once, grouped in one email per recipient."""
+    for post in [blog_post_fixture, blog_post_fixture2]:
+        Comment.objects.create(blog_post=post, author=user_fixture2, content="hi")
+    blog_post_fixture2.author = user_fixture2
+    blog_post_fixture2.save()
+    Comment.objects.create(
+        blog_post=blog_post_fixture2, author=user_fixture, content="reply"
+    )
+    assert send_comment_digests() == 2  # noqa: PLR2004
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(
+        [user_fixture.email, user_fixture2.email]
+    )
+    digest = next(item for item in mail.outbox if item.to == [user_fixture.email])
+    assert digest.subject == "2 new comments on your posts"
+    assert f'{user_fixture2.email} on "{blog_post_fixture2.title}"' in digest.body
+    assert not CommentNotification.objects.exists()
+    assert send_comment_digests() == 0
+    assert len(mail.outbox) == 2  # noqa: PLR2004
+
+
+def test_send_comment_digests_empty(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test no SMTP connection is opened without pending notifications."""
+
+    def no_connection() -> None:
+        pytest.fail("SMTP connection opened.")
+
+    monkeypatch.setattr("blog.tasks.get_connection", no_connection)
+    assert send_comment_digests() == 0
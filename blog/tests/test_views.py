@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from http import HTTPStatus
 from pathlib import Path
 
@@ -5,11 +6,12 @@ import pytest
 from django.contrib.auth.models import AnonymousUser, Permission
 from django.core.exceptions import PermissionDenied
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import RequestFactory
+from django.test import Client, RequestFactory
 from django.urls import reverse_lazy
+from pytest_django import DjangoAssertNumQueries
 
 from authentication.models import User
-from blog.models import BlogPost, Topic
+from blog.models import BlogPost, Comment, Topic
 from blog.views import (
     BlogPostCreateView,
     BlogPostDeleteView,
@@ -18,9 +20,18 @@ from blog.views import (
     BlogPostUpdateView,
     TopicCreateView,
     TopicDeleteView,
+    TopicDetailView,
     TopicListView,
     TopicUpdateView,
+    add_post_comment,
+    post_autocomplete,
+    post_comments,
+    remove_post_comment,
+    topic_autocomplete,
 )
+from common.tests.query_budget import PAGE_SIZES, QueryBudget
+from main_project import celery_app
+from main_project.settings import COMMENT_PAGE_SIZE
 
 pytestmark = pytest.mark.django_db
 request_factory = RequestFactory()
@@ -47,6 +58,7 @@ class TestTopicListView:
         """Test view from HTMX."""
         url = reverse_lazy("blog:topic_list")
         request = request_factory.get(url, headers={"Hx-Request": "true"})
+        request.user = AnonymousUser()
         response = TopicListView.as_view()(request)
         assert response.status_code == HTTPStatus.OK
         assert response.template_name == "blog/components/topic_table.html"
@@ -64,6 +76,7 @@ class TestTopicListView:
         request = request_factory.get(
             url, headers={"Hx-Request": "true"}, query_params={"search": "tes"}
         )
+        request.user = AnonymousUser()
         response = TopicListView.as_view()(request)
         assert response.status_code == HTTPStatus.OK
         assert response.template_name == "blog/components/topic_table.html"
@@ -83,6 +96,22 @@ class TestTopicDetailView:
         response = TopicListView.as_view()(request)
         assert response.status_code == HTTPStatus.OK
 
+    @staticmethod
+    def test_view_subtopic_posts(
+        topic_fixture: Topic,
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+    ) -> None:
+        """Test topic detail includes posts of subtopics."""
+        url = reverse_lazy("blog:topic_detail", args=[topic_fixture.pk])
+        request = request_factory.get(url)
+        response = TopicDetailView.as_view()(request, pk=topic_fixture.pk)
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.context_data["posts"]) == {
+            blog_post_fixture,
+            blog_post_fixture2,
+        }
+
 
 class TestTopicDeleteView:
     """Tests for topic delete view."""
@@ -320,6 +349,7 @@ class TestBlogListView:
         """Test view from HTMX."""
         url = reverse_lazy("blog:post_list")
         request = request_factory.get(url, headers={"Hx-Request": "true"})
+        request.user = AnonymousUser()
         response = BlogPostListView.as_view()(request)
         assert response.status_code == HTTPStatus.OK
         assert response.template_name == "blog/components/post_table.html"
@@ -337,6 +367,7 @@ class TestBlogListView:
         request = request_factory.get(
             url, headers={"Hx-Request": "true"}, query_params={"search": "tes"}
         )
+        request.user = AnonymousUser()
         response = BlogPostListView.as_view()(request)
         assert response.status_code == HTTPStatus.OK
         assert response.template_name == "blog/components/post_table.html"
@@ -344,6 +375,22 @@ class TestBlogListView:
             BlogPost.objects.filter(title__startswith="tes")
         )
 
+    @staticmethod
+    def test_view_htmx_full_text_search(
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,  # noqa: ARG004
+    ) -> None:
+        """Test view from HTMX with full text search."""
+        url = reverse_lazy("blog:post_list")
+        request = request_factory.get(
+            url, headers={"Hx-Request": "true"}, query_params={"q": "content"}
+        )
+        request.user = AnonymousUser()
+        response = BlogPostListView.as_view()(request)
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context_data["object_list"]) == [blog_post_fixture]
+        assert "<mark>content</mark>" in response.rendered_content
+
 
 class TestBlogCreateView:
     """Tests for Post Create View."""
@@ -380,8 +427,11 @@ class TestBlogCreateView:
         response = BlogPostCreateView.as_view()(request)
         assert response.status_code == HTTPStatus.OK
         assert response.template_name == ["blog/post_create.html"]
-        assert "topics" in response.context_data
-        assert "posts" in response.context_data
+        assert "topics" not in response.context_data
+        assert "posts" not in response.context_data
+        content = response.rendered_content
+        assert f'hx-get="{reverse_lazy("blog:topic_autocomplete")}"' in content
+        assert f'hx-get="{reverse_lazy("blog:post_autocomplete")}"' in content
 
     @staticmethod
     def test_blogpost_view_not_logged() -> None:
@@ -476,8 +526,12 @@ class TestBlogUpdateView:
         assert response.status_code == HTTPStatus.OK
         assert response.template_name == ["blog/post_update.html"]
         assert response.context_data["post"] == blog_post_fixture
-        assert "topics" in response.context_data
-        assert "posts" in response.context_data
+        assert "topics" not in response.context_data
+        assert "posts" not in response.context_data
+        assert (
+            f'<option value="{blog_post_fixture.topic.pk}" selected>'
+            f"{blog_post_fixture.topic}</option>"
+        ) in response.rendered_content
 
     @staticmethod
     def test_blogpost_view_not_logged(blog_post_fixture: BlogPost) -> None:
@@ -544,6 +598,103 @@ class TestBlogPostDetailView:
         assert response.template_name == ["blog/post_detail.html"]
         assert response.context_data["post"] == blog_post_fixture
 
+    @staticmethod
+    def test_get_view_series(
+        blog_post_fixture: BlogPost,
+        blog_post_fixture2: BlogPost,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test series navigation is rendered with a constant number of queries."""
+        blog_post_fixture2.previous = blog_post_fixture
+        blog_post_fixture2.save()
+        url = reverse_lazy("blog:post_detail", args=[blog_post_fixture.pk])
+        request = request_factory.get(url)
+        request.user = AnonymousUser()
+        with django_assert_num_queries(4):
+            response = BlogPostDetailView.as_view()(request, pk=blog_post_fixture.pk)
+            content = response.rendered_content
+        assert list(response.context_data["series"]) == [
+            blog_post_fixture,
+            blog_post_fixture2,
+        ]
+        next_url = reverse_lazy("blog:post_detail", args=[blog_post_fixture2.pk])
+        assert content.count(f'href="{next_url}"') == 2  # noqa: PLR2004
+
+
+class TestCommentViews:
+    """Tests for comment views."""
+
+    @staticmethod
+    def test_comment_pages(
+        blog_post_fixture: BlogPost,
+        user_fixture: User,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test comments are served newest first in bounded pages."""
+        comments = Comment.objects.bulk_create(
+            Comment(blog_post=blog_post_fixture, author=user_fixture, content=f"{i}")
+            for i in range(COMMENT_PAGE_SIZE + 1)
+        )
+        url = reverse_lazy("blog:post_detail", args=[blog_post_fixture.pk])
+        request = request_factory.get(url)
+        request.user = user_fixture
+        response = BlogPostDetailView.as_view()(request, pk=blog_post_fixture.pk)
+        assert response.context_data["comments"] == comments[:0:-1]
+        next_comment = response.context_data["next_comment"]
+        assert next_comment == comments[1].pk
+        assert "Load more" in response.rendered_content
+        url = reverse_lazy("blog:comment_list", args=[blog_post_fixture.pk])
+        request = request_factory.get(url, {"before": next_comment})
+        request.user = user_fixture
+        with django_assert_num_queries(2):
+            response = post_comments(request, pk=blog_post_fixture.pk)
+        assert response.status_code == HTTPStatus.OK
+        content = response.content.decode()
+        assert f'id="comment-{comments[0].pk}"' in content
+        assert f'id="comment-{comments[1].pk}"' not in content
+        assert "Load more" not in content
+
+    @staticmethod
+    def test_comment_page_bad_cursor(
+        blog_post_fixture: BlogPost, user_fixture: User
+    ) -> None:
+        """Test comment page with an invalid cursor."""
+        url = reverse_lazy("blog:comment_list", args=[blog_post_fixture.pk])
+        request = request_factory.get(url, {"before": "foo"})
+        request.user = user_fixture
+        response = post_comments(request, pk=blog_post_fixture.pk)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @staticmethod
+    def test_add_comment(blog_post_fixture: BlogPost, user_fixture: User) -> None:
+        """Test adding a comment only returns the new comment out of band."""
+        url = reverse_lazy("blog:add_comment")
+        request = request_factory.post(
+            url, {"blog_post": blog_post_fixture.pk, "content": "New comment"}
+        )
+        request.user = user_fixture
+        response = add_post_comment(request)
+        assert response.status_code == HTTPStatus.OK
+        comment = Comment.objects.get()
+        content = response.content.decode()
+        assert 'hx-swap-oob="afterbegin:#comments"' in content
+        assert f'id="comment-{comment.pk}"' in content
+        assert "New comment" in content
+        assert 'id="comment-list"' not in content
+
+    @staticmethod
+    def test_remove_comment(comment_fixture: Comment, user_fixture: User) -> None:
+        """Test removing a comment only deletes its element out of band."""
+        url = reverse_lazy("blog:remove_comment", args=[comment_fixture.pk])
+        request = request_factory.get(url)
+        request.user = user_fixture
+        response = remove_post_comment(request, pk=comment_fixture.pk)
+        assert response.status_code == HTTPStatus.OK
+        assert Comment.objects.exists() is False
+        assert response.content.decode().strip() == (
+            f'<div id="comment-{comment_fixture.pk}" hx-swap-oob="delete"></div>'
+        )
+
 
 class TestBlogPostDeleteView:
     """Tests for Post Delete View."""
@@ -619,3 +770,141 @@ class TestBlogPostDeleteView:
         assert response.status_code == HTTPStatus.FOUND
         assert response.url == reverse_lazy("blog:post_list")
         assert BlogPost.objects.filter(pk=blog_post_fixture.pk).exists() is False
+
+
+class TestAutocompleteViews:
+    """Tests for picker autocomplete views."""
+
+    @staticmethod
+    def test_topic_autocomplete(topic_fixture: Topic, topic_fixture2: Topic) -> None:
+        """Test topic picker options."""
+        url = reverse_lazy("blog:topic_autocomplete")
+        request = request_factory.get(url, query_params={"q": "anoth"})
+        response = topic_autocomplete(request)
+        content = response.content.decode()
+        assert response.status_code == HTTPStatus.OK
+        assert f'<option value="{topic_fixture2.pk}" selected>' in content
+        assert f'<option value="{topic_fixture.pk}"' not in content
+
+    @staticmethod
+    def test_post_autocomplete(
+        blog_post_fixture: BlogPost, blog_post_fixture2: BlogPost
+    ) -> None:
+        """Test blog post picker options without search text."""
+        url = reverse_lazy("blog:post_autocomplete")
+        request = request_factory.get(url)
+        response = post_autocomplete(request)
+        content = response.content.decode()
+        assert response.status_code == HTTPStatus.OK
+        assert content.index(f'value="{blog_post_fixture2.pk}"') < content.index(
+            f'value="{blog_post_fixture.pk}"'
+        )
+
+
+@pytest.mark.usefixtures("locmem_cache")
+class TestFragmentCache:
+    """Test cached HTMX list fragments."""
+
+    @staticmethod
+    def test_topic_table(  # noqa: PLR0913
+        client: Client,
+        topic_fixture: Topic,
+        user_fixture: User,
+        django_assert_num_queries: DjangoAssertNumQueries,
+        django_capture_on_commit_callbacks: Callable,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test repeated requests are served from cache until a post is added."""
+        monkeypatch.setitem(celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", value=True)
+        url = reverse_lazy("blog:topic_list")
+        headers = {"Hx-Request": "true"}
+        response = client.get(url, {"page": 1}, headers=headers)
+        assert "X-Cache" not in response.headers
+        with django_assert_num_queries(0):
+            cached = client.get(url, {"page": 1}, headers=headers)
+        assert cached.headers["X-Cache"] == "HIT"
+        assert cached.content == response.content
+        assert "X-Cache" not in client.get(url, {"page": 1, "search": "x"}).headers
+        with django_capture_on_commit_callbacks(execute=True):
+            BlogPost.objects.create(
+                title="Post", topic=topic_fixture, author=user_fixture, content="."
+            )
+        response = client.get(url, {"page": 1}, headers=headers)
+        assert "X-Cache" not in response.headers
+        assert "<td>1</td>" in response.content.decode()
+
+    @staticmethod
+    def test_topic_table_per_user(
+        client: Client, topic_fixture: Topic, user_fixture: User
+    ) -> None:
+        """Test users get the edit links of their own permissions."""
+        url = reverse_lazy("blog:topic_list")
+        update_url = reverse_lazy("blog:topic_update", args=[topic_fixture.pk])
+        headers = {"Hx-Request": "true"}
+        assert str(update_url) not in client.get(url, headers=headers).content.decode()
+        user_fixture.user_permissions.add(
+            Permission.objects.get(
+                codename="change_topic", content_type__app_label="blog"
+            )
+        )
+        client.force_login(user_fixture)
+        response = client.get(url, headers=headers)
+        assert "X-Cache" not in response.headers
+        assert str(update_url) in response.content.decode()
+
+    @staticmethod
+    def test_post_table_comment_count(
+        client: Client,
+        blog_post_fixture: BlogPost,
+        user_fixture: User,
+        django_capture_on_commit_callbacks: Callable,
+    ) -> None:
+        """Test new comments invalidate the cached post table."""
+        url = reverse_lazy("blog:post_list")
+        headers = {"Hx-Request": "true"}
+        client.get(url, headers=headers)
+        assert client.get(url, headers=headers).headers["X-Cache"] == "HIT"
+        with django_capture_on_commit_callbacks(execute=True):
+            Comment.objects.create(
+                blog_post=blog_post_fixture, author=user_fixture, content="comment"
+            )
+        assert "X-Cache" not in client.get(url, headers=headers).headers
+
+
+class TestQueryBudget:
+    """Test list views run the same queries for pages of any size."""
+
+    @staticmethod
+    def test_post_list_page_sizes(
+        client: Client,
+        blog_posts_fixture: list[BlogPost],  # noqa: ARG004
+        query_budget: QueryBudget,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test post pages of 1 and 50 posts, with their own topics and authors."""
+        url = reverse_lazy("blog:post_list")
+        for size in PAGE_SIZES:
+            monkeypatch.setattr(BlogPostListView, "paginate_by", size)
+            response = client.get(url, headers={"Hx-Request": "true"})
+            assert len(response.context["posts"]) == size
+        assert len(set(query_budget.counts)) == 1
+
+    @staticmethod
+    def test_comment_list_page_sizes(
+        client: Client,
+        blog_posts_fixture: list[BlogPost],
+        query_budget: QueryBudget,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test comment pages of 1 and 50 comments, each of another author."""
+        post = blog_posts_fixture[0]
+        Comment.objects.bulk_create(
+            Comment(blog_post=post, author=other.author, content="test")
+            for other in blog_posts_fixture[1:]
+        )
+        url = reverse_lazy("blog:comment_list", args=[post.pk])
+        for size in PAGE_SIZES:
+            monkeypatch.setattr("blog.views.COMMENT_PAGE_SIZE", size)
+            response = client.get(url)
+            assert len(response.context["comments"]) == size
+        assert len(set(query_budget.counts)) == 1
@@ -21,6 +21,9 @@ urlpatterns = [
     path("topic_detail/<int:pk>", views.TopicDetailView.as_view(), name="topic_detail"),
     path("topic_update/<int:pk>", views.TopicUpdateView.as_view(), name="topic_update"),
     path("topic_delete/<int:pk>", views.TopicDeleteView.as_view(), name="topic_delete"),
+    path("post_comments/<int:pk>", views.post_comments, name="comment_list"),
     path("add_comment", views.add_post_comment, name="add_comment"),
     path("remove_comment/<int:pk>", views.remove_post_comment, name="remove_comment"),
+    path("topic_autocomplete", views.topic_autocomplete, name="topic_autocomplete"),
+    path("post_autocomplete", views.post_autocomplete, name="post_autocomplete"),
 ]
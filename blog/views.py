@@ -5,7 +5,7 @@ from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.files.uploadedfile import UploadedFile
 from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse_lazy
 from django.views.generic import (
     CreateView,
@@ -15,17 +15,22 @@ from django.views.generic import (
     UpdateView,
 )
 
+from blog.autocomplete import get_choices
 from blog.forms import BlogPostForm, CommentForm, TopicForm
 from blog.models import BlogPost, Comment, Topic
-from main_project.settings import PAGINATION_SIZE
+from main_project.cache import FragmentCacheMixin
+from main_project.settings import COMMENT_PAGE_SIZE, PAGINATION_SIZE
 
 
-class TopicListView(ListView):
+class TopicListView(FragmentCacheMixin, ListView):
     """List topic generic view."""
 
     model = Topic
     context_object_name = "topics"
     paginate_by = PAGINATION_SIZE
+    # Post counts follow posts, edit links follow permissions.
+    fragment_dependencies = (Topic, BlogPost)
+    fragment_per_user = True
 
     def get_template_names(self: Self) -> str:
         """Get template name based on request type."""
@@ -52,12 +57,6 @@ class TopicCreateView(PermissionRequiredMixin, CreateView):
     success_url = reverse_lazy("blog:topic_list")
     permission_required: ClassVar[list[str]] = ["blog.add_topic"]
 
-    def get_context_data(self, **kwargs: dict[str, Any]) -> dict[str, Any]:
-        """Add context data."""
-        context = super().get_context_data(**kwargs)
-        context["topic_choices"] = Topic.objects.all()
-        return context
-
 
 class TopicDetailView(DetailView):
     """Topic generic detail view."""
@@ -68,7 +67,7 @@ class TopicDetailView(DetailView):
     def get_context_data(self, **kwargs: dict[str, Any]) -> dict[str, Any]:
         """Add context data."""
         context = super().get_context_data(**kwargs)
-        context["posts"] = BlogPost.objects.filter(topic=self.get_object())
+        context["posts"] = BlogPost.objects.in_topic(self.object)
         return context
 
 
@@ -82,12 +81,6 @@ class TopicUpdateView(PermissionRequiredMixin, UpdateView):
     context_object_name = "topic"
     permission_required: ClassVar[list[str]] = ["blog.change_topic"]
 
-    def get_context_data(self, **kwargs: dict[str, Any]) -> dict[str, Any]:
-        """Add context data."""
-        context = super().get_context_data(**kwargs)
-        context["topic_choices"] = Topic.objects.all()
-        return context
-
 
 class TopicDeleteView(PermissionRequiredMixin, DeleteView):
     """Topic generic delete view."""
@@ -99,12 +92,15 @@ class TopicDeleteView(PermissionRequiredMixin, DeleteView):
     permission_required: ClassVar[list[str]] = ["blog.delete_topic"]
 
 
-class BlogPostListView(ListView):
+class BlogPostListView(FragmentCacheMixin, ListView):
     """Post generic list view."""
 
     model = BlogPost
     context_object_name = "posts"
     paginate_by = PAGINATION_SIZE
+    # Comment counts follow comments, edit links follow permissions.
+    fragment_dependencies = (BlogPost, Comment)
+    fragment_per_user = True
 
     def get_template_names(self: Self) -> str:
         """Get template name based on request type."""
@@ -119,6 +115,8 @@ class BlogPostListView(ListView):
         if self.request.headers.get("Hx-Request", False):
             if search := self.request.GET.get("search"):
                 query_set = query_set.filter(title__startswith=search)
+            if text := self.request.GET.get("q"):
+                query_set = query_set.search(text)
             if topic := self.request.GET.get("topic"):
                 query_set = query_set.filter(topic=topic)
         return query_set
@@ -139,13 +137,6 @@ class BlogPostCreateView(PermissionRequiredMixin, CreateView):
     success_url = reverse_lazy("blog:post_list")
     permission_required: ClassVar[list[str]] = ["blog.add_blogpost"]
 
-    def get_context_data(self: Self, **kwargs: str) -> dict:
-        """Override to pass extra context."""
-        context = super().get_context_data(**kwargs)
-        context["topics"] = Topic.objects.all()
-        context["posts"] = BlogPost.objects.all()
-        return context
-
     def form_valid(self: Self, form: BlogPostForm) -> HttpResponse:
         """Save image with standard_name."""
         if form.is_valid():
@@ -182,13 +173,6 @@ class BlogPostUpdateView(PermissionRequiredMixin, UpdateView):
     context_object_name = "post"
     permission_required: ClassVar[list[str]] = ["blog.change_blogpost"]
 
-    def get_context_data(self: Self, **kwargs: str) -> dict:
-        """Override to pass extra context."""
-        context = super().get_context_data(**kwargs)
-        context["topics"] = Topic.objects.all()
-        context["posts"] = BlogPost.objects.all()
-        return context
-
     def form_valid(self: Self, form: BlogPostForm) -> HttpResponse:
         """Save image with standard_name."""
         if form.is_valid():
@@ -220,6 +204,21 @@ class BlogPostDetailView(DetailView):
     template_name = "blog/post_detail.html"
     context_object_name = "post"
 
+    def get_queryset(self: Self) -> QuerySet:
+        """Fetch related objects used by the template with the post."""
+        return BlogPost.objects.select_related(
+            "topic", "author", "previous"
+        ).prefetch_related("next_posts")
+
+    def get_context_data(self: Self, **kwargs: str) -> dict:
+        """Add series navigation and the first comment page to the context."""
+        context = super().get_context_data(**kwargs)
+        context["series"] = self.object.series_posts().only(
+            "id", "title", "series_position"
+        )
+        context.update(comment_page(self.object))
+        return context
+
 
 class BlogPostDeleteView(PermissionRequiredMixin, DeleteView):
     """Post generic delete view."""
@@ -231,40 +230,117 @@ class BlogPostDeleteView(PermissionRequiredMixin, DeleteView):
     permission_required: ClassVar[list[str]] = ["blog.delete_blogpost"]
 
 
+def comment_page(post: BlogPost, before: int | None = None) -> dict:
+    """Get a page of post comments, newest first.
+
+    Args:
+        post (BlogPost): Blog post object.
+        before (int | None, optional): Only comments older than this comment id.
+            Defaults to None.
+
+    Returns:
+        dict: Context with the post, the page comments and the id to load the
+            next page from, None on the last page.
+    """
+    query_set = Comment.objects.filter(blog_post=post).select_related("author")
+    if before is not None:
+        query_set = query_set.filter(pk__lt=before)
+    comments = list(query_set.order_by("-pk")[: COMMENT_PAGE_SIZE + 1])
+    next_comment = None
+    if len(comments) > COMMENT_PAGE_SIZE:
+        comments = comments[:COMMENT_PAGE_SIZE]
+        next_comment = comments[-1].pk
+    return {"post": post, "comments": comments, "next_comment": next_comment}
+
+
+def post_comments(request: HttpRequest, pk: int) -> HttpResponse:
+    """Post comments page, loaded with "load more".
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        pk (int): Post ID
+
+    Returns:
+        HttpResponse: HttpResponse object
+    """
+    post = get_object_or_404(BlogPost.objects.only("pk"), pk=pk)
+    try:
+        before = int(request.GET["before"]) if "before" in request.GET else None
+    except ValueError:
+        return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+    return render(
+        request,
+        "blog/components/comment_page.html",
+        context=comment_page(post, before),
+    )
+
+
 def add_post_comment(request: HttpRequest) -> HttpResponse:
-    """Add post comment."""
+    """Add post comment, the response only prepends the new comment."""
     if request.method == "POST":
         form = CommentForm(request.POST)
         if form.is_valid():
             author = request.user
             blog_post: BlogPost = form.cleaned_data["blog_post"]
             content = form.cleaned_data["content"]
-            Comment.objects.create(author=author, blog_post=blog_post, content=content)
-            blog_post.refresh_from_db()
+            comment = Comment.objects.create(
+                author=author, blog_post=blog_post, content=content
+            )
             return render(
                 request,
-                "blog/components/comment_list.html",
-                context={"post": blog_post},
+                "blog/components/comment_added.html",
+                context={"comment": comment},
             )
     return HttpResponse(status=HTTPStatus.INTERNAL_SERVER_ERROR)
 
 
 def remove_post_comment(request: HttpRequest, pk: int) -> HttpResponse:
-    """Remove post comment.
+    """Remove post comment, the response only removes the comment.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        pk (int): Comment ID
+
+    Returns:
+        HttpResponse: HttpResponse object
+    """
+    Comment.objects.filter(pk=pk).delete()
+    return render(
+        request,
+        "blog/components/comment_removed.html",
+        context={"pk": pk},
+    )
+
+
+def topic_autocomplete(request: HttpRequest) -> HttpResponse:
+    """Topic picker options.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+
+    Returns:
+        HttpResponse: HttpResponse object
+    """
+    choices = get_choices(Topic, "name", request.GET.get("q", ""))
+    return render(
+        request,
+        "blog/components/autocomplete_options.html",
+        context={"choices": choices},
+    )
+
+
+def post_autocomplete(request: HttpRequest) -> HttpResponse:
+    """Blog post picker options.
 
     Args:
         request (HttpRequest): HttpRequest object
-        pk (int): Post ID
 
     Returns:
         HttpResponse: HttpResponse object
     """
-    comment = Comment.objects.get(pk=pk)
-    blog_post = comment.blog_post
-    comment.delete()
-    blog_post.refresh_from_db()
+    choices = get_choices(BlogPost, "title", request.GET.get("q", ""))
     return render(
         request,
-        "blog/components/comment_list.html",
-        context={"post": blog_post},
+        "blog/components/autocomplete_options.html",
+        context={"choices": choices},
     )
@@ -0,0 +1,5 @@
+from django.contrib import admin
+
+from common.models import ExportJob
+
+admin.site.register(ExportJob)
@@ -0,0 +1,118 @@
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+from typing import Literal
+
+from django.db import IntegrityError, transaction
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404
+from ninja import Router, Schema
+
+from common.models import ACTIVE_STATUSES, ExportJob
+from common.tasks import run_export_job
+from main_project.auth import GlobalAuth
+from main_project.export import ExportFormat
+
+# Sync routes, served by the async API as well.
+router = Router(auth=GlobalAuth())
+NO_PERMISSION = "User does not have permission."
+EXPORT_PERMISSIONS = {
+    "tasks": (),
+    "blog": ("blog.view_blogpost", "blog.view_comment"),
+}
+
+
+class ExportJobIn(Schema):
+    """Export job input schema."""
+
+    kind: Literal["tasks", "blog"]
+    file_format: ExportFormat = "ndjson"
+
+
+class ExportJobOut(Schema):
+    """Export job output schema."""
+
+    id: int
+    kind: str
+    file_format: str
+    status: str
+    progress: int
+    total: int
+    artifact: str | None
+    error: str
+    created_at: datetime
+    finished_at: datetime | None
+
+    @staticmethod
+    def resolve_artifact(job: ExportJob) -> str | None:
+        """Link to the archive once the job is done."""
+        return job.artifact.url if job.artifact else None
+
+
+class Message(Schema):
+    """Generic schema for messages."""
+
+    message: str
+
+
+@router.post(
+    "/job",
+    url_name="export_job_create",
+    response={
+        HTTPStatus.OK: ExportJobOut,
+        HTTPStatus.ACCEPTED: ExportJobOut,
+        HTTPStatus.UNAUTHORIZED: Message,
+    },
+)
+def create_export_job(request: HttpRequest, payload: ExportJobIn) -> HttpResponse:
+    """Export job create API.
+
+    The archive is written by a Celery task, poll the job until its status
+    is "done" to get the artifact link.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        payload (ExportJobIn): Export kind and format.
+
+    Returns:
+        HttpResponse: 202 with the new job, or 200 with the pending or
+            running job of the same export.
+    """
+    if not request.user.has_perms(EXPORT_PERMISSIONS[payload.kind]):
+        return HTTPStatus.UNAUTHORIZED, {"message": NO_PERMISSION}
+    # The active job blocking the insert may finish before it is read, the
+    # insert is then tried again.
+    while True:
+        try:
+            with transaction.atomic():
+                job = ExportJob.objects.create(
+                    user=request.user,
+                    kind=payload.kind,
+                    file_format=payload.file_format,
+                )
+            break
+        except IntegrityError:
+            active = ExportJob.objects.filter(
+                user=request.user,
+                kind=payload.kind,
+                file_format=payload.file_format,
+                status__in=ACTIVE_STATUSES,
+            ).first()
+            if active is not None:
+                return HTTPStatus.OK, active
+    transaction.on_commit(partial(run_export_job.delay, job.pk))
+    return HTTPStatus.ACCEPTED, job
+
+
+@router.get("/job/{job_id}", response=ExportJobOut, url_name="export_job_detail")
+def detail_export_job(request: HttpRequest, job_id: int) -> ExportJob:
+    """Export job detail API, to poll the progress of a job.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        job_id (int): ExportJob id.
+
+    Returns:
+        ExportJob: Job of the user.
+    """
+    return get_object_or_404(ExportJob, pk=job_id, user=request.user)
@@ -0,0 +1,50 @@
+from typing import ClassVar, Self
+
+from django.db import models
+
+from authentication.models import User
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+class ExportJob(models.Model):
+    """Export archive written in the background by ``run_export_job``.
+
+    Pending and running jobs are unique per user and parameters, asking for
+    the same export again returns the job in progress.
+    """
+
+    KIND_CHOICES: ClassVar[dict] = {"tasks": "Tasks", "blog": "Blog history"}
+    FORMAT_CHOICES: ClassVar[dict] = {"ndjson": "NDJSON", "csv": "CSV"}
+    STATUS_CHOICES: ClassVar[dict] = {
+        "pending": "Pending",
+        "running": "Running",
+        "done": "Done",
+        "failed": "Failed",
+    }
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    progress = models.PositiveBigIntegerField(default=0)
+    total = models.PositiveBigIntegerField(default=0)
+    artifact = models.FileField(upload_to="exports", blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        """Model meta data."""
+
+        constraints: ClassVar[list[models.BaseConstraint]] = [
+            models.UniqueConstraint(
+                fields=["user", "kind", "file_format"],
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+                name="common_export_job_active_unique",
+            ),
+        ]
+
+    def __str__(self: Self) -> str:
+        """String representation of the model."""
+        return f"{self.kind} export of {self.user_id} ({self.status})"
@@ -0,0 +1,218 @@
+import base64
+from collections.abc import Sequence
+from functools import partial
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Any
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_delete
+from PIL import Image, ImageFilter, ImageOps
+
+from celery.app.task import Task
+from main_project.cache import invalidate
+
+RENDITION_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+RENDITION_QUALITY = 80
+RENDITION_DIR = "renditions"
+PLACEHOLDER_WIDTH = 16
+
+
+def create_renditions(image: FieldFile, widths: Sequence[int]) -> dict:
+    """Create resized WebP and JPEG variants and a placeholder of an image.
+
+    Widths larger than the original are not upscaled.
+
+    Args:
+        image (FieldFile): Original image.
+        widths (Sequence[int]): Rendition widths in pixels.
+
+    Returns:
+        dict: Source name, original size, placeholder data URI and rendition
+            names with their width for each format.
+    """
+    stem = PurePosixPath(image.name).stem
+    with image.open("rb"), Image.open(image) as opened:
+        original = ImageOps.exif_transpose(opened)
+        width, height = original.size
+        sizes = sorted({min(size, width) for size in widths})
+        renditions = {
+            "source": image.name,
+            "width": width,
+            "height": height,
+            "placeholder": _placeholder(original),
+        }
+        for extension, image_format in RENDITION_FORMATS.items():
+            renditions[extension] = []
+            for size in sizes:
+                content = _encode(_resize(original, size), image_format)
+                name = default_storage.save(
+                    f"{RENDITION_DIR}/{stem}_{size}.{extension}", ContentFile(content)
+                )
+                renditions[extension].append({"name": name, "width": size})
+    return renditions
+
+
+def delete_renditions(renditions: dict) -> None:
+    """Delete the files of renditions created by ``create_renditions``.
+
+    Args:
+        renditions (dict): Renditions metadata.
+    """
+    for extension in RENDITION_FORMATS:
+        for rendition in renditions.get(extension, []):
+            default_storage.delete(rendition["name"])
+
+
+def render_field(
+    model: type[models.Model], pk: int, field: str, widths: Sequence[int]
+) -> None:
+    """Create the renditions of an image field and store them on the instance.
+
+    The ``<field>_width``, ``<field>_height`` and ``<field>_renditions`` model
+    fields are updated only if the image did not change meanwhile.
+
+    Args:
+        model (type[models.Model]): Model class.
+        pk (int): Instance primary key.
+        field (str): Image field name.
+        widths (Sequence[int]): Rendition widths in pixels.
+    """
+    instance = model.objects.only(field, f"{field}_renditions").filter(pk=pk).first()
+    if instance is None:
+        return
+    image, previous = getattr(instance, field), getattr(instance, f"{field}_renditions")
+    if not image or previous.get("source") == image.name:
+        return
+    renditions = create_renditions(image, widths)
+    updated = model.objects.filter(pk=pk, **{field: image.name}).update(
+        **{
+            f"{field}_width": renditions["width"],
+            f"{field}_height": renditions["height"],
+            f"{field}_renditions": renditions,
+        }
+    )
+    delete_renditions(previous if updated else renditions)
+    if updated:
+        invalidate(model)
+
+
+def prepare_renditions(
+    instance: models.Model, field: str, update_fields: Sequence[str] | None
+) -> Sequence[str] | None:
+    """Forget the renditions of a removed image before saving an instance.
+
+    Args:
+        instance (models.Model): Instance being saved.
+        field (str): Image field name.
+        update_fields (Sequence[str] | None): Fields passed to ``save()``.
+
+    Returns:
+        Sequence[str] | None: Update fields including the rendition fields.
+    """
+    renditions = getattr(instance, f"{field}_renditions")
+    if getattr(instance, field) or not renditions:
+        return update_fields
+    transaction.on_commit(partial(delete_renditions, renditions))
+    setattr(instance, f"{field}_width", None)
+    setattr(instance, f"{field}_height", None)
+    setattr(instance, f"{field}_renditions", {})
+    if update_fields is None:
+        return None
+    return [
+        *update_fields,
+        f"{field}_width",
+        f"{field}_height",
+        f"{field}_renditions",
+    ]
+
+
+def schedule_renditions(instance: models.Model, field: str, task: Task) -> None:
+    """Queue the rendition task after commit if the saved image is new.
+
+    Args:
+        instance (models.Model): Saved instance.
+        field (str): Image field name.
+        task (Task): Celery task called with the instance primary key.
+    """
+    image = getattr(instance, field)
+    if image and getattr(instance, f"{field}_renditions").get("source") != image.name:
+        transaction.on_commit(partial(task.delay, instance.pk))
+
+
+def delete_renditions_on_delete(model: type[models.Model], field: str) -> None:
+    """Delete the rendition files of deleted instances once the deletion commits.
+
+    Args:
+        model (type[models.Model]): Model class.
+        field (str): Image field name.
+    """
+    post_delete.connect(
+        partial(_delete_instance_renditions, field=field),
+        sender=model,
+        weak=False,
+        dispatch_uid=f"renditions_delete_{model._meta.label_lower}",  # noqa: SLF001
+    )
+
+
+def _delete_instance_renditions(
+    sender: type[models.Model],  # noqa: ARG001
+    instance: models.Model,
+    field: str,
+    **kwargs: Any,  # noqa: ANN401, ARG001
+) -> None:
+    """Signal receiver queuing the deletion of the renditions of an instance."""
+    # Deferred fields can not be loaded once the row is deleted.
+    if f"{field}_renditions" in instance.get_deferred_fields():
+        return
+    renditions = getattr(instance, f"{field}_renditions")
+    if renditions:
+        transaction.on_commit(partial(delete_renditions, renditions))
+
+
+def _resize(image: Image.Image, width: int) -> Image.Image:
+    """Resize image to a width keeping the aspect ratio.
+
+    Args:
+        image (Image.Image): Original image.
+        width (int): Target width.
+
+    Returns:
+        Image.Image: Resized image.
+    """
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    """Encode image, dropping transparency for formats without alpha.
+
+    Args:
+        image (Image.Image): Image to encode.
+        image_format (str): Pillow format name.
+
+    Returns:
+        bytes: Encoded image.
+    """
+    if image_format == "JPEG" or image.mode not in {"RGB", "RGBA"}:
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=RENDITION_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def _placeholder(image: Image.Image) -> str:
+    """Create a tiny blurred WebP of the image as a data URI.
+
+    Args:
+        image (Image.Image): Original image.
+
+    Returns:
+        str: Data URI.
+    """
+    tiny = _resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    content = base64.b64encode(_encode(tiny, "WEBP")).decode()
+    return f"data:image/webp;base64,{content}"
@@ -0,0 +1,159 @@
+import secrets
+import shutil
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from datetime import timedelta
+from itertools import batched
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from blog.api.api_v1 import COMMENT_EXPORT_COLUMNS, POST_EXPORT_COLUMNS
+from blog.models import BlogPost, Comment
+from celery import shared_task  # type: ignore[attr-defined]
+from common.models import ACTIVE_STATUSES, ExportJob
+from main_project.export import ExportEncoder, ExportFormat
+from main_project.settings import EXPORT_CHUNK_SIZE, EXPORT_JOB_LIFETIME
+from todo.api.api_v1 import TASK_EXPORT_COLUMNS
+from todo.models import Task
+
+EXPORT_TIMEOUT_ERROR = "Export did not finish in time."
+
+
+@shared_task
+def run_export_job(job_id: int) -> None:
+    """Write the zip archive of an export job and store it as its artifact.
+
+    Tables are read from a server-side cursor and written to the archive
+    chunk by chunk, the job progress is saved after every chunk. The archive
+    is built in a temporary file and copied to the storage once complete.
+
+    Only pending jobs are run, so redelivered messages and jobs already
+    marked failed are skipped. A job marked failed while it runs keeps that
+    status and its archive is deleted.
+
+    Args:
+        job_id (int): ExportJob id.
+    """
+    if not ExportJob.objects.filter(pk=job_id, status="pending").update(
+        status="running"
+    ):
+        return
+    job = ExportJob.objects.get(pk=job_id)
+    tables = _tables(job)
+    images = _images(job)
+    total = sum(query_set.count() for _, query_set, _ in tables) + images.count()
+    ExportJob.objects.filter(pk=job_id).update(total=total)
+    try:
+        with tempfile.TemporaryFile() as file:
+            with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as archive:
+                progress = 0
+                for name, query_set, columns in tables:
+                    for count in _write_table(
+                        archive, name, query_set, columns, job.file_format
+                    ):
+                        progress += count
+                        ExportJob.objects.filter(pk=job_id).update(progress=progress)
+                for count in _write_images(archive, images):
+                    progress += count
+                    ExportJob.objects.filter(pk=job_id).update(progress=progress)
+            job.artifact.save(
+                f"{job.kind}_{secrets.token_urlsafe(16)}.zip", File(file), save=False
+            )
+    except Exception as error:
+        ExportJob.objects.filter(pk=job_id, status="running").update(
+            status="failed", error=str(error), finished_at=timezone.now()
+        )
+        raise
+    if not ExportJob.objects.filter(pk=job_id, status="running").update(
+        status="done", artifact=job.artifact.name, finished_at=timezone.now()
+    ):
+        job.artifact.delete(save=False)
+
+
+@shared_task
+def delete_expired_exports() -> int:
+    """Delete export jobs finished longer than ``EXPORT_JOB_LIFETIME`` ago.
+
+    Jobs still pending or running after that long, e.g. lost with their
+    worker, are marked failed so the same export can be requested again.
+
+    Returns:
+        int: Number of deleted jobs.
+    """
+    cutoff = timezone.now() - timedelta(seconds=EXPORT_JOB_LIFETIME)
+    ExportJob.objects.filter(status__in=ACTIVE_STATUSES, created_at__lt=cutoff).update(
+        status="failed", error=EXPORT_TIMEOUT_ERROR, finished_at=timezone.now()
+    )
+    expired = list(
+        ExportJob.objects.filter(finished_at__lt=cutoff).values_list("pk", "artifact")
+    )
+    for _, artifact in expired:
+        if artifact:
+            default_storage.delete(artifact)
+    ExportJob.objects.filter(pk__in=[pk for pk, _ in expired]).delete()
+    return len(expired)
+
+
+def _tables(job: ExportJob) -> list[tuple[str, QuerySet, dict[str, str]]]:
+    """Get the file name, rows and columns of each table of an export."""
+    if job.kind == "tasks":
+        tasks = Task.objects.filter(created_by=job.user_id).order_by("pk")
+        return [("tasks", tasks, TASK_EXPORT_COLUMNS)]
+    return [
+        ("blog_posts", BlogPost.objects.order_by("pk"), POST_EXPORT_COLUMNS),
+        ("comments", Comment.objects.order_by("pk"), COMMENT_EXPORT_COLUMNS),
+    ]
+
+
+def _images(job: ExportJob) -> QuerySet:
+    """Get the names of the image files of an export."""
+    if job.kind == "blog":
+        return BlogPost.objects.exclude(image="").values_list("image", flat=True)
+    return BlogPost.objects.none()
+
+
+def _write_table(
+    archive: zipfile.ZipFile,
+    name: str,
+    query_set: QuerySet,
+    columns: dict[str, str],
+    file_format: ExportFormat,
+) -> Iterator[int]:
+    """Write rows to an archive member chunk by chunk.
+
+    Yields:
+        int: Number of rows of each written chunk.
+    """
+    encoder = ExportEncoder(columns, file_format, compress=False)
+    rows = query_set.values_list(*columns.values()).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    with archive.open(f"{name}.{file_format}", "w", force_zip64=True) as member:
+        member.write(encoder.header())
+        for batch in batched(rows, EXPORT_CHUNK_SIZE, strict=False):
+            member.write(encoder.encode(batch))
+            yield len(batch)
+
+
+def _write_images(archive: zipfile.ZipFile, names: QuerySet) -> Iterator[int]:
+    """Copy image files to an archive without compressing them again.
+
+    Yields:
+        int: 1 for each image, missing files are skipped.
+    """
+    for name in names.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        info = zipfile.ZipInfo(f"images/{name}")
+        info.compress_type = zipfile.ZIP_STORED
+        try:
+            with (
+                default_storage.open(name) as image,
+                archive.open(info, "w", force_zip64=True) as member,
+            ):
+                shutil.copyfileobj(image, member)
+        except FileNotFoundError:
+            pass
+        yield 1
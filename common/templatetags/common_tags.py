@@ -0,0 +1,68 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.db import models
+
+register = template.Library()
+
+
+@register.inclusion_tag("common/components/picture.html")
+def picture(  # noqa: PLR0913
+    instance: models.Model,
+    field: str,
+    width: int,
+    height: int | None = None,
+    alt: str = "",
+    class_name: str = "",
+    default: str = "..",
+) -> dict:
+    """Render an image field with its WebP/JPEG renditions and placeholder.
+
+    Falls back to the original file until the renditions of the current image
+    are created, and to ``default`` when there is no image.
+
+    Args:
+        instance (models.Model): Model instance.
+        field (str): Image field name.
+        width (int): Displayed width in pixels.
+        height (int | None, optional): Displayed height. Defaults to width.
+        alt (str, optional): Alternative text. Defaults to "".
+        class_name (str, optional): Image css classes. Defaults to "".
+        default (str, optional): Url used without image. Defaults to "..".
+
+    Returns:
+        dict: Template context.
+    """
+    image = getattr(instance, field)
+    context = {
+        "src": image.url if image else default,
+        "alt": alt,
+        "class_name": class_name,
+        "width": width,
+        "height": height or width,
+    }
+    renditions = getattr(instance, f"{field}_renditions")
+    if not image or renditions.get("source") != image.name:
+        return context
+    jpeg = renditions["jpeg"]
+    smallest = next((item for item in jpeg if item["width"] >= width), jpeg[-1])
+    context.update(
+        src=default_storage.url(smallest["name"]),
+        webp_srcset=_srcset(renditions["webp"]),
+        jpeg_srcset=_srcset(jpeg),
+        placeholder=renditions["placeholder"],
+    )
+    return context
+
+
+def _srcset(renditions: list[dict]) -> str:
+    """Build a srcset attribute value.
+
+    Args:
+        renditions (list[dict]): Rendition names and widths.
+
+    Returns:
+        str: Urls with their width descriptors.
+    """
+    return ", ".join(
+        f"{default_storage.url(item['name'])} {item['width']}w" for item in renditions
+    )
@@ -0,0 +1,200 @@
+import json
+import os
+import sys
+from collections import defaultdict
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+from types import FrameType
+from typing import Any, Self
+
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.template.base import Node
+from django.test import Client
+from django.urls import Resolver404
+
+from main_project.settings import BASE_DIR
+
+BUDGET_FILE = Path(__file__).with_name("query_budgets.json")
+UPDATE_OPTION = "--update-query-budgets"
+# Page sizes list endpoints are requested with to catch N+1 queries.
+PAGE_SIZES = (1, 50)
+ORIGIN_DEPTH = 3
+UPDATE_WITH_XDIST = f"{UPDATE_OPTION} writes a single file, run it with -n 0."
+TEMPLATE_RENDER = Node.render_annotated.__code__
+
+Query = tuple[str, tuple[str, ...]]
+_observed: dict[str, int] = {}
+
+
+class QueryBudget:
+    """Queries of the requests sent by the Django test client in a test.
+
+    Each request is keyed by method and URL name, e.g. "GET blog:post_list",
+    and fails the test when it runs more queries than its budget in
+    ``query_budgets.json``.
+    """
+
+    def __init__(self: Self, *, update: bool) -> None:
+        """Create the recorder of a test.
+
+        Args:
+            update (bool): Record the counts as budgets instead of checking them.
+        """
+        self.update = update
+        self.requests: list[tuple[str, int]] = []
+
+    @property
+    def counts(self: Self) -> list[int]:
+        """Get the number of queries of each request, in order."""
+        return [count for _, count in self.requests]
+
+    def check(self: Self, response: HttpResponse, queries: list[Query]) -> None:
+        """Compare the queries of a request with the budget of its URL name.
+
+        Requests to paths without a URL name are not checked.
+
+        Args:
+            response (HttpResponse): Test client response.
+            queries (list[Query]): SQL and origin of each query of the request.
+        """
+        try:
+            view_name = response.resolver_match.view_name
+        except Resolver404:
+            return
+        key = f"{response.request['REQUEST_METHOD']} {view_name}"
+        self.requests.append((key, len(queries)))
+        if self.update:
+            _observed[key] = max(_observed.get(key, 0), len(queries))
+            return
+        budget = _budgets().get(key)
+        if budget is None:
+            pytest.fail(
+                f"{key} has no query budget, run pytest {UPDATE_OPTION} -n 0 to "
+                "add it.",
+                pytrace=False,
+            )
+        if len(queries) > budget:
+            pytest.fail(_report(key, queries, budget), pytrace=False)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the option writing the observed query counts as budgets."""
+    parser.addoption(
+        UPDATE_OPTION,
+        action="store_true",
+        help=f"Write the query count of each URL name to {BUDGET_FILE.name}.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Refuse to update the budgets from parallel workers.
+
+    Raises:
+        pytest.UsageError: Raised if budgets are updated with xdist workers.
+    """
+    if config.getoption(UPDATE_OPTION) and config.getoption("numprocesses", None):
+        raise pytest.UsageError(UPDATE_WITH_XDIST)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Write the budgets observed with the update option, keeping the others."""
+    if session.config.getoption(UPDATE_OPTION) and _observed:
+        budgets = dict(sorted({**_budgets(), **_observed}.items()))
+        BUDGET_FILE.write_text(json.dumps(budgets, indent=2) + "\n")
+
+
+@pytest.fixture(autouse=True)
+def query_budget(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> QueryBudget:
+    """Check the queries of every Django test client request against its budget.
+
+    Request this fixture to inspect the query counts of the test requests.
+    """
+    budget = QueryBudget(update=request.config.getoption(UPDATE_OPTION))
+    send = Client.request
+
+    def checked_request(client: Client, **kwargs: Any) -> HttpResponse:  # noqa: ANN401
+        queries: list[Query] = []
+        with connection.execute_wrapper(_recorder(queries)):
+            response = send(client, **kwargs)
+        budget.check(response, queries)
+        return response
+
+    monkeypatch.setattr(Client, "request", checked_request)
+    return budget
+
+
+def _recorder(queries: list[Query]) -> Callable:
+    """Build a database execute wrapper appending the queries it runs."""
+
+    def record(
+        execute: Callable,
+        sql: str,
+        params: Any,  # noqa: ANN401
+        many: bool,  # noqa: FBT001
+        context: dict,
+    ) -> Any:  # noqa: ANN401
+        queries.append((sql, _origins(sys._getframe(1))))  # noqa: SLF001
+        return execute(sql, params, many, context)
+
+    return record
+
+
+def _origins(frame: FrameType | None) -> tuple[str, ...]:
+    """Get the template line and project lines running a query, innermost first.
+
+    Test modules and installed packages are skipped.
+    """
+    origins: list[str] = []
+    template = None
+    while frame is not None and len(origins) < ORIGIN_DEPTH:
+        path = frame.f_code.co_filename
+        if template is None and frame.f_code is TEMPLATE_RENDER:
+            node = frame.f_locals["self"]
+            template = f"{node.origin.template_name}:{node.token.lineno}"
+            origins.append(template)
+        elif (
+            path.startswith(str(BASE_DIR))
+            and "site-packages" not in path
+            and f"{os.sep}tests{os.sep}" not in path
+        ):
+            origins.append(
+                f"{Path(path).relative_to(BASE_DIR)}:{frame.f_lineno} "
+                f"in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return tuple(origins)
+
+
+def _report(key: str, queries: list[Query], budget: int) -> str:
+    """Describe a request over budget with its duplicated queries."""
+    origins_by_sql: dict[str, list[tuple[str, ...]]] = defaultdict(list)
+    for sql, origins in queries:
+        origins_by_sql[sql].append(origins)
+    duplicated = {
+        sql: chains for sql, chains in origins_by_sql.items() if len(chains) > 1
+    }
+    lines = [
+        f"{key} ran {len(queries)} queries, its budget is {budget} "
+        f"({BUDGET_FILE.name}).",
+        "Duplicated queries:" if duplicated else "Queries:",
+    ]
+    for sql, chains in (duplicated or origins_by_sql).items():
+        lines.append(f"  {len(chains)}x {sql}")
+        lines.extend(
+            f"      {' <- '.join(chain) or 'no project origin'}"
+            for chain in dict.fromkeys(chains)
+        )
+    return "\n".join(lines)
+
+
+@cache
+def _budgets() -> dict[str, int]:
+    """Load the query budgets by request key."""
+    if not BUDGET_FILE.exists():
+        return {}
+    return json.loads(BUDGET_FILE.read_text())
@@ -0,0 +1,130 @@
+import zipfile
+from collections.abc import Callable
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.files.storage import default_storage
+from django.db.models import QuerySet
+from django.test import Client, RequestFactory
+from django.urls import reverse_lazy
+
+from authentication.models import User
+from common.api.api_v1 import NO_PERMISSION, ExportJobIn, create_export_job
+from common.models import ExportJob
+from common.tasks import run_export_job
+from main_project.celery import app as celery_app
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+class TestExportJobAPI:
+    """Test export job API."""
+
+    @staticmethod
+    def test_create_deduplicated(
+        client: Client,
+        user_fixture: User,
+        user_fixture2: User,
+        django_capture_on_commit_callbacks: Callable,
+    ) -> None:
+        """Test a job is queued once while the same export is in progress."""
+        url = reverse_lazy("api-1.0.0:export_job_create")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post(
+                url, {"kind": "tasks"}, content_type="application/json", headers=headers
+            )
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert [callback.func for callback in callbacks] == [run_export_job.delay]
+        job = response.json()
+        assert job["status"] == "pending"
+        assert job["artifact"] is None
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post(
+                url, {"kind": "tasks"}, content_type="application/json", headers=headers
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["id"] == job["id"]
+        assert callbacks == []
+        response = client.post(
+            url,
+            {"kind": "tasks", "file_format": "csv"},
+            content_type="application/json",
+            headers=headers,
+        )
+        assert response.status_code == HTTPStatus.ACCEPTED
+        detail_url = reverse_lazy("api-1.0.0:export_job_detail", args=[job["id"]])
+        response = client.get(
+            detail_url, headers={"Authorization": f"Bearer {user_fixture2.token}"}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @staticmethod
+    def test_create_after_active_job_finished(
+        rf: RequestFactory, user_fixture: User, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a job finishing after blocking the insert lets it be retried."""
+        active = ExportJob.objects.create(
+            user=user_fixture, kind="tasks", file_format="ndjson"
+        )
+        filter_jobs = ExportJob.objects.filter
+
+        def finish_active(**kwargs: object) -> QuerySet:
+            filter_jobs(pk=active.pk).update(status="done")
+            return filter_jobs(**kwargs)
+
+        monkeypatch.setattr(ExportJob.objects, "filter", finish_active)
+        request = rf.post("/")
+        request.user = user_fixture
+        status, job = create_export_job(request, ExportJobIn(kind="tasks"))
+        assert status == HTTPStatus.ACCEPTED
+        assert job.pk != active.pk
+
+    @staticmethod
+    def test_create_blog_permission(client: Client, user_fixture: User) -> None:
+        """Test blog exports need the blog post and comment view permissions."""
+        url = reverse_lazy("api-1.0.0:export_job_create")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        response = client.post(
+            url, {"kind": "blog"}, content_type="application/json", headers=headers
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.json() == {"message": NO_PERMISSION}
+        user_fixture.user_permissions.add(
+            *Permission.objects.filter(codename__in=["view_blogpost", "view_comment"])
+        )
+        response = client.post(
+            url, {"kind": "blog"}, content_type="application/json", headers=headers
+        )
+        assert response.status_code == HTTPStatus.ACCEPTED
+
+    @staticmethod
+    def test_poll_done(
+        client: Client,
+        user_fixture: User,
+        django_capture_on_commit_callbacks: Callable,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test polling a finished job returns its progress and artifact link."""
+        monkeypatch.setitem(celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", value=True)
+        task = Task.objects.create(title="task", created_by=user_fixture, status="new")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse_lazy("api-1.0.0:export_job_create"),
+                {"kind": "tasks"},
+                content_type="application/json",
+                headers=headers,
+            )
+        url = reverse_lazy("api-1.0.0:export_job_detail", args=[response.json()["id"]])
+        job = client.get(url, headers=headers).json()
+        assert job["status"] == "done"
+        assert job["progress"] == job["total"] == 1
+        artifact = ExportJob.objects.get(pk=job["id"]).artifact
+        assert job["artifact"] == artifact.url
+        with artifact.open("rb"), zipfile.ZipFile(artifact) as archive:
+            assert archive.namelist() == ["tasks.ndjson"]
+            assert str(task.pk) in archive.read("tasks.ndjson").decode()
+        default_storage.delete(artifact.name)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from pytest_django.live_server_helper import LiveServer
+
+from authentication.models import User
+from blog.models import BlogPost, Comment, Topic
+from main_project.management.commands.benchmark_api import benchmark
+from todo.models import Task
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest(live_server: LiveServer, tmp_path: Path) -> None:
+    """Test a seeded load test reports every endpoint and compares runs."""
+    output = tmp_path / "run.json"
+    call_command(
+        "loadtest",
+        live_server.url,
+        seed=True,
+        users=2,
+        topics=3,
+        posts=4,
+        comments=5,
+        tasks=2,
+        requests=4,
+        concurrency=2,
+        output=output,
+        stdout=StringIO(),
+    )
+    assert User.objects.filter(email__startswith="loadtest").count() == 2  # noqa: PLR2004
+    assert Topic.objects.count() == 3  # noqa: PLR2004
+    assert BlogPost.objects.count() == 4  # noqa: PLR2004
+    assert Comment.objects.count() == 5  # noqa: PLR2004
+    assert Task.objects.count() == 4  # noqa: PLR2004
+    report = json.loads(output.read_text())
+    assert set(report["endpoints"]) == {
+        "api_task_list",
+        "api_topic_list",
+        "api_blog_post_list",
+        "api_blog_post_detail",
+        "post_list",
+        "post_detail",
+        "task_list",
+    }
+    for result in report["endpoints"].values():
+        assert result["errors"] == 0
+        assert result["rps"] > 0
+        assert result["p50"] <= result["p95"] <= result["p99"]
+    out = StringIO()
+    call_command(
+        "loadtest",
+        live_server.url,
+        requests=2,
+        concurrency=1,
+        output=tmp_path / "next.json",
+        baseline=output,
+        stdout=out,
+    )
+    assert "api_task_list: p95 " in out.getvalue()
+
+
+def test_benchmark_timeout() -> None:
+    """Test requests to a server that never answers count as errors."""
+    connections: list[asyncio.StreamWriter] = []
+
+    async def stall(_: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connections.append(writer)
+
+    async def run() -> dict:
+        async with await asyncio.start_server(stall, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            result = await benchmark(f"http://127.0.0.1:{port}/", 4, 2, timeout=0.1)
+            for writer in connections:
+                writer.close()
+            return result
+
+    result = asyncio.run(run())
+    assert result["errors"] == 4  # noqa: PLR2004
+    assert result["rps"] == 0
+    assert len(connections) == 4  # noqa: PLR2004
@@ -0,0 +1,159 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from pytest_django.fixtures import SettingsWrapper
+
+from authentication.models import PROFILE_IMAGE_WIDTHS, User
+from authentication.tasks import render_profile_image
+from blog.models import POST_IMAGE_WIDTHS, BlogPost
+from common.renditions import create_renditions, delete_renditions, render_field
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings: SettingsWrapper, tmp_path: Path) -> None:
+    """Keep rendition files in a temporary media root."""
+    settings.MEDIA_ROOT = tmp_path
+
+
+def render_callbacks(callbacks: list[Callable]) -> list[Callable]:
+    """Keep the callbacks rendering profile images, e.g. without token ones."""
+    return [
+        callback
+        for callback in callbacks
+        if getattr(callback, "func", None) == render_profile_image.delay
+    ]
+
+
+@pytest.fixture
+def profile_image_user(
+    user_fixture: User, image_upload_fixture: SimpleUploadedFile
+) -> User:
+    """User with a profile image."""
+    user_fixture.profile_image = image_upload_fixture
+    user_fixture.save()
+    return user_fixture
+
+
+def test_create_renditions(profile_image_user: User) -> None:
+    """Test renditions are created for each format without upscaling."""
+    renditions = create_renditions(profile_image_user.profile_image, [128, 900])
+    assert renditions["source"] == profile_image_user.profile_image.name
+    assert (renditions["width"], renditions["height"]) == (612, 612)
+    assert renditions["placeholder"].startswith("data:image/webp;base64,")
+    for extension in ["webp", "jpeg"]:
+        assert [item["width"] for item in renditions[extension]] == [128, 612]
+        for item in renditions[extension]:
+            assert item["name"].endswith(f".{extension}")
+            assert default_storage.exists(item["name"])
+    delete_renditions(renditions)
+    assert not default_storage.exists(renditions["webp"][0]["name"])
+
+
+def test_render_field(profile_image_user: User) -> None:
+    """Test renditions and dimensions are stored once per image."""
+    render_field(User, profile_image_user.pk, "profile_image", PROFILE_IMAGE_WIDTHS)
+    profile_image_user.refresh_from_db()
+    renditions = profile_image_user.profile_image_renditions
+    assert profile_image_user.profile_image_width == 612  # noqa: PLR2004
+    assert profile_image_user.profile_image_height == 612  # noqa: PLR2004
+    assert [item["width"] for item in renditions["jpeg"]] == PROFILE_IMAGE_WIDTHS
+    render_field(User, profile_image_user.pk, "profile_image", PROFILE_IMAGE_WIDTHS)
+    profile_image_user.refresh_from_db()
+    assert profile_image_user.profile_image_renditions == renditions
+
+
+def test_removed_image_deletes_renditions(
+    profile_image_user: User, django_capture_on_commit_callbacks: Callable
+) -> None:
+    """Test removing the image forgets and deletes its renditions."""
+    render_field(User, profile_image_user.pk, "profile_image", PROFILE_IMAGE_WIDTHS)
+    profile_image_user.refresh_from_db()
+    name = profile_image_user.profile_image_renditions["webp"][0]["name"]
+    profile_image_user.profile_image = None
+    with django_capture_on_commit_callbacks(execute=True):
+        profile_image_user.save()
+    profile_image_user.refresh_from_db()
+    assert profile_image_user.profile_image_renditions == {}
+    assert profile_image_user.profile_image_width is None
+    assert not default_storage.exists(name)
+
+
+def test_deleted_instances_delete_renditions(
+    profile_image_user: User,
+    image_upload_fixture: SimpleUploadedFile,
+    django_capture_on_commit_callbacks: Callable,
+) -> None:
+    """Test deleting a post or a user deletes its renditions after commit."""
+    image_upload_fixture.seek(0)
+    post = BlogPost.objects.create(
+        title="Test", author=profile_image_user, image=image_upload_fixture
+    )
+    render_field(BlogPost, post.pk, "image", POST_IMAGE_WIDTHS)
+    render_field(User, profile_image_user.pk, "profile_image", PROFILE_IMAGE_WIDTHS)
+    post.refresh_from_db()
+    profile_image_user.refresh_from_db()
+    names = [
+        post.image_renditions["webp"][0]["name"],
+        profile_image_user.profile_image_renditions["jpeg"][0]["name"],
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+        profile_image_user.delete()
+    assert not any(default_storage.exists(name) for name in names)
+
+
+def test_render_field_deleted(profile_image_user: User) -> None:
+    """Test instances deleted before their renditions are skipped."""
+    pk = profile_image_user.pk
+    profile_image_user.delete()
+    render_field(User, pk, "profile_image", PROFILE_IMAGE_WIDTHS)
+
+
+def test_image_change_schedules_renditions(
+    profile_image_user: User,
+    image_upload_fixture: SimpleUploadedFile,
+    django_capture_on_commit_callbacks: Callable,
+) -> None:
+    """Test saving a new image queues its renditions, other saves do not."""
+    with django_capture_on_commit_callbacks() as callbacks:
+        profile_image_user.save(update_fields=["first_name"])
+    assert render_callbacks(callbacks) == []
+    image_upload_fixture.seek(0)
+    profile_image_user.profile_image = image_upload_fixture
+    with django_capture_on_commit_callbacks() as callbacks:
+        profile_image_user.save()
+    assert len(render_callbacks(callbacks)) == 1
+
+
+def test_picture_tag(profile_image_user: User) -> None:
+    """Test picture tag uses the renditions once they are created."""
+    template = Template(
+        '{% load common_tags %}{% picture user "profile_image" 128 alt="profile" %}'
+    )
+    html = template.render(Context({"user": profile_image_user}))
+    assert f'src="{profile_image_user.profile_image.url}"' in html
+    assert "srcset" not in html
+    render_field(User, profile_image_user.pk, "profile_image", PROFILE_IMAGE_WIDTHS)
+    profile_image_user.refresh_from_db()
+    html = template.render(Context({"user": profile_image_user}))
+    renditions = profile_image_user.profile_image_renditions
+    assert '<source type="image/webp"' in html
+    assert f"{default_storage.url(renditions['webp'][-1]['name'])} 256w" in html
+    assert f'src="{default_storage.url(renditions["jpeg"][2]["name"])}"' in html
+    assert renditions["placeholder"] in html
+
+
+def test_picture_tag_default(user_fixture: User) -> None:
+    """Test picture tag falls back to the default url without image."""
+    template = Template(
+        '{% load common_tags %}{% picture user "profile_image" 25 30 default="x.jpg" %}'
+    )
+    html = template.render(Context({"user": user_fixture}))
+    assert 'src="x.jpg"' in html
+    assert 'height="30"' in html
@@ -0,0 +1,143 @@
+import zipfile
+from collections.abc import Iterator
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+import common.tasks
+from authentication.models import User
+from blog.models import BlogPost, Comment
+from common.models import ExportJob
+from common.tasks import (
+    EXPORT_TIMEOUT_ERROR,
+    delete_expired_exports,
+    run_export_job,
+)
+from main_project.settings import EXPORT_JOB_LIFETIME
+
+pytestmark = pytest.mark.django_db
+
+
+def test_run_export_job(
+    monkeypatch: pytest.MonkeyPatch,
+    user_fixture: User,
+    image_upload_fixture: SimpleUploadedFile,
+) -> None:
+    """Test blog archives hold the tables and images, progress is counted."""
+    monkeypatch.setattr("common.tasks.EXPORT_CHUNK_SIZE", 1)
+    post = BlogPost.objects.create(
+        title="Image",
+        author=user_fixture,
+        content="content",
+        image=image_upload_fixture,
+    )
+    post2 = BlogPost.objects.create(title="Text", author=user_fixture, content="text")
+    comment = Comment.objects.create(
+        blog_post=post2, author=user_fixture, content="comment"
+    )
+    job = ExportJob.objects.create(user=user_fixture, kind="blog", file_format="csv")
+    run_export_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == "done"
+    assert job.progress == job.total == 4  # noqa: PLR2004
+    assert job.finished_at is not None
+    with job.artifact.open("rb"), zipfile.ZipFile(job.artifact) as archive:
+        assert archive.namelist() == [
+            "blog_posts.csv",
+            "comments.csv",
+            f"images/{post.image.name}",
+        ]
+        comments = archive.read("comments.csv").decode().splitlines()
+        assert comments[1].startswith(
+            f"{comment.pk},{post2.pk},{user_fixture.email},comment,"
+        )
+        image = archive.read(f"images/{post.image.name}")
+    with post.image.open("rb"):
+        assert image == post.image.read()
+
+
+def test_run_export_job_failed(
+    monkeypatch: pytest.MonkeyPatch, user_fixture: User
+) -> None:
+    """Test a failing job is marked failed with the error."""
+    error = "disk full"
+
+    def fail(*_: object) -> None:
+        raise OSError(error)
+
+    monkeypatch.setattr("common.tasks._write_table", fail)
+    job = ExportJob.objects.create(user=user_fixture, kind="tasks", file_format="csv")
+    with pytest.raises(OSError, match=error):
+        run_export_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == "failed"
+    assert job.error == error
+    assert not job.artifact
+
+
+@pytest.mark.parametrize("status", ["running", "done", "failed"])
+def test_run_export_job_not_pending(user_fixture: User, status: str) -> None:
+    """Test redelivered and failed jobs are not run again."""
+    job = ExportJob.objects.create(
+        user=user_fixture, kind="tasks", file_format="csv", status=status
+    )
+    run_export_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == status
+    assert job.total == 0
+    assert not job.artifact
+
+
+def test_run_export_job_failed_while_running(
+    monkeypatch: pytest.MonkeyPatch, user_fixture: User
+) -> None:
+    """Test a job marked failed while it runs stays failed without archive."""
+    job = ExportJob.objects.create(user=user_fixture, kind="tasks", file_format="csv")
+    write_table = common.tasks._write_table  # noqa: SLF001
+
+    def expire(*args: Any) -> Iterator[int]:  # noqa: ANN401
+        ExportJob.objects.filter(pk=job.pk).update(
+            status="failed", error=EXPORT_TIMEOUT_ERROR
+        )
+        yield from write_table(*args)
+
+    monkeypatch.setattr("common.tasks._write_table", expire)
+    monkeypatch.setattr("common.tasks.secrets.token_urlsafe", lambda _: "expired")
+    run_export_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == "failed"
+    assert job.error == EXPORT_TIMEOUT_ERROR
+    assert not job.artifact
+    assert not default_storage.exists("exports/tasks_expired.zip")
+
+
+def test_delete_expired_exports(user_fixture: User) -> None:
+    """Test expired archives are deleted and lost jobs marked failed."""
+    expired_at = timezone.now() - timedelta(seconds=EXPORT_JOB_LIFETIME + 1)
+    expired = ExportJob.objects.create(
+        user=user_fixture, kind="tasks", file_format="csv", status="done"
+    )
+    expired.artifact.save("expired.zip", ContentFile(b"zip"))
+    recent = ExportJob.objects.create(
+        user=user_fixture,
+        kind="tasks",
+        file_format="ndjson",
+        status="done",
+        finished_at=timezone.now(),
+    )
+    lost = ExportJob.objects.create(user=user_fixture, kind="blog", file_format="csv")
+    ExportJob.objects.filter(pk=expired.pk).update(finished_at=expired_at)
+    ExportJob.objects.filter(pk=lost.pk).update(created_at=expired_at)
+    assert delete_expired_exports() == 1
+    assert not default_storage.exists(expired.artifact.name)
+    assert list(ExportJob.objects.order_by("pk").values_list("pk", "status")) == [
+        (recent.pk, "done"),
+        (lost.pk, "failed"),
+    ]
+    lost.refresh_from_db()
+    assert lost.error == EXPORT_TIMEOUT_ERROR
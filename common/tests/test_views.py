@@ -1,11 +1,28 @@
 from http import HTTPStatus
 
+import pytest
 from django.test import Client
 from django.urls import reverse_lazy
 
+from authentication.models import User
+
 
 def test_home_view(client: Client) -> None:
     """Test home view."""
     url = reverse_lazy("common:home")
     response = client.get(url)
     assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_db_pool_stats_view(client: Client, user_fixture: User) -> None:
+    """Test pool stats are shown to staff users only."""
+    url = reverse_lazy("common:db_pool_stats")
+    client.force_login(user_fixture)
+    assert client.get(url).status_code == HTTPStatus.FOUND
+    user_fixture.is_staff = True
+    user_fixture.save()
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    stats = response.json()["pools"]["default"]
+    assert stats["pool_min"] <= stats["pool_size"] <= stats["pool_max"]
@@ -6,4 +6,5 @@ app_name = "common"
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path("status/db-pool/", views.db_pool_stats, name="db_pool_stats"),
 ]
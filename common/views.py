@@ -1,4 +1,8 @@
-from django.http import HttpRequest, HttpResponse
+import os
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
 
 app_name = "common"
@@ -14,3 +18,24 @@ def home(request: HttpRequest) -> HttpResponse:
         HttpResponse: Response
     """
     return render(request, "common/home.html")
+
+
+@staff_member_required
+def db_pool_stats(request: HttpRequest) -> JsonResponse:  # noqa: ARG001
+    """Connection pool statistics of the process serving the request.
+
+    Each web and worker process has its own pools, repeated requests may be
+    answered by different processes.
+
+    Args:
+        request (HttpRequest): Request
+
+    Returns:
+        JsonResponse: Process id and the pool stats of each pooled database.
+    """
+    pools = {
+        alias: connections[alias].pool.get_stats()
+        for alias in connections
+        if getattr(connections[alias], "pool", None) is not None
+    }
+    return JsonResponse({"pid": os.getpid(), "pools": pools})
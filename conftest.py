@@ -1,3 +1,4 @@
 pytest_plugins = [
     "authentication.tests.fixtures",
+    "common.tests.query_budget",
 ]
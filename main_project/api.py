@@ -1,60 +1,95 @@
+from functools import partial
 from http import HTTPStatus
-from typing import Self
+from typing import Any, cast
 
 from django.core.exceptions import PermissionDenied
 from django.http import HttpRequest, HttpResponse
-from ninja import NinjaAPI
-from ninja.security import HttpBearer
+from ninja import NinjaAPI, Router
+from ninja.main import Exc
 
-from authentication.models import User
+from authentication.api.api_v1 import router as authentication_router_v1
 from blog.api.api_v1 import router as blog_router_v1
+from blog.api.api_v1_async import router as blog_async_router_v1
+from common.api.api_v1 import router as common_router_v1
+from main_project.auth import AsyncGlobalAuth, GlobalAuth
+from main_project.conditional import ConditionalResponseError
+from main_project.settings import API_ASYNC
 from todo.api.api_v1 import router as todo_router_v1
+from todo.api.api_v1_async import router as todo_async_router_v1
 
 
-class GlobalAuth(HttpBearer):
-    """Global API authentication."""
+def build_api(
+    routers: dict[str, Router],
+    *,
+    asynchronous: bool,
+    **kwargs: Any,  # noqa: ANN401
+) -> NinjaAPI:
+    """Build an API with the global authentication and exception handlers.
 
-    def authenticate(self: Self, request: HttpRequest, token: str) -> User:
-        """Authenticate user based on token.
-
-        Args:
-            request (HttpRequest): HttpRequestObbject.
-            token (str): User token.
-
-        Raises:
-            PermissionDenied: Raised if user with the given token is not found.
-
-        Returns:
-            User: User object
-        """
-        try:
-            user = User.objects.get(token=token)
-        except User.DoesNotExist as exc:
-            raise PermissionDenied from exc
-        else:
-            request.user = user
-            return user
-
-
-api_v1 = NinjaAPI(version="1.0.0", auth=GlobalAuth(), title="VitorXYZ API Docs")
+    Args:
+        routers (dict[str, Router]): Routers by prefix.
+        asynchronous (bool): Authenticate without blocking, for async routers.
+        **kwargs (Any): NinjaAPI arguments, e.g. ``urls_namespace``.
 
-api_v1.add_router("/todo/", todo_router_v1)
-api_v1.add_router("/blog/", blog_router_v1)
+    Returns:
+        NinjaAPI: API.
+    """
+    api = NinjaAPI(
+        version="1.0.0",
+        auth=AsyncGlobalAuth() if asynchronous else GlobalAuth(),
+        title="VitorXYZ API Docs",
+        **kwargs,
+    )
+    for prefix, router in routers.items():
+        api.add_router(prefix, router)
+    api.add_exception_handler(PermissionDenied, partial(permission_denied, api))
+    api.add_exception_handler(ConditionalResponseError, conditional_response)
+    return api
 
 
-@api_v1.exception_handler(PermissionDenied)
-def permission_denied(request: HttpRequest, _: Exception) -> HttpResponse:
+def permission_denied(
+    api: NinjaAPI, request: HttpRequest, _: Exception
+) -> HttpResponse:
     """Permission denied response.
 
     Args:
+        api (NinjaAPI): API answering the request.
         request (HttpRequest): HttpRequest object.
         exc (Exception): Exception
 
     Returns:
         HttpResponse: Http response object
     """
-    return api_v1.create_response(
+    return api.create_response(
         request=request,
         data={"error": "Bad credentials"},
         status=HTTPStatus.UNAUTHORIZED,
     )
+
+
+def conditional_response(
+    request: HttpRequest,  # noqa: ARG001
+    exc: Exc[ConditionalResponseError],
+) -> HttpResponse:
+    """Not modified or precondition failed response.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        exc (Exc[ConditionalResponseError]): Exception holding the response,
+            Ninja passes the raised instance.
+
+    Returns:
+        HttpResponse: Http response object
+    """
+    return cast("ConditionalResponseError", exc).response
+
+
+api_v1 = build_api(
+    {
+        "/todo/": todo_async_router_v1 if API_ASYNC else todo_router_v1,
+        "/blog/": blog_async_router_v1 if API_ASYNC else blog_router_v1,
+        "/auth/": authentication_router_v1,
+        "/export/": common_router_v1,
+    },
+    asynchronous=API_ASYNC,
+)
@@ -0,0 +1,73 @@
+from typing import Self
+
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest
+from ninja.security import HttpBearer
+
+from authentication.models import User
+from authentication.tokens import (
+    aauthenticate_access_token,
+    aauthenticate_token,
+    authenticate_access_token,
+    authenticate_token,
+    is_signed_token,
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class GlobalAuth(HttpBearer):
+    """Global API authentication."""
+
+    def authenticate(self: Self, request: HttpRequest, token: str) -> User:
+        """Authenticate user based on a signed access token or a stored token.
+
+        Signed tokens need the "read" scope for safe methods, "write" for the
+        others, see ``authenticate_access_token`` and ``authenticate_token``.
+
+        Args:
+            request (HttpRequest): HttpRequestObbject.
+            token (str): User token.
+
+        Raises:
+            PermissionDenied: Raised if the token is not valid for an active user.
+
+        Returns:
+            User: User object
+        """
+        if is_signed_token(token):
+            scope = "read" if request.method in SAFE_METHODS else "write"
+            user = authenticate_access_token(token, scope)
+        else:
+            user = authenticate_token(token)
+        if user is None:
+            raise PermissionDenied
+        request.user = user
+        return user
+
+
+class AsyncGlobalAuth(HttpBearer):
+    """Global API authentication of async routes."""
+
+    async def authenticate(self: Self, request: HttpRequest, token: str) -> User:
+        """Authenticate user without blocking the event loop, as ``GlobalAuth``.
+
+        Args:
+            request (HttpRequest): HttpRequest object.
+            token (str): User token.
+
+        Raises:
+            PermissionDenied: Raised if the token is not valid for an active user.
+
+        Returns:
+            User: User object
+        """
+        if is_signed_token(token):
+            scope = "read" if request.method in SAFE_METHODS else "write"
+            user = await aauthenticate_access_token(token, scope)
+        else:
+            user = await aauthenticate_token(token)
+        if user is None:
+            raise PermissionDenied
+        request.user = user
+        return user
@@ -0,0 +1,439 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import partial, wraps
+from hashlib import sha256
+from http import HTTPStatus
+from inspect import iscoroutinefunction
+from typing import Any, ClassVar, Self
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, urlencode
+from django.views import View
+from ninja.operation import Operation
+from ninja.utils import contribute_operation_callback
+
+from main_project.settings import API_CACHE_TIMEOUT, FRAGMENT_CACHE_TIMEOUT
+
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+COUNTERS = ("hit", "miss")
+# Names of the cached routes, to report their counters.
+cached_routes: set[str] = set()
+
+
+def cache_response(
+    *dependencies: type[models.Model],
+    timeout: int = API_CACHE_TIMEOUT,
+    per_user: bool = False,
+) -> Callable:
+    """Decorate a Ninja GET route to cache its serialized JSON response.
+
+    The key is built from the path, the sorted query string and the user
+    attributes that change the response, and versioned with the namespaces
+    of the models the response shows: saving or deleting any of them makes
+    the cached responses unreachable. Cached ETag and Last-Modified headers
+    still answer conditional requests with 304. Hits and misses are counted
+    per route. Async routes make the cache round trips in one thread hop.
+
+    Args:
+        *dependencies (type[models.Model]): Models the response shows, they
+            must be registered with ``invalidate_on_change``.
+        timeout (int, optional): Seconds a response is kept. Defaults to
+            API_CACHE_TIMEOUT.
+        per_user (bool, optional): Cache a response per user instead of per
+            staff and superuser flags. Defaults to False.
+
+    Returns:
+        Callable: Route decorator, placed right below the router decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+        cached_routes.add(name)
+        lookup = partial(
+            _lookup, name=name, dependencies=dependencies, per_user=per_user
+        )
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                cached = await sync_to_async(lookup)(request)
+                if cached is None:
+                    return await func(request, *args, **kwargs)
+                return _cached_response(request, cached)
+
+        else:
+
+            @wraps(func)
+            def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                cached = lookup(request)
+                if cached is None:
+                    return func(request, *args, **kwargs)
+                return _cached_response(request, cached)
+
+        # Do not append to the callbacks list shared with the wrapped route.
+        setattr(  # noqa: B010
+            wrapper,
+            "_ninja_contribute_to_operation",
+            [*getattr(func, "_ninja_contribute_to_operation", [])],
+        )
+        contribute_operation_callback(wrapper, partial(_store, timeout=timeout))
+        return wrapper
+
+    return decorator
+
+
+class FragmentCacheMixin(View):
+    """Serve repeated HTMX requests of a list view from cached fragments.
+
+    Partial responses are cached by path, query string, e.g. the search, sort
+    and page, and the generations of the models they show, so hits render no
+    template and run no list query. Full page requests are left to the view.
+    """
+
+    fragment_dependencies: ClassVar[tuple[type[models.Model], ...]] = ()
+    # Vary on the user when permission checks change the markup.
+    fragment_per_user: ClassVar[bool] = False
+    fragment_timeout: ClassVar[int] = FRAGMENT_CACHE_TIMEOUT
+
+    def get(
+        self: Self, request: HttpRequest, *args: str, **kwargs: str
+    ) -> HttpResponse:
+        """Get the cached fragment of an HTMX request, render and cache it on miss."""
+        if not request.headers.get("Hx-Request"):
+            return super().get(request, *args, **kwargs)
+        key = response_key(
+            request,
+            self.fragment_dependencies,
+            per_user=self.fragment_per_user,
+            prefix="fragment",
+        )
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content, headers={"X-Cache": "HIT"})
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            response.render()
+            cache.set(key, response.content, self.fragment_timeout)
+        return response
+
+
+class LocalCache:
+    """Thread safe in-process LRU cache whose entries expire after a timeout.
+
+    It sits in front of the shared cache for hot lookups, entries can not be
+    invalidated from other processes, so the timeout bounds their staleness.
+    """
+
+    def __init__(self: Self, max_size: int, timeout: float) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_size (int): Number of entries kept, 0 disables the cache.
+            timeout (float): Seconds an entry is kept.
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self: Self, key: Hashable, default: Any = None) -> Any:  # noqa: ANN401
+        """Get a fresh entry and mark it as recently used.
+
+        Args:
+            key (Hashable): Entry key.
+            default (Any, optional): Returned if the key is missing or expired.
+                Defaults to None.
+
+        Returns:
+            Any: Cached value or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self: Self, key: Hashable, value: Any) -> None:  # noqa: ANN401
+        """Store an entry, evicting the least recently used one when full.
+
+        Args:
+            key (Hashable): Entry key.
+            value (Any): Value to store.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self: Self, key: Hashable) -> None:
+        """Remove an entry if present.
+
+        Args:
+            key (Hashable): Entry key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self: Self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def response_key(
+    request: HttpRequest,
+    dependencies: tuple[type[models.Model], ...],
+    *,
+    per_user: bool,
+    prefix: str = "api:response",
+) -> str:
+    """Build the cache key of a response.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        dependencies (tuple[type[models.Model], ...]): Models the response shows.
+        per_user (bool): Vary on the user instead of its permission flags.
+        prefix (str, optional): Key prefix. Defaults to "api:response".
+
+    Returns:
+        str: Cache key.
+    """
+    user = request.user
+    if per_user:
+        scope = f"user={user.pk}"
+    else:
+        scope = f"staff={user.is_staff},superuser={user.is_superuser}"
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    digest = sha256(f"{request.path}?{query}|{scope}".encode()).hexdigest()
+    versions = ".".join(str(version) for version in namespace_versions(dependencies))
+    return f"{prefix}:{versions}:{digest}"
+
+
+def invalidate_on_change(*models_to_watch: type[models.Model]) -> None:
+    """Bump the namespace of models after each save and delete is committed.
+
+    Args:
+        *models_to_watch (type[models.Model]): Models shown by cached routes.
+    """
+    for model in models_to_watch:
+        for name, signal in [("save", post_save), ("delete", post_delete)]:
+            signal.connect(
+                _bump_on_commit,
+                sender=model,
+                dispatch_uid=f"api_cache_{name}_{model._meta.label_lower}",  # noqa: SLF001
+            )
+
+
+def invalidate(model: type[models.Model]) -> None:
+    """Bump the namespace of a model once the current transaction commits.
+
+    Needed after writes that send no signals, e.g. bulk and queryset updates.
+
+    Args:
+        model (type[models.Model]): Model class.
+    """
+    transaction.on_commit(partial(bump_namespace, model))
+
+
+def bump_namespace(model: type[models.Model]) -> None:
+    """Invalidate every cached response showing a model.
+
+    Args:
+        model (type[models.Model]): Model class.
+    """
+    key = _namespace_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def namespace_versions(dependencies: tuple[type[models.Model], ...]) -> list[int]:
+    """Get the namespace versions of models with a single cache round trip.
+
+    Missing versions start from the current time, so an evicted version can
+    not bring back responses cached under an older one.
+
+    Args:
+        dependencies (tuple[type[models.Model], ...]): Model classes.
+
+    Returns:
+        list[int]: Version of each model.
+    """
+    keys = [_namespace_key(model) for model in dependencies]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key, 0)
+    return [versions[key] for key in keys]
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Get the hit and miss counters of the cached routes.
+
+    Returns:
+        dict[str, dict[str, int]]: Counters by route name.
+    """
+    keys = {
+        (route, counter): f"api:stats:{route}:{counter}"
+        for route in sorted(cached_routes)
+        for counter in COUNTERS
+    }
+    values = cache.get_many(keys.values())
+    stats: dict[str, dict[str, int]] = {}
+    for (route, counter), key in keys.items():
+        stats.setdefault(route, {})[counter] = values.get(key, 0)
+    return stats
+
+
+def reset_stats() -> None:
+    """Reset the hit and miss counters of the cached routes."""
+    cache.delete_many(
+        [
+            f"api:stats:{route}:{counter}"
+            for route in cached_routes
+            for counter in COUNTERS
+        ]
+    )
+
+
+def _namespace_key(model: type[models.Model]) -> str:
+    """Get the cache key holding the namespace version of a model."""
+    return f"api:version:{model._meta.label_lower}"  # noqa: SLF001
+
+
+def _bump_on_commit(sender: type[models.Model], **kwargs: Any) -> None:  # noqa: ANN401, ARG001
+    """Signal receiver bumping the namespace of the sender model."""
+    invalidate(sender)
+
+
+def _count(route: str, counter: str) -> None:
+    """Increment a hit or miss counter of a route."""
+    key = f"api:stats:{route}:{counter}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def _lookup(
+    request: HttpRequest,
+    name: str,
+    dependencies: tuple[type[models.Model], ...],
+    *,
+    per_user: bool,
+) -> dict | None:
+    """Get the cached response of a request and count the hit or miss.
+
+    On miss the key is kept on the request for ``_store``.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        name (str): Route name.
+        dependencies (tuple[type[models.Model], ...]): Models the response shows.
+        per_user (bool): Vary on the user instead of its permission flags.
+
+    Returns:
+        dict | None: Cached content and headers, None on miss.
+    """
+    key = response_key(request, dependencies, per_user=per_user)
+    cached = cache.get(key)
+    if cached is None:
+        _count(name, "miss")
+        request.api_cache_key = key
+        return None
+    _count(name, "hit")
+    return cached
+
+
+def _cached_response(request: HttpRequest, cached: dict) -> HttpResponse:
+    """Build the response of a cache hit, 304 if the client version is current.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        cached (dict): Cached content and headers.
+
+    Returns:
+        HttpResponse: Cached response.
+    """
+    response = HttpResponse(
+        cached["content"], headers={**cached["headers"], "X-Cache": "HIT"}
+    )
+    last_modified = cached["headers"].get("Last-Modified")
+    return get_conditional_response(
+        request,
+        etag=cached["headers"].get("ETag"),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+        response=response,
+    )
+
+
+def _store(operation: Operation, timeout: int) -> None:
+    """Operation callback storing successful responses of cache misses.
+
+    The response is stored once Ninja serialized it, so hits skip both the
+    queries and the serialization.
+
+    Args:
+        operation (Operation): Ninja operation of the route.
+        timeout (int): Seconds a response is kept.
+    """
+    run = operation.run
+
+    # Callbacks run before Ninja flags async operations, check the method.
+    async def arun_and_store(request: HttpRequest, **kwargs: Any) -> HttpResponse:  # noqa: ANN401
+        response = await run(request, **kwargs)
+        cached = _cacheable(request, response)
+        if cached is not None:
+            await cache.aset(request.api_cache_key, cached, timeout)
+        return response
+
+    def run_and_store(request: HttpRequest, **kwargs: Any) -> HttpResponse:  # noqa: ANN401
+        response = run(request, **kwargs)
+        cached = _cacheable(request, response)
+        if cached is not None:
+            cache.set(request.api_cache_key, cached, timeout)
+        return response
+
+    setattr(  # noqa: B010
+        operation, "run", arun_and_store if iscoroutinefunction(run) else run_and_store
+    )
+
+
+def _cacheable(request: HttpRequest, response: HttpResponse) -> dict | None:
+    """Get the content and headers to store of a cache miss response.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        response (HttpResponse): Serialized response.
+
+    Returns:
+        dict | None: Content and headers, None if the response is not stored.
+    """
+    if (
+        getattr(request, "api_cache_key", None) is None
+        or response.status_code != HTTPStatus.OK
+    ):
+        return None
+    headers = {
+        header: response.headers[header]
+        for header in CACHED_HEADERS
+        if header in response.headers
+    }
+    return {"content": response.content.decode(), "headers": headers}
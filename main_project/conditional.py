@@ -0,0 +1,165 @@
+from collections.abc import Callable, Sequence
+from functools import wraps
+from typing import Any, Self
+
+from django.db import models, transaction
+from django.db.models import Count, F, Max, QuerySet
+from django.db.models.functions import Greatest
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalResponseError(Exception):
+    """Raised to answer a request with 304 Not Modified or 412 Precondition Failed.
+
+    The API exception handler returns the response, so routes stop before
+    fetching and serializing data the client already holds.
+    """
+
+    def __init__(self: Self, response: HttpResponse) -> None:
+        """Store the conditional response.
+
+        Args:
+            response (HttpResponse): 304 or 412 response.
+        """
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def check_conditions(
+    request: HttpRequest,
+    queryset: QuerySet,
+    fields: Sequence[str] = ("updated_at",),
+    response: HttpResponse | None = None,
+) -> None:
+    """Evaluate the conditional headers of a request against a queryset.
+
+    The validators come from a single aggregate query: the latest modification
+    time over the given fields, e.g. of the item and of the related items its
+    schema shows, and the number of rows, so deletes change list ETags too.
+    Nothing is checked when the queryset is empty, the route then answers as
+    usual, e.g. with 404.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        queryset (QuerySet): Item or list the route responds with.
+        fields (Sequence[str], optional): Modification time fields, "__"
+            separated for related items. Defaults to ("updated_at",).
+        response (HttpResponse | None, optional): Route temporal response that
+            receives the ETag and Last-Modified headers. Defaults to None.
+
+    Raises:
+        ConditionalResponseError: Raised if the client version is current on
+            GET/HEAD, or if an If-Match/If-Unmodified-Since precondition fails.
+    """
+    validators = queryset.order_by().aggregate(**_validators(fields))
+    _evaluate(request, validators, response)
+
+
+async def acheck_conditions(
+    request: HttpRequest,
+    queryset: QuerySet,
+    fields: Sequence[str] = ("updated_at",),
+    response: HttpResponse | None = None,
+) -> None:
+    """Async ``check_conditions``.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        queryset (QuerySet): Item or list the route responds with.
+        fields (Sequence[str], optional): Modification time fields, "__"
+            separated for related items. Defaults to ("updated_at",).
+        response (HttpResponse | None, optional): Route temporal response that
+            receives the ETag and Last-Modified headers. Defaults to None.
+
+    Raises:
+        ConditionalResponseError: Raised if the client version is current on
+            GET/HEAD, or if an If-Match/If-Unmodified-Since precondition fails.
+    """
+    validators = await queryset.order_by().aaggregate(**_validators(fields))
+    _evaluate(request, validators, response)
+
+
+def precondition(
+    model: type[models.Model],
+    param: str,
+    fields: Sequence[str] = ("updated_at",),
+    owner_field: str | None = None,
+) -> Callable:
+    """Decorate a write route to honor If-Match and If-Unmodified-Since.
+
+    When one of the headers is sent the item row stays locked from the check
+    until the route returns, so no other write slips in between and gets lost.
+    Requests without them run the route unchanged.
+
+    Args:
+        model (type[models.Model]): Model of the item.
+        param (str): Route parameter holding the item primary key.
+        fields (Sequence[str], optional): Modification time fields, as in
+            ``check_conditions``. Defaults to ("updated_at",).
+        owner_field (str | None, optional): Only items of the request user
+            are checked, others are left to the route. Defaults to None.
+
+    Returns:
+        Callable: Route decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            headers = {"HTTP_IF_MATCH", "HTTP_IF_UNMODIFIED_SINCE"}
+            if headers.isdisjoint(request.META):
+                return func(request, *args, **kwargs)
+            queryset = model.objects.filter(pk=kwargs[param])
+            if owner_field is not None:
+                queryset = queryset.filter(**{owner_field: request.user})
+            with transaction.atomic():
+                list(queryset.select_for_update().values_list("pk"))
+                check_conditions(request, queryset, fields)
+                return func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _validators(fields: Sequence[str]) -> dict:
+    """Build the aggregates of the latest modification time and the row count.
+
+    Args:
+        fields (Sequence[str]): Modification time fields.
+
+    Returns:
+        dict: Aggregate expressions by name.
+    """
+    expression = Greatest(*fields) if len(fields) > 1 else F(fields[0])
+    return {"last_modified": Max(expression), "count": Count("pk")}
+
+
+def _evaluate(
+    request: HttpRequest, validators: dict, response: HttpResponse | None
+) -> None:
+    """Evaluate the conditional headers of a request against the validators.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        validators (dict): Latest modification time and row count.
+        response (HttpResponse | None): Route temporal response, if any.
+
+    Raises:
+        ConditionalResponseError: Raised if the request is answered here.
+    """
+    last_modified = validators["last_modified"]
+    if last_modified is None:
+        return
+    timestamp = int(last_modified.timestamp())
+    etag = quote_etag(f"{validators['count']}-{last_modified.timestamp():f}")
+    if response is not None:
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(timestamp)
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=timestamp, response=response
+    )
+    if conditional is not None and conditional is not response:
+        raise ConditionalResponseError(conditional)
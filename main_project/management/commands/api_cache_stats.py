@@ -0,0 +1,34 @@
+from argparse import ArgumentParser
+from typing import Self
+
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from main_project.cache import cache_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """Report the API response cache counters."""
+
+    help = "Show the hit and miss counters of the cached API routes."
+
+    def add_arguments(self: Self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters after reporting."
+        )
+
+    def handle(self: Self, *args: str, **options: str) -> None:  # noqa:ARG002
+        """Django handle command."""
+        # Load the urls, the cached routes register themselves on import.
+        get_resolver().url_patterns  # noqa: B018
+        for route, counters in cache_stats().items():
+            total = counters["hit"] + counters["miss"]
+            ratio = counters["hit"] / total if total else 0
+            self.stdout.write(
+                f"{route}: {counters['hit']} hits, {counters['miss']} misses "
+                f"({ratio:.0%} hit ratio)"
+            )
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,179 @@
+import asyncio
+import statistics
+import time
+from argparse import ArgumentParser
+from typing import Any, Self
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+INVALID_TARGET = (
+    "Targets are name=url, e.g. asgi=http://localhost:8000/api/v1/todo/task"
+)
+CHUNKED = "chunked"
+# Seconds a request may take, stalled requests count as errors.
+REQUEST_TIMEOUT = 10.0
+
+
+class Command(BaseCommand):
+    """Compare the throughput of API servers under concurrency."""
+
+    help = (
+        "Send the same requests to running API servers, e.g. the sync WSGI "
+        "application (uvicorn --interface wsgi main_project.wsgi:application) "
+        "and the async one (web/start_asgi.sh), and report requests per "
+        "second and latency percentiles of each."
+    )
+
+    def add_arguments(self: Self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        parser.add_argument("targets", nargs="+", help="Servers as name=url.")
+        parser.add_argument(
+            "--requests", type=int, default=1000, help="Requests per target."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Connections sending requests at the same time.",
+        )
+        parser.add_argument("--token", default="", help="API bearer token.")
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=REQUEST_TIMEOUT,
+            help="Seconds before a request counts as an error.",
+        )
+
+    def handle(self: Self, *args: str, **options: Any) -> None:  # noqa: ARG002, ANN401
+        """Django handle command."""
+        for target in options["targets"]:
+            name, _, url = target.partition("=")
+            if not url.startswith("http://"):
+                raise CommandError(INVALID_TARGET)
+            result = asyncio.run(
+                benchmark(
+                    url,
+                    options["requests"],
+                    options["concurrency"],
+                    options["token"],
+                    timeout=options["timeout"],
+                )
+            )
+            self.stdout.write(
+                f"{name}: {result['rps']:.1f} req/s, "
+                f"p50 {result['p50']:.1f} ms, p95 {result['p95']:.1f} ms, "
+                f"p99 {result['p99']:.1f} ms, "
+                f"{result['errors']} errors"
+            )
+
+
+async def benchmark(  # noqa: PLR0913
+    url: str,
+    requests: int,
+    concurrency: int,
+    token: str = "",
+    headers: dict[str, str] | None = None,
+    timeout: float = REQUEST_TIMEOUT,  # noqa: ASYNC109
+) -> dict:
+    """Send GET requests over keep-alive connections and time them.
+
+    A request not answered within the timeout counts as an error and its
+    connection is closed.
+
+    Args:
+        url (str): Plain HTTP url.
+        requests (int): Number of requests.
+        concurrency (int): Number of connections.
+        token (str, optional): Bearer token, empty to send none. Defaults to "".
+        headers (dict[str, str] | None, optional): Extra request headers.
+            Defaults to None.
+        timeout (float, optional): Seconds allowed for each request, connecting
+            included. Defaults to ``REQUEST_TIMEOUT``.
+
+    Returns:
+        dict: Requests per second, p50, p95 and p99 latencies in ms and the
+            number of non 2xx/3xx responses, failed connections and timeouts.
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    lines = f"Host: {parts.netloc}\r\nConnection: keep-alive\r\n"
+    if token:
+        lines += f"Authorization: Bearer {token}\r\n"
+    for name, value in (headers or {}).items():
+        lines += f"{name}: {value}\r\n"
+    request = f"GET {path or '/'} HTTP/1.1\r\n{lines}\r\n".encode()
+    remaining = iter(range(requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        writer = None
+        try:
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    async with asyncio.timeout(timeout):
+                        if writer is None:
+                            reader, writer = await asyncio.open_connection(
+                                parts.hostname, parts.port or 80
+                            )
+                        writer.write(request)
+                        status, keep_alive = await _read_response(reader)
+                except (
+                    OSError,
+                    TimeoutError,
+                    ValueError,
+                    asyncio.IncompleteReadError,
+                ):
+                    errors += 1
+                    keep_alive = False
+                else:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    errors += status >= 400  # noqa: PLR2004
+                if not keep_alive and writer is not None:
+                    writer.close()
+                    writer = None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentiles[49] if percentiles else 0,
+        "p95": percentiles[94] if percentiles else 0,
+        "p99": percentiles[98] if percentiles else 0,
+        "errors": errors,
+    }
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    """Read a whole HTTP response, sized, chunked or ended by closing.
+
+    Args:
+        reader (asyncio.StreamReader): Connection reader.
+
+    Returns:
+        tuple[int, bool]: Status code and whether the connection stays open.
+    """
+    version, status, *_ = (await reader.readline()).split()
+    headers = {}
+    while (line := await reader.readline()) not in {b"\r\n", b""}:
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep_alive = version == b"HTTP/1.1" and headers.get("connection") != "close"
+    if headers.get("transfer-encoding") == CHUNKED:
+        while size := int((await reader.readline()).strip(), 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        keep_alive = False
+    return int(status), keep_alive
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import random
+import secrets
+import subprocess
+from argparse import ArgumentParser
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Self
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import User
+from blog.models import BlogPost, Comment, Topic
+from blog.rendering import content_hash, render_markdown
+from main_project.cache import invalidate
+from main_project.management.commands.benchmark_api import (
+    INVALID_TARGET,
+    REQUEST_TIMEOUT,
+    benchmark,
+)
+from todo.models import Task
+
+EMAIL_PREFIX = "loadtest"
+EMAIL_DOMAIN = "example.com"
+SEED_BATCH_SIZE = 1000
+POST_CONTENT = "# Load test\n\nA post with **some** Markdown and a [link](/).\n"
+NO_POSTS = "No posts to request, seed a dataset with --seed."
+
+
+class Command(BaseCommand):
+    """Measure latency and throughput of API routes and HTMX views."""
+
+    help = (
+        "Seed a dataset of users, tokens, topics, posts, comments and tasks "
+        "with --seed, then send concurrent requests to the API routes and HTMX "
+        "views of a running server, e.g. http://localhost:8000, and report "
+        "p50/p95/p99 latency, requests per second and error rate of each. "
+        "Results are written as JSON, pass a previous file as --baseline to "
+        "compare runs between commits."
+    )
+
+    def add_arguments(self: Self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        parser.add_argument("url", help="Base url of the server.")
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Requests per endpoint."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Connections sending requests at the same time.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=REQUEST_TIMEOUT,
+            help="Seconds before a request counts as an error.",
+        )
+        parser.add_argument(
+            "--seed", action="store_true", help="Add a dataset before the run."
+        )
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--topics", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--comments", type=int, default=5000)
+        parser.add_argument("--tasks", type=int, default=100, help="Tasks per user.")
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Results file. Defaults to loadtest-<commit>.json.",
+        )
+        parser.add_argument(
+            "--baseline", type=Path, help="Results file of a previous run."
+        )
+
+    def handle(self: Self, *args: str, **options: Any) -> None:  # noqa: ARG002, ANN401
+        """Django handle command.
+
+        Raises:
+            CommandError: Raised if the url is not plain HTTP or there are no
+                posts to request.
+        """
+        base_url = options["url"].rstrip("/")
+        if not base_url.startswith("http://"):
+            raise CommandError(INVALID_TARGET)
+        if options["seed"]:
+            seed(
+                options["users"],
+                options["topics"],
+                options["posts"],
+                options["comments"],
+                options["tasks"],
+            )
+        post_id = BlogPost.objects.values_list("pk", flat=True).order_by("pk").first()
+        if post_id is None:
+            raise CommandError(NO_POSTS)
+        user = _traffic_user()
+        results = {}
+        for name, (path, headers) in _endpoints(post_id, user).items():
+            result = asyncio.run(
+                benchmark(
+                    f"{base_url}{path}",
+                    options["requests"],
+                    options["concurrency"],
+                    headers=headers,
+                    timeout=options["timeout"],
+                )
+            )
+            result["error_rate"] = result["errors"] / options["requests"]
+            results[name] = {"path": path, **result}
+            self.stdout.write(
+                f"{name}: {result['rps']:.1f} req/s, p50 {result['p50']:.1f} ms, "
+                f"p95 {result['p95']:.1f} ms, p99 {result['p99']:.1f} ms, "
+                f"{result['error_rate']:.1%} errors"
+            )
+        commit = _commit()
+        report = {
+            "commit": commit,
+            "created_at": timezone.now().isoformat(),
+            "url": base_url,
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "endpoints": results,
+        }
+        output = options["output"] or Path(f"loadtest-{commit or 'local'}.json")
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}."))
+        if options["baseline"]:
+            baseline = json.loads(options["baseline"].read_text())
+            for line in compare(baseline, report):
+                self.stdout.write(line)
+
+
+def seed(users: int, topics: int, posts: int, comments: int, tasks: int) -> None:
+    """Add a load test dataset, users are reused between runs.
+
+    Rows are inserted in bulk, counters are kept by the database triggers.
+
+    Args:
+        users (int): Number of users, created with unusable passwords.
+        topics (int): Number of topics, half of them children of the others.
+        posts (int): Number of blog posts.
+        comments (int): Number of comments.
+        tasks (int): Number of tasks of each user.
+    """
+    rng = random.Random(0)  # noqa: S311
+    emails = [f"{EMAIL_PREFIX}{index}@{EMAIL_DOMAIN}" for index in range(users)]
+    existing = set(
+        User.objects.filter(email__in=emails).values_list("email", flat=True)
+    )
+    new_users = []
+    for email in emails:
+        if email not in existing:
+            user = User(email=email, first_name="Load", last_name="Test")
+            user.set_unusable_password()
+            user.token = secrets.token_urlsafe(32)
+            new_users.append(user)
+    User.objects.bulk_create(new_users)
+    author_ids = list(
+        User.objects.filter(email__in=emails).values_list("pk", flat=True)
+    )
+    suffix = secrets.token_hex(4)
+    new_topics: list[Topic] = []
+    for index in range(topics):
+        parent = new_topics[index // 2] if index % 2 and new_topics else None
+        topic = Topic(name=f"{EMAIL_PREFIX}-{suffix}-{index}", parent_topic=parent)
+        topic.save()
+        new_topics.append(topic)
+    html, digest = render_markdown(POST_CONTENT), content_hash(POST_CONTENT)
+    new_posts = BlogPost.objects.bulk_create(
+        (
+            BlogPost(
+                title=f"Load test post {index}",
+                content=POST_CONTENT,
+                content_html=html,
+                content_hash=digest,
+                topic=rng.choice(new_topics) if new_topics else None,
+                author_id=rng.choice(author_ids),
+            )
+            for index in range(posts)
+        ),
+        batch_size=SEED_BATCH_SIZE,
+    )
+    BlogPost.objects.filter(pk__in=[post.pk for post in new_posts]).update(
+        series=F("pk")
+    )
+    if new_posts:
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    blog_post=rng.choice(new_posts),
+                    author_id=rng.choice(author_ids),
+                    content=f"Load test comment {index}",
+                )
+                for index in range(comments)
+            ),
+            batch_size=SEED_BATCH_SIZE,
+        )
+    Task.objects.bulk_create(
+        (
+            Task(
+                title=f"Load test task {index}",
+                created_by_id=author_id,
+                status=rng.choice(list(Task.STATUS_CHOICES)),
+            )
+            for author_id in author_ids
+            for index in range(tasks)
+        ),
+        batch_size=SEED_BATCH_SIZE,
+    )
+    for model in (User, Topic, BlogPost, Comment, Task):
+        invalidate(model)
+
+
+def compare(baseline: dict, report: dict) -> list[str]:
+    """Describe the latency and throughput changes between two runs.
+
+    Args:
+        baseline (dict): Results of the previous run.
+        report (dict): Results of this run.
+
+    Returns:
+        list[str]: One line per endpoint measured in both runs.
+    """
+    lines = []
+    for name, result in report["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        lines.append(
+            f"{name}: p95 {before['p95']:.1f} -> {result['p95']:.1f} ms "
+            f"({_change(before['p95'], result['p95'])}), "
+            f"{before['rps']:.1f} -> {result['rps']:.1f} req/s "
+            f"({_change(before['rps'], result['rps'])})"
+        )
+    return lines
+
+
+def _traffic_user() -> User:
+    """Get the user sending the requests, with a new token and session."""
+    user = User.objects.filter(email__startswith=EMAIL_PREFIX).order_by("pk").first()
+    if user is None:
+        user = User(email=f"{EMAIL_PREFIX}@{EMAIL_DOMAIN}")
+        user.set_unusable_password()
+    user.token = secrets.token_urlsafe(32)
+    user.save()
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    user.session_key = session.session_key
+    return user
+
+
+def _endpoints(post_id: int, user: User) -> dict[str, tuple[str, dict[str, str]]]:
+    """Get the path and headers of each measured endpoint."""
+    api = {"Authorization": f"Bearer {user.token}"}
+    htmx = {
+        "Cookie": f"{settings.SESSION_COOKIE_NAME}={user.session_key}",
+        "HX-Request": "true",
+    }
+    return {
+        "api_task_list": (reverse("api-1.0.0:task_list"), api),
+        "api_topic_list": (reverse("api-1.0.0:topic_list"), api),
+        "api_blog_post_list": (reverse("api-1.0.0:blog_post_list"), api),
+        "api_blog_post_detail": (
+            reverse("api-1.0.0:blog_post_detail", args=[post_id]),
+            api,
+        ),
+        "post_list": (reverse("blog:post_list"), htmx),
+        "post_detail": (reverse("blog:post_detail", args=[post_id]), htmx),
+        "task_list": (reverse("todo:task_list"), htmx),
+    }
+
+
+def _commit() -> str:
+    """Get the short hash of the checked out commit, empty outside git."""
+    try:
+        result = subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return ""
+    return result.stdout.strip()
+
+
+def _change(before: float, after: float) -> str:
+    """Format the relative change between two values."""
+    return f"{(after - before) / before:+.1%}" if before else "n/a"
@@ -0,0 +1,55 @@
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from typing import Any, Self
+
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+
+from authentication.models import PROFILE_IMAGE_WIDTHS, User
+from authentication.tasks import render_profile_image
+from blog.models import POST_IMAGE_WIDTHS, BlogPost
+from blog.tasks import render_post_image
+from celery.app.task import Task
+from common.renditions import render_field
+
+IMAGE_FIELDS: list[tuple[type[models.Model], str, Sequence[int], Task]] = [
+    (BlogPost, "image", POST_IMAGE_WIDTHS, render_post_image),
+    (User, "profile_image", PROFILE_IMAGE_WIDTHS, render_profile_image),
+]
+
+
+class Command(BaseCommand):
+    """Create missing image renditions."""
+
+    help = "Create renditions of images uploaded before the rendition pipeline."
+
+    def add_arguments(self: Self, parser: ArgumentParser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Send the work to Celery instead of rendering in this process.",
+        )
+
+    def handle(self: Self, *args: str, **options: Any) -> None:  # noqa: ARG002, ANN401
+        """Django handle command."""
+        for model, field, widths, task in IMAGE_FIELDS:
+            pending = (
+                model.objects.alias(source=KT(f"{field}_renditions__source"))
+                .exclude(Q(**{f"{field}__isnull": True}) | Q(**{field: ""}))
+                .filter(Q(source__isnull=True) | ~Q(source=F(field)))
+                .values_list("pk", flat=True)
+                .order_by("pk")
+            )
+            count = 0
+            for pk in pending.iterator():
+                if options["queue"]:
+                    task.delay(pk)
+                else:
+                    render_field(model, pk, field, widths)
+                count += 1
+            self.stdout.write(
+                self.style.SUCCESS(f"{model.__name__}.{field}: {count} images.")
+            )
@@ -0,0 +1,251 @@
+from collections.abc import Callable
+from functools import wraps
+from inspect import iscoroutinefunction
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, models
+from django.db.models import Prefetch, QuerySet
+from django.test.utils import CaptureQueriesContext
+from ninja import Schema
+
+from main_project.settings import API_QUERY_CHECK
+
+
+class QueryCountError(AssertionError):
+    """Raised when serializing a response item runs extra queries."""
+
+
+class Plan:
+    """Relations and columns a schema reads from a model."""
+
+    def __init__(self) -> None:
+        """Initialize an empty plan."""
+        self.select_related: list[str] = []
+        self.prefetch_related: list[Prefetch] = []
+        self.only: list[str] | None = []
+
+
+def optimize(queryset: QuerySet, schema: type[Schema]) -> QuerySet:
+    """Load everything a response schema reads in a constant number of queries.
+
+    Dotted aliases through forward relations become ``select_related`` joins,
+    fields typed with a nested schema over many relations become prefetches and
+    the columns are restricted with ``only()``. When the schema reads anything
+    that is not a model field (properties, resolvers) all columns are kept.
+
+    Args:
+        queryset (QuerySet): Queryset returned by the route.
+        schema (type[Schema]): Response schema of a single item.
+
+    Returns:
+        QuerySet: Optimized queryset.
+    """
+    plan = Plan()
+    _walk(plan, queryset, queryset.model, schema, "")
+    return _apply(queryset, plan)
+
+
+def optimize_queryset(schema: type[Schema]) -> Callable:
+    """Decorate a list route to optimize the queryset it returns.
+
+    With ``API_QUERY_CHECK`` enabled the first item is serialized under a query
+    counter and ``QueryCountError`` flags schemas that still query per item.
+    Async routes are supported.
+
+    Args:
+        schema (type[Schema]): Response schema of a single item.
+
+    Returns:
+        Callable: Route decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> QuerySet:  # noqa: ANN401
+                queryset = optimize(await func(*args, **kwargs), schema)
+                if API_QUERY_CHECK:
+                    await sync_to_async(check_queries)(queryset, schema, func.__name__)
+                return queryset
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> QuerySet:  # noqa: ANN401
+            queryset = optimize(func(*args, **kwargs), schema)
+            if API_QUERY_CHECK:
+                check_queries(queryset, schema, func.__name__)
+            return queryset
+
+        return wrapper
+
+    return decorator
+
+
+def check_queries(queryset: QuerySet, schema: type[Schema], name: str) -> None:
+    """Check that serializing an item of the queryset runs no queries.
+
+    Args:
+        queryset (QuerySet): Optimized queryset.
+        schema (type[Schema]): Response schema of a single item.
+        name (str): Route name used in the error message.
+
+    Raises:
+        QueryCountError: Raised if serializing the item runs queries.
+    """
+    items = list(queryset[:1])
+    with CaptureQueriesContext(connection) as context:
+        for item in items:
+            schema.from_orm(item).model_dump()
+    if context.captured_queries:
+        msg = (
+            f"{name} runs {len(context.captured_queries)} queries per item "
+            f"serializing {schema.__name__}."
+        )
+        raise QueryCountError(msg)
+
+
+def _walk(
+    plan: Plan,
+    queryset: QuerySet,
+    model: type[models.Model],
+    schema: type[Schema],
+    prefix: str,
+) -> None:
+    """Collect the relations and columns read by a schema into the plan.
+
+    Args:
+        plan (Plan): Plan being built.
+        queryset (QuerySet): Root queryset, used to recognize annotations.
+        model (type[models.Model]): Model the schema reads from.
+        schema (type[Schema]): Schema of the model.
+        prefix (str): Lookup path from the root model, "" for the root.
+    """
+    for name, schema_field in schema.model_fields.items():
+        if hasattr(schema, f"resolve_{name}"):
+            plan.only = None
+            continue
+        path = (schema_field.alias or name).split(".")
+        if not prefix and path[0] in queryset.query.annotations:
+            continue
+        _walk_path(plan, model, path, _nested_schema(schema_field.annotation), prefix)
+
+
+def _walk_path(
+    plan: Plan,
+    model: type[models.Model],
+    path: list[str],
+    nested: type[Schema] | None,
+    prefix: str,
+) -> None:
+    """Collect the relations and column of one dotted schema alias.
+
+    Args:
+        plan (Plan): Plan being built.
+        model (type[models.Model]): Model the alias starts from.
+        path (list[str]): Alias split on dots.
+        nested (type[Schema] | None): Schema of the field value, if any.
+        prefix (str): Lookup path from the root model to ``model``.
+    """
+    for index, part in enumerate(path):
+        field = _get_field(model, part)
+        if field is None:
+            plan.only = None
+            return
+        lookup = f"{prefix}{field.name}"
+        last = index == len(path) - 1
+        if field.many_to_many or field.one_to_many:
+            lookup = f"{prefix}{part}"
+            queryset = field.related_model._default_manager.all()  # noqa: SLF001
+            if last and nested:
+                nested_plan = Plan()
+                _walk(nested_plan, queryset, field.related_model, nested, "")
+                if field.one_to_many:
+                    _add_column(nested_plan, field.field.name)
+                queryset = _apply(queryset, nested_plan)
+            plan.prefetch_related.append(Prefetch(lookup, queryset=queryset))
+            return
+        if field.is_relation and not (last and nested is None):
+            if lookup not in plan.select_related:
+                plan.select_related.append(lookup)
+            model, prefix = field.related_model, f"{lookup}__"
+            continue
+        _add_column(plan, lookup)
+    if nested:
+        _walk(plan, model._default_manager.none(), model, nested, prefix)  # noqa: SLF001
+
+
+def _get_field(model: type[models.Model], name: str) -> models.Field | None:
+    """Return a model field by name, attname or reverse accessor name.
+
+    Args:
+        model (type[models.Model]): Model class.
+        name (str): Attribute read by the schema.
+
+    Returns:
+        models.Field | None: Field, None if the attribute is not a field.
+    """
+    opts = model._meta  # noqa: SLF001
+    try:
+        return opts.get_field(name)
+    except FieldDoesNotExist:
+        accessors = {rel.get_accessor_name(): rel for rel in opts.related_objects}
+        return accessors.get(name)
+
+
+def _apply(queryset: QuerySet, plan: Plan) -> QuerySet:
+    """Apply a plan to a queryset.
+
+    Args:
+        queryset (QuerySet): Queryset to optimize.
+        plan (Plan): Plan built from the response schema.
+
+    Returns:
+        QuerySet: Optimized queryset.
+    """
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    if plan.only is not None:
+        # Keep the ordering columns loaded, cursor pagination reads them.
+        ordering = [key.removeprefix("-") for key in queryset.query.order_by]
+        local = {field.name for field in queryset.model._meta.concrete_fields}  # noqa: SLF001
+        queryset = queryset.only(
+            *plan.only, *(name for name in ordering if name in local)
+        )
+    return queryset
+
+
+def _add_column(plan: Plan, lookup: str) -> None:
+    """Add a column to the plan unless columns are not restricted.
+
+    Args:
+        plan (Plan): Plan being built.
+        lookup (str): Column lookup path.
+    """
+    if plan.only is not None and lookup not in plan.only:
+        plan.only.append(lookup)
+
+
+def _nested_schema(annotation: Any) -> type[Schema] | None:  # noqa: ANN401
+    """Return the schema of a field typed as a schema or a list of schemas.
+
+    Args:
+        annotation (Any): Pydantic field annotation.
+
+    Returns:
+        type[Schema] | None: Nested schema, None for plain values.
+    """
+    if get_origin(annotation) in {list, Union, UnionType}:
+        return next(
+            (schema for schema in map(_nested_schema, get_args(annotation)) if schema),
+            None,
+        )
+    if isinstance(annotation, type) and issubclass(annotation, Schema):
+        return annotation
+    return None
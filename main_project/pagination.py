@@ -0,0 +1,281 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from http import HTTPStatus
+from operator import or_
+from typing import Any, Self
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q, QuerySet
+from ninja import Schema
+from ninja.conf import settings
+from ninja.errors import HttpError
+from ninja.pagination import LimitOffsetPagination
+from pydantic import SerializerFunctionWrapHandler, model_serializer
+
+INVALID_CURSOR_ERROR = "Invalid cursor."
+CURSOR_ORDERING_ERROR = "Cursor pagination requires an ordering by model fields."
+
+
+class Row(models.Func):
+    """SQL row constructor, compared column by column: (a, b) > (x, y)."""
+
+    template = "(%(expressions)s)"
+    arg_joiner = ", "
+    output_field = models.Field()
+
+
+class CursorPagination(LimitOffsetPagination):
+    """Limit/offset pagination with an opt-in keyset (cursor) mode.
+
+    Sending a ``cursor`` query parameter (empty for the first page) switches the
+    route to keyset pagination: the page is fetched with an indexed seek on the
+    queryset ordering plus the primary key, no ``COUNT(*)`` is issued and the
+    response carries the ``next_cursor`` of the following page instead of the
+    total ``count``.
+    """
+
+    class Input(LimitOffsetPagination.Input):
+        """Pagination query parameters."""
+
+        cursor: str | None = None
+
+    class Output(Schema):
+        """Paginated response, only the fields of the active mode are sent."""
+
+        items: list[Any]
+        count: int | None = None
+        next_cursor: str | None = None
+
+        @model_serializer(mode="wrap")
+        def serialize(self: Self, handler: SerializerFunctionWrapHandler) -> dict:
+            """Drop the fields that do not apply to the pagination mode.
+
+            Args:
+                handler (SerializerFunctionWrapHandler): Default serializer.
+
+            Returns:
+                dict: Serialized page.
+            """
+            data = handler(self)
+            return {
+                key: value
+                for key, value in data.items()
+                if key == "items" or value is not None
+            }
+
+    def paginate_queryset(
+        self: Self,
+        queryset: QuerySet,
+        pagination: LimitOffsetPagination.Input,
+        **params: Any,  # noqa: ANN401
+    ) -> dict:
+        """Paginate queryset.
+
+        Args:
+            queryset (QuerySet): Ordered queryset returned by the route.
+            pagination (LimitOffsetPagination.Input): Pagination query
+                parameters, a ``CursorPagination.Input``.
+            **params (Any): Route parameters.
+
+        Returns:
+            dict: Page items and either the total count or the next cursor.
+        """
+        cursor = getattr(pagination, "cursor", None)
+        if cursor is None:
+            return super().paginate_queryset(queryset, pagination, **params)
+        limit = min(pagination.limit, settings.PAGINATION_MAX_LIMIT)
+        ordering = get_ordering(queryset)
+        items = list(seek(queryset, ordering, cursor)[: limit + 1])
+        return self._page(items, ordering, limit)
+
+    async def apaginate_queryset(
+        self: Self,
+        queryset: QuerySet,
+        pagination: LimitOffsetPagination.Input,
+        **params: Any,  # noqa: ANN401
+    ) -> dict:
+        """Paginate queryset asynchronously.
+
+        Args:
+            queryset (QuerySet): Ordered queryset returned by the route.
+            pagination (LimitOffsetPagination.Input): Pagination query
+                parameters, a ``CursorPagination.Input``.
+            **params (Any): Route parameters.
+
+        Returns:
+            dict: Page items and either the total count or the next cursor.
+        """
+        cursor = getattr(pagination, "cursor", None)
+        if cursor is None:
+            return await super().apaginate_queryset(queryset, pagination, **params)
+        limit = min(pagination.limit, settings.PAGINATION_MAX_LIMIT)
+        ordering = get_ordering(queryset)
+        page = seek(queryset, ordering, cursor)[: limit + 1]
+        items = [item async for item in page]
+        return self._page(items, ordering, limit)
+
+    @staticmethod
+    def _page(items: list, ordering: list[str], limit: int) -> dict:
+        """Build the keyset page from ``limit + 1`` fetched items.
+
+        Args:
+            items (list): Fetched items, one more than the page size if any follow.
+            ordering (list[str]): Keyset ordering.
+            limit (int): Page size.
+
+        Returns:
+            dict: Page items and the cursor of the next page.
+        """
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(ordering, items[-1])
+        return {"items": items, "next_cursor": next_cursor}
+
+
+def get_ordering(queryset: QuerySet) -> list[str]:
+    """Return the queryset ordering, made unique with the primary key.
+
+    Args:
+        queryset (QuerySet): Ordered queryset.
+
+    Raises:
+        ValueError: Raised if the queryset is ordered by expressions or randomly.
+
+    Returns:
+        list[str]: Ordering field names, prefixed with "-" when descending.
+    """
+    query = queryset.query
+    ordering = list(query.order_by or query.get_meta().ordering or [])
+    if any(not isinstance(key, str) or key == "?" for key in ordering):
+        raise ValueError(CURSOR_ORDERING_ERROR)
+    pk_name = query.get_meta().pk.name
+    names = [key.removeprefix("-") for key in ordering]
+    if "pk" not in names and pk_name not in names:
+        descending = bool(ordering) and ordering[-1].startswith("-")
+        ordering.append(f"-{pk_name}" if descending else pk_name)
+    return ordering
+
+
+def seek(queryset: QuerySet, ordering: list[str], cursor: str) -> QuerySet:
+    """Filter queryset to the rows following the cursor position.
+
+    When every key sorts in the same direction the filter is a single row
+    comparison, ``(sort_key, id) > (%s, %s)``, which Postgres resolves as a
+    seek on the matching composite index.
+
+    Args:
+        queryset (QuerySet): Ordered queryset.
+        ordering (list[str]): Keyset ordering from ``get_ordering``.
+        cursor (str): Opaque cursor, empty for the first page.
+
+    Raises:
+        HttpError: Raised if the cursor values do not fit the ordering fields.
+
+    Returns:
+        QuerySet: Ordered queryset starting after the cursor.
+    """
+    queryset = queryset.order_by(*ordering)
+    if not cursor:
+        return queryset
+    values = decode_cursor(ordering, cursor)
+    names = [key.removeprefix("-") for key in ordering]
+    try:
+        params = [
+            models.Value(_output_field(queryset, name).to_python(value))
+            for name, value in zip(names, values, strict=True)
+        ]
+    except (ValidationError, TypeError, ValueError) as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, INVALID_CURSOR_ERROR) from exc
+    descending = [key.startswith("-") for key in ordering]
+    if len(set(descending)) == 1:
+        lookup = "lt" if descending[0] else "gt"
+        return queryset.alias(_cursor=Row(*names)).filter(
+            **{f"_cursor__{lookup}": Row(*params)}
+        )
+    conditions = []
+    for index, name in enumerate(names):
+        lookup = "lt" if descending[index] else "gt"
+        equal = dict(zip(names[:index], params[:index], strict=True))
+        conditions.append(Q(**equal, **{f"{name}__{lookup}": params[index]}))
+    return queryset.filter(reduce(or_, conditions))
+
+
+def encode_cursor(ordering: list[str], item: models.Model) -> str:
+    """Encode the position of an item as an opaque cursor.
+
+    Args:
+        ordering (list[str]): Keyset ordering.
+        item (models.Model): Last item of the page.
+
+    Returns:
+        str: Url safe cursor.
+    """
+    values = [_value(item, key.removeprefix("-")) for key in ordering]
+    data = json.dumps([ordering, values], default=str)
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(ordering: list[str], cursor: str) -> list:
+    """Decode a cursor created for the same ordering.
+
+    Args:
+        ordering (list[str]): Keyset ordering.
+        cursor (str): Cursor sent by the client.
+
+    Raises:
+        HttpError: Raised if the cursor is malformed or from another ordering.
+
+    Returns:
+        list: Key values of the last item of the previous page.
+    """
+    try:
+        cursor_ordering, values = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, INVALID_CURSOR_ERROR) from exc
+    if cursor_ordering != ordering or len(values) != len(ordering):
+        raise HttpError(HTTPStatus.BAD_REQUEST, INVALID_CURSOR_ERROR)
+    return values
+
+
+def _output_field(queryset: QuerySet, name: str) -> models.Field:
+    """Return the model field or annotation output field behind an ordering key.
+
+    Args:
+        queryset (QuerySet): Ordered queryset.
+        name (str): Ordering key, "__" separated for related fields.
+
+    Returns:
+        models.Field: Field used to convert cursor values.
+    """
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    opts = queryset.model._meta  # noqa: SLF001
+    field = opts.pk
+    for part in name.split("__"):
+        field = opts.pk if part == "pk" else opts.get_field(part)
+        if field.is_relation:
+            opts = field.related_model._meta  # noqa: SLF001
+    return field.target_field if field.is_relation else field
+
+
+def _value(item: models.Model, name: str) -> Any:  # noqa: ANN401
+    """Read the value of an ordering key from an item.
+
+    Args:
+        item (models.Model): Model instance.
+        name (str): Ordering key, "__" separated for related fields.
+
+    Returns:
+        Any: Key value.
+    """
+    *relations, attribute = name.split("__")
+    for relation in relations:
+        item = getattr(item, relation)
+    field = item._meta.pk if attribute == "pk" else None  # noqa: SLF001
+    if field is None and attribute not in getattr(item, "__dict__", {}):
+        field = item._meta.get_field(attribute)  # noqa: SLF001
+    return getattr(item, field.attname if field else attribute)
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "main_project",
     "common",
     "authentication",
@@ -88,6 +89,18 @@ WSGI_APPLICATION = "main_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Connections of each process come from a psycopg pool, Django health checks
+# them before use, they are recycled after DB_POOL_MAX_LIFETIME seconds.
+DB_POOL = bool(int(os.getenv("DB_POOL", "1")))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "600"))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+# Executions of a query before it becomes a server-side prepared statement,
+# empty to disable them, e.g. behind PgBouncer in transaction mode.
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "5")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -96,6 +109,20 @@ DATABASES = {
         "NAME": os.getenv("DB_NAME", "main_db"),
         "PORT": os.getenv("DB_PORT", "5432"),
         "PASSWORD": os.getenv("DB_PASSWORD", "password"),
+        "OPTIONS": {
+            "server_side_binding": True,
+            "prepare_threshold": (
+                int(DB_PREPARE_THRESHOLD) if DB_PREPARE_THRESHOLD else None
+            ),
+            "pool": DB_POOL
+            and {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": DB_POOL_TIMEOUT,
+                "max_idle": DB_POOL_MAX_IDLE,
+                "max_lifetime": DB_POOL_MAX_LIFETIME,
+            },
+        },
     },
 }
 
@@ -161,6 +188,16 @@ CELERY_TASK_DEFAULT_QUEUE = "default"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "send-comment-digests": {
+        "task": "blog.tasks.send_comment_digests",
+        "schedule": int(os.getenv("COMMENT_DIGEST_INTERVAL", str(15 * 60))),
+    },
+    "delete-expired-exports": {
+        "task": "common.tasks.delete_expired_exports",
+        "schedule": int(os.getenv("EXPORT_CLEANUP_INTERVAL", str(60 * 60))),
+    },
+}
 
 # Django Debug Toolbar
 INTERNAL_IPS = ["127.0.0.1", "172.18.0.1"]
@@ -177,9 +214,34 @@ if not TESTING:
 # Common settings
 PAGINATION_SIZE = 9
 API_PAGINATION_SIZE = 5
+API_BULK_SIZE = 500
+# Rows fetched per server-side cursor round trip by the export routes
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+# Seconds export job archives are kept after the job finishes
+EXPORT_JOB_LIFETIME = int(os.getenv("EXPORT_JOB_LIFETIME", str(24 * 60 * 60)))
+AUTOCOMPLETE_SIZE = 10
+COMMENT_PAGE_SIZE = 20
+COMMENT_DIGEST_SIZE = 50
+AUTOCOMPLETE_CACHE_TIMEOUT = 30
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", "60"))
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv("FRAGMENT_CACHE_TIMEOUT", "300"))
+TOKEN_CACHE_TIMEOUT = int(os.getenv("TOKEN_CACHE_TIMEOUT", "300"))
+# Token lookups kept in each process, unaware of invalidations elsewhere
+TOKEN_LOCAL_CACHE_SIZE = int(os.getenv("TOKEN_LOCAL_CACHE_SIZE", "1024"))
+TOKEN_LOCAL_CACHE_TIMEOUT = int(os.getenv("TOKEN_LOCAL_CACHE_TIMEOUT", "10"))
+# Signed API tokens, checked without queries
+API_ACCESS_TOKEN_LIFETIME = int(os.getenv("API_ACCESS_TOKEN_LIFETIME", "900"))
+API_REFRESH_TOKEN_LIFETIME = int(os.getenv("API_REFRESH_TOKEN_LIFETIME", "1209600"))
+API_TOKEN_SCOPES = ["read", "write"]
+PERMISSION_CACHE_TIMEOUT = int(os.getenv("PERMISSION_CACHE_TIMEOUT", "3600"))
+# Fail API list routes whose response schema queries per item
+API_QUERY_CHECK = DEBUG or TESTING
+# Serve the blog and todo APIs with async routes, for ASGI servers
+API_ASYNC = bool(int(os.getenv("API_ASYNC", "0")))
 
 # Replace default user model
 AUTH_USER_MODEL = "authentication.User"
+AUTHENTICATION_BACKENDS = ["authentication.backends.CachedModelBackend"]
 LOGIN_URL = "authentication:login"
 
 # Media files
@@ -1,15 +1,34 @@
 from datetime import datetime
 from http import HTTPStatus
 
-from django.http import HttpRequest, HttpResponse
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from ninja import Field, Router, Schema
 from ninja.pagination import paginate
 from pydantic import field_validator
 
+from main_project.cache import invalidate
+from main_project.conditional import check_conditions, precondition
+from main_project.export import ExportFormat, export_response
+from main_project.optimizer import optimize, optimize_queryset
+from main_project.pagination import CursorPagination
+from main_project.settings import API_BULK_SIZE
 from todo.models import Task
 
 router = Router()
+NO_ACCESS = "User does not have acces to resource."
+NOT_FOUND = "Not found."
+DUPLICATE_IDS = "Task ids must be unique."
+TASK_EXPORT_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "status": "status",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
 
 
 class TaskOut(Schema):
@@ -62,6 +81,57 @@ class TaskInPatch(TaskIn):
     status: str = ""
 
 
+class TaskBulkIn(Schema):
+    """Task bulk create API input schema."""
+
+    tasks: list[TaskIn] = Field(..., min_length=1, max_length=API_BULK_SIZE)
+
+
+class TaskBulkUpdateItem(TaskIn):
+    """Task bulk update API item schema."""
+
+    id: int
+
+
+class TaskBulkUpdateIn(Schema):
+    """Task bulk update API input schema."""
+
+    tasks: list[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=API_BULK_SIZE)
+
+    @field_validator("tasks")
+    @staticmethod
+    def validate_ids(tasks: list[TaskBulkUpdateItem]) -> list[TaskBulkUpdateItem]:
+        """Validate every task is updated once.
+
+        Args:
+            tasks (list[TaskBulkUpdateItem]): Tasks to update.
+
+        Raises:
+            ValueError: Raised if a task id is repeated.
+
+        Returns:
+            list[TaskBulkUpdateItem]: Tasks to update.
+        """
+        if len({task.id for task in tasks}) != len(tasks):
+            raise ValueError(DUPLICATE_IDS)
+        return tasks
+
+
+class TaskBulkDeleteIn(Schema):
+    """Task bulk delete API input schema."""
+
+    ids: list[int] = Field(..., min_length=1, max_length=API_BULK_SIZE)
+
+
+class TaskBulkResult(Schema):
+    """Task bulk API result of a single item."""
+
+    id: int
+    status: int
+    message: str | None = None
+    task: TaskOut | None = None
+
+
 class Message(Schema):
     """Generic schema for messages."""
 
@@ -69,15 +139,21 @@ class Message(Schema):
 
 
 @router.get("/task", response=list[TaskOut], url_name="task_list")
-@paginate()
+@paginate(CursorPagination)
+@optimize_queryset(TaskOut)
 def list_task(
-    request: HttpRequest, sort: str = "created_at", status: str | None = None
+    request: HttpRequest,
+    response: HttpResponse,
+    sort: str = "created_at",
+    status: str | None = None,
 ) -> HttpResponse:
     """List API.
 
     Args:
         request (HttpRequest): HttpRequest object.
-        sort (str, optional): Sort list by sort value. Defaults to "created_at".
+        response (HttpResponse): Temporal response for the validator headers.
+        sort (str, optional): Sort list by sort value, "created_at" and
+            "updated_at" are indexed for cursor pagination. Defaults to "created_at".
         status (str | None, optional): Filter by status. Defaults to None.
 
     Returns:
@@ -87,9 +163,33 @@ def list_task(
     query_set = query_set.order_by(sort)
     if status:
         query_set = query_set.filter(status=status)
+    check_conditions(request, query_set, response=response)
     return query_set
 
 
+@router.get("/task/export", url_name="task_export")
+def export_task(
+    request: HttpRequest,
+    file_format: ExportFormat = "ndjson",
+    gzip: bool = False,  # noqa: FBT001, FBT002
+) -> StreamingHttpResponse:
+    """Export API streaming every task of the user.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        file_format (ExportFormat, optional): "ndjson" or "csv". Defaults to
+            "ndjson".
+        gzip (bool, optional): Gzip the file. Defaults to False.
+
+    Returns:
+        StreamingHttpResponse: Tasks file.
+    """
+    query_set = Task.objects.filter(created_by=request.user).order_by("pk")
+    return export_response(
+        query_set, TASK_EXPORT_COLUMNS, "tasks", file_format, compress=gzip
+    )
+
+
 @router.post(
     "/task",
     url_name="task_create",
@@ -106,26 +206,155 @@ def create_task(request: HttpRequest, payload: TaskIn) -> HttpResponse:
     return HTTPStatus.OK, task
 
 
+@router.post(
+    "/task/bulk",
+    url_name="task_bulk_create",
+    response=list[TaskBulkResult],
+    exclude_none=True,
+)
+def bulk_create_task(request: HttpRequest, payload: TaskBulkIn) -> list[dict]:
+    """Bulk create task API.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        payload (TaskBulkIn): Tasks to create, in a single insert.
+
+    Returns:
+        list[dict]: Created task of each item.
+    """
+    tasks = Task.objects.bulk_create(
+        Task(
+            title=item.title,
+            description=item.description,
+            status=item.status,
+            created_by=request.user,
+        )
+        for item in payload.tasks
+    )
+    invalidate(Task)
+    return [{"id": task.pk, "status": HTTPStatus.OK, "task": task} for task in tasks]
+
+
+@router.put(
+    "/task/bulk",
+    url_name="task_bulk_update",
+    response=list[TaskBulkResult],
+    exclude_none=True,
+)
+def bulk_update_task(request: HttpRequest, payload: TaskBulkUpdateIn) -> list[dict]:
+    """Bulk update task API.
+
+    Tasks are read and written with one query each in a single transaction,
+    tasks of other users are left unchanged.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        payload (TaskBulkUpdateIn): Tasks to update.
+
+    Returns:
+        list[dict]: Result of each item.
+    """
+    results, updated = [], []
+    updated_at = timezone.now()
+    with transaction.atomic():
+        tasks = Task.objects.select_for_update().in_bulk(
+            [item.id for item in payload.tasks]
+        )
+        for item in payload.tasks:
+            task = tasks.get(item.id)
+            if task is None:
+                results.append(_failed(item.id, HTTPStatus.NOT_FOUND, NOT_FOUND))
+                continue
+            if task.created_by_id != request.user.pk:
+                results.append(_failed(item.id, HTTPStatus.FORBIDDEN, NO_ACCESS))
+                continue
+            task.title = item.title
+            task.description = item.description
+            task.status = item.status
+            task.updated_at = updated_at
+            task.created_by = request.user
+            updated.append(task)
+            results.append({"id": task.pk, "status": HTTPStatus.OK, "task": task})
+        Task.objects.bulk_update(
+            updated, ["title", "description", "status", "updated_at"]
+        )
+        invalidate(Task)
+    return results
+
+
+@router.delete(
+    "/task/bulk",
+    url_name="task_bulk_delete",
+    response=list[TaskBulkResult],
+    exclude_none=True,
+)
+def bulk_delete_task(request: HttpRequest, payload: TaskBulkDeleteIn) -> list[dict]:
+    """Bulk delete task API.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        payload (TaskBulkDeleteIn): Ids of the tasks to delete.
+
+    Returns:
+        list[dict]: Result of each item.
+    """
+    with transaction.atomic():
+        deleted = set(Task.objects.delete_owned(request.user, payload.ids))
+        invalidate(Task)
+        missing = set(payload.ids) - deleted
+        existing = set()
+        if missing:
+            existing = set(
+                Task.objects.filter(pk__in=missing).values_list("pk", flat=True)
+            )
+    results = []
+    for pk in payload.ids:
+        if pk in deleted:
+            results.append({"id": pk, "status": HTTPStatus.OK})
+        elif pk in existing:
+            results.append(_failed(pk, HTTPStatus.FORBIDDEN, NO_ACCESS))
+        else:
+            results.append(_failed(pk, HTTPStatus.NOT_FOUND, NOT_FOUND))
+    return results
+
+
+def _failed(pk: int, status: HTTPStatus, message: str) -> dict:
+    """Build the result of a bulk item that was not applied.
+
+    Args:
+        pk (int): Task id.
+        status (HTTPStatus): Status of the item.
+        message (str): Error message.
+
+    Returns:
+        dict: Item result.
+    """
+    return {"id": pk, "status": status, "message": message}
+
+
 @router.get(
     "/task/{task_id}",
     response={HTTPStatus.OK: TaskOut, HTTPStatus.FORBIDDEN: Message},
     url_name="task_detail",
 )
-def detail_task(request: HttpRequest, task_id: int) -> HttpResponse:
+def detail_task(
+    request: HttpRequest, task_id: int, response: HttpResponse
+) -> HttpResponse:
     """Get task detail API.
 
     Args:
         request (HttpRequest): HttpRequest object
         task_id (int): Task Id
+        response (HttpResponse): Temporal response for the validator headers.
 
     Returns:
         HttpResponse: HttpResponse object containing task detail..
     """
-    task = get_object_or_404(Task, pk=task_id)
+    own_task = Task.objects.filter(pk=task_id, created_by=request.user)
+    check_conditions(request, own_task, response=response)
+    task = get_object_or_404(optimize(Task.objects.all(), TaskOut), pk=task_id)
     if task.created_by != request.user:
-        return HTTPStatus.FORBIDDEN, {
-            "message": "User does not have acces to resource."
-        }
+        return HTTPStatus.FORBIDDEN, {"message": NO_ACCESS}
     return HTTPStatus.OK, task
 
 
@@ -138,6 +367,7 @@ def detail_task(request: HttpRequest, task_id: int) -> HttpResponse:
     },
     url_name="task_update",
 )
+@precondition(Task, "task_id", owner_field="created_by")
 def update_task(request: HttpRequest, task_id: int, payload: TaskIn) -> HttpResponse:
     """Update task API.
 
@@ -151,14 +381,11 @@ def update_task(request: HttpRequest, task_id: int, payload: TaskIn) -> HttpResp
     """
     task = get_object_or_404(Task, id=task_id)
     if task.created_by != request.user:
-        return HTTPStatus.FORBIDDEN, {
-            "message": "User does not have acces to resource."
-        }
+        return HTTPStatus.FORBIDDEN, {"message": NO_ACCESS}
     task.title = payload.title
     task.description = payload.description
     task.status = payload.status
     task.save()
-    task.refresh_from_db()
     return HTTPStatus.OK, task
 
 
@@ -167,6 +394,7 @@ def update_task(request: HttpRequest, task_id: int, payload: TaskIn) -> HttpResp
     response={HTTPStatus.OK: TaskOut, HTTPStatus.FORBIDDEN: Message},
     url_name="task_patch",
 )
+@precondition(Task, "task_id", owner_field="created_by")
 def patch_task(
     request: HttpRequest, task_id: int, payload: TaskInPatch
 ) -> HttpResponse:
@@ -182,9 +410,7 @@ def patch_task(
     """
     task = get_object_or_404(Task, id=task_id)
     if task.created_by != request.user:
-        return HTTPStatus.FORBIDDEN, {
-            "message": "User does not have acces to resource."
-        }
+        return HTTPStatus.FORBIDDEN, {"message": NO_ACCESS}
     for attr, value in payload.dict(exclude_unset=True).items():
         setattr(task, attr, value)
     task.save()
@@ -196,6 +422,7 @@ def patch_task(
     url_name="task_delete",
     response={HTTPStatus.OK: Message, HTTPStatus.FORBIDDEN: Message},
 )
+@precondition(Task, "task_id", owner_field="created_by")
 def delete_task(request: HttpRequest, task_id: int) -> HttpResponse:
     """Delete task API.
 
@@ -208,8 +435,6 @@ def delete_task(request: HttpRequest, task_id: int) -> HttpResponse:
     """
     task = get_object_or_404(Task, id=task_id)
     if task.created_by != request.user:
-        return HTTPStatus.FORBIDDEN, {
-            "message": "User does not have acces to resource."
-        }
+        return HTTPStatus.FORBIDDEN, {"message": NO_ACCESS}
     task.delete()
     return HTTPStatus.OK, {"message": "success"}
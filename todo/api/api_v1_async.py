@@ -0,0 +1,210 @@
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from ninja import Router
+from ninja.pagination import paginate
+
+from authentication.models import User
+from main_project.auth import GlobalAuth
+from main_project.cache import invalidate
+from main_project.conditional import acheck_conditions
+from main_project.export import ExportFormat, aexport_response
+from main_project.optimizer import optimize, optimize_queryset
+from main_project.pagination import CursorPagination
+from todo.api import api_v1
+from todo.api.api_v1 import (
+    NO_ACCESS,
+    TASK_EXPORT_COLUMNS,
+    Message,
+    TaskBulkIn,
+    TaskBulkResult,
+    TaskIn,
+    TaskOut,
+)
+from todo.models import Task
+
+# Served with API_ASYNC on an ASGI server. Writes that lock rows or run in a
+# transaction reuse the api_v1 routes, Ninja runs them in a worker thread.
+router = Router()
+# Reused sync routes can not await the authentication.
+sync_auth = GlobalAuth()
+TASK_WRITE_RESPONSES = {
+    HTTPStatus.OK: TaskOut,
+    HTTPStatus.BAD_REQUEST: Message,
+    HTTPStatus.FORBIDDEN: Message,
+}
+
+
+@router.get("/task", response=list[TaskOut], url_name="task_list")
+@paginate(CursorPagination)
+@optimize_queryset(TaskOut)
+async def list_task(
+    request: HttpRequest,
+    response: HttpResponse,
+    sort: str = "created_at",
+    status: str | None = None,
+) -> HttpResponse:
+    """List API.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        response (HttpResponse): Temporal response for the validator headers.
+        sort (str, optional): Sort list by sort value, "created_at" and
+            "updated_at" are indexed for cursor pagination. Defaults to "created_at".
+        status (str | None, optional): Filter by status. Defaults to None.
+
+    Returns:
+        HttpResponse: HttpResponse object.
+    """
+    query_set = Task.objects.filter(created_by=request.user)
+    query_set = query_set.order_by(sort)
+    if status:
+        query_set = query_set.filter(status=status)
+    await acheck_conditions(request, query_set, response=response)
+    return query_set
+
+
+@router.get("/task/export", url_name="task_export")
+async def export_task(
+    request: HttpRequest,
+    file_format: ExportFormat = "ndjson",
+    gzip: bool = False,  # noqa: FBT001, FBT002
+) -> StreamingHttpResponse:
+    """Export API streaming every task of the user.
+
+    Args:
+        request (HttpRequest): HttpRequest object.
+        file_format (ExportFormat, optional): "ndjson" or "csv". Defaults to
+            "ndjson".
+        gzip (bool, optional): Gzip the file. Defaults to False.
+
+    Returns:
+        StreamingHttpResponse: Tasks file.
+    """
+    query_set = Task.objects.filter(created_by=request.user).order_by("pk")
+    return aexport_response(
+        query_set, TASK_EXPORT_COLUMNS, "tasks", file_format, compress=gzip
+    )
+
+
+@router.post(
+    "/task",
+    url_name="task_create",
+    response={HTTPStatus.OK: TaskOut, HTTPStatus.BAD_REQUEST: Message},
+)
+async def create_task(request: HttpRequest, payload: TaskIn) -> HttpResponse:
+    """Create task API."""
+    await _load_email(request.user)
+    task = await Task.objects.acreate(
+        title=payload.title,
+        description=payload.description,
+        status=payload.status,
+        created_by=request.user,
+    )
+    return HTTPStatus.OK, task
+
+
+@router.post(
+    "/task/bulk",
+    url_name="task_bulk_create",
+    response=list[TaskBulkResult],
+    exclude_none=True,
+)
+async def bulk_create_task(request: HttpRequest, payload: TaskBulkIn) -> list[dict]:
+    """Bulk create task API.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        payload (TaskBulkIn): Tasks to create, in a single insert.
+
+    Returns:
+        list[dict]: Created task of each item.
+    """
+    await _load_email(request.user)
+    tasks = await Task.objects.abulk_create(
+        [
+            Task(
+                title=item.title,
+                description=item.description,
+                status=item.status,
+                created_by=request.user,
+            )
+            for item in payload.tasks
+        ]
+    )
+    await sync_to_async(invalidate)(Task)
+    return [{"id": task.pk, "status": HTTPStatus.OK, "task": task} for task in tasks]
+
+
+router.put(
+    "/task/bulk",
+    url_name="task_bulk_update",
+    response=list[TaskBulkResult],
+    exclude_none=True,
+    auth=sync_auth,
+)(api_v1.bulk_update_task)
+router.delete(
+    "/task/bulk",
+    url_name="task_bulk_delete",
+    response=list[TaskBulkResult],
+    exclude_none=True,
+    auth=sync_auth,
+)(api_v1.bulk_delete_task)
+
+
+@router.get(
+    "/task/{task_id}",
+    response={HTTPStatus.OK: TaskOut, HTTPStatus.FORBIDDEN: Message},
+    url_name="task_detail",
+)
+async def detail_task(
+    request: HttpRequest, task_id: int, response: HttpResponse
+) -> HttpResponse:
+    """Get task detail API.
+
+    Args:
+        request (HttpRequest): HttpRequest object
+        task_id (int): Task Id
+        response (HttpResponse): Temporal response for the validator headers.
+
+    Returns:
+        HttpResponse: HttpResponse object containing task detail..
+    """
+    own_task = Task.objects.filter(pk=task_id, created_by=request.user)
+    await acheck_conditions(request, own_task, response=response)
+    task = await aget_object_or_404(optimize(Task.objects.all(), TaskOut), pk=task_id)
+    if task.created_by_id != request.user.pk:
+        return HTTPStatus.FORBIDDEN, {"message": NO_ACCESS}
+    return HTTPStatus.OK, task
+
+
+router.put(
+    "/task/{task_id}",
+    response=TASK_WRITE_RESPONSES,
+    url_name="task_update",
+    auth=sync_auth,
+)(api_v1.update_task)
+router.patch(
+    "/task/{task_id}",
+    response={HTTPStatus.OK: TaskOut, HTTPStatus.FORBIDDEN: Message},
+    url_name="task_patch",
+    auth=sync_auth,
+)(api_v1.patch_task)
+router.delete(
+    "/task/{task_id}",
+    url_name="task_delete",
+    response={HTTPStatus.OK: Message, HTTPStatus.FORBIDDEN: Message},
+    auth=sync_auth,
+)(api_v1.delete_task)
+
+
+async def _load_email(user: User) -> None:
+    """Load the email shown as task owner, users of signed tokens defer it.
+
+    Args:
+        user (User): Request user.
+    """
+    if "email" in user.get_deferred_fields():
+        await user.arefresh_from_db(fields=["email"])
@@ -1,3 +1,5 @@
+from typing import Self
+
 from django.apps import AppConfig
 
 
@@ -6,3 +8,10 @@ class TodoConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "todo"
+
+    def ready(self: Self) -> None:
+        """Invalidate cached task fragments when tasks change."""
+        from main_project.cache import invalidate_on_change
+        from todo.models import Task
+
+        invalidate_on_change(Task)
@@ -1,9 +1,33 @@
+from collections.abc import Iterable
 from typing import ClassVar, Self
 
-from django.db import models
+from django.db import connection, models
 
 from authentication.models import User
 
+DELETE_OWNED_SQL = """
+DELETE FROM todo_task WHERE id = ANY(%(ids)s) AND created_by_id = %(user)s
+RETURNING id
+"""
+
+
+class TaskQuerySet(models.QuerySet):
+    """Task queryset."""
+
+    def delete_owned(self: Self, user: User, ids: Iterable[int]) -> list[int]:
+        """Delete tasks of a user with a single statement.
+
+        Args:
+            user (User): Owner of the tasks.
+            ids (Iterable[int]): Task ids, ids of other users are skipped.
+
+        Returns:
+            list[int]: Ids of the deleted tasks.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_OWNED_SQL, {"ids": list(ids), "user": user.pk})
+            return [pk for (pk,) in cursor.fetchall()]
+
 
 class Task(models.Model):
     """Task model."""
@@ -21,6 +45,26 @@ class Task(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     status = models.CharField(choices=STATUS_CHOICES)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        """Model meta data."""
+
+        indexes: ClassVar[list[models.Index]] = [
+            models.Index(
+                fields=["created_by", "created_at", "id"],
+                name="todo_task_created_id_idx",
+            ),
+            models.Index(
+                fields=["created_by", "updated_at", "id"],
+                name="todo_task_updated_id_idx",
+            ),
+            models.Index(
+                fields=["created_by", "status", "created_at", "id"],
+                name="todo_task_status_created_idx",
+            ),
+        ]
+
     def __str__(self: Self) -> str:
         """String representation."""
         return f"Task ID: {self.pk}"
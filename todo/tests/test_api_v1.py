@@ -1,11 +1,18 @@
+import csv
+import gzip
+import io
 import json
 from http import HTTPStatus
 
 import pytest
 from django.test import Client
 from django.urls import reverse_lazy
+from pytest_django import DjangoAssertNumQueries
 
 from authentication.models import User
+from main_project.export import JSON_ENCODER
+from main_project.settings import API_BULK_SIZE
+from todo.api.api_v1 import NO_ACCESS, NOT_FOUND
 from todo.models import Task
 
 pytestmark = pytest.mark.django_db
@@ -79,6 +86,27 @@ class TestListAPI:
             "count": len(Task.objects.filter(created_by=user_fixture2)),
         }
 
+    @staticmethod
+    def test_list_api_cursor(client: Client, user_fixture: User) -> None:
+        """Test list api in cursor pagination mode."""
+        tasks = [
+            Task.objects.create(title=f"Task {index}", created_by=user_fixture)
+            for index in range(3)
+        ]
+        url = reverse_lazy("api-1.0.0:task_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        query_params = {"limit": 2, "cursor": ""}
+        response = client.get(url, headers=headers, query_params=query_params)
+        assert response.status_code == HTTPStatus.OK
+        assert [item["id"] for item in response.json()["items"]] == [
+            task.pk for task in tasks[:2]
+        ]
+        query_params["cursor"] = response.json()["next_cursor"]
+        response = client.get(url, headers=headers, query_params=query_params)
+        assert response.status_code == HTTPStatus.OK
+        assert [item["id"] for item in response.json()["items"]] == [tasks[2].pk]
+        assert "next_cursor" not in response.json()
+
 
 class TestCreateAPI:
     """Test create api."""
@@ -398,3 +426,253 @@ class TestDeleteAPI:
             headers={"Authorization": f"Bearer {user_fixture2.token}"},
         )
         assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestBulkAPI:
+    """Test bulk apis."""
+
+    @staticmethod
+    def test_bulk_create_api(
+        client: Client,
+        user_fixture: User,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test bulk create api inserts every task at once."""
+        data = {
+            "tasks": [
+                {"title": f"title {index}", "description": "", "status": "new"}
+                for index in range(3)
+            ]
+        }
+        url = reverse_lazy("api-1.0.0:task_bulk_create")
+        with django_assert_num_queries(2):
+            response = client.post(
+                url,
+                headers={"Authorization": f"Bearer {user_fixture.token}"},
+                data=json.dumps(data),
+                content_type="application/json",
+            )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [item["status"] for item in results] == [HTTPStatus.OK] * 3
+        assert [item["task"]["title"] for item in results] == [
+            "title 0",
+            "title 1",
+            "title 2",
+        ]
+        assert Task.objects.filter(created_by=user_fixture).count() == 3  # noqa: PLR2004
+
+    @staticmethod
+    def test_bulk_create_api_errors(client: Client, user_fixture: User) -> None:
+        """Test bulk create api validates every item and the batch ceiling."""
+        url = reverse_lazy("api-1.0.0:task_bulk_create")
+        task = {"title": "title", "description": "", "status": "new"}
+        data = {"tasks": [task, {**task, "status": "staus"}]}
+        response = client.post(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_CONTENT
+        assert response.json()["detail"][0]["loc"] == [
+            "body",
+            "payload",
+            "tasks",
+            1,
+            "status",
+        ]
+        data = {"tasks": [task] * (API_BULK_SIZE + 1)}
+        response = client.post(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_CONTENT
+        assert Task.objects.exists() is False
+
+    @staticmethod
+    def test_bulk_update_api(
+        client: Client,
+        user_fixture: User,
+        user_fixture2: User,
+        task_fixture: Task,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test bulk update api reports the result of every task."""
+        other = Task.objects.create(title="other", created_by=user_fixture2)
+        data = {
+            "tasks": [
+                {"id": pk, "title": "updated", "description": "", "status": "done"}
+                for pk in [task_fixture.pk, other.pk, 0]
+            ]
+        }
+        url = reverse_lazy("api-1.0.0:task_bulk_update")
+        with django_assert_num_queries(5):
+            response = client.put(
+                url,
+                headers={"Authorization": f"Bearer {user_fixture.token}"},
+                data=json.dumps(data),
+                content_type="application/json",
+            )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [(item["id"], item["status"]) for item in results] == [
+            (task_fixture.pk, HTTPStatus.OK),
+            (other.pk, HTTPStatus.FORBIDDEN),
+            (0, HTTPStatus.NOT_FOUND),
+        ]
+        assert results[0]["task"]["status"] == "done"
+        assert "task" not in results[1]
+        task_fixture.refresh_from_db()
+        other.refresh_from_db()
+        assert task_fixture.title == "updated"
+        assert other.title == "other"
+
+    @staticmethod
+    def test_bulk_update_api_duplicate_ids(
+        client: Client, user_fixture: User, task_fixture: Task
+    ) -> None:
+        """Test bulk update api rejects a task updated twice."""
+        task = {"id": task_fixture.pk, "title": "t", "description": "", "status": "new"}
+        url = reverse_lazy("api-1.0.0:task_bulk_update")
+        response = client.put(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            data=json.dumps({"tasks": [task, task]}),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_CONTENT
+
+    @staticmethod
+    def test_bulk_delete_api(
+        client: Client, user_fixture: User, user_fixture2: User, task_fixture: Task
+    ) -> None:
+        """Test bulk delete api only deletes the tasks of the user."""
+        other = Task.objects.create(title="other", created_by=user_fixture2)
+        url = reverse_lazy("api-1.0.0:task_bulk_delete")
+        response = client.delete(
+            url,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            data=json.dumps({"ids": [task_fixture.pk, other.pk, 0]}),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {"id": task_fixture.pk, "status": HTTPStatus.OK},
+            {"id": other.pk, "status": HTTPStatus.FORBIDDEN, "message": NO_ACCESS},
+            {"id": 0, "status": HTTPStatus.NOT_FOUND, "message": NOT_FOUND},
+        ]
+        assert list(Task.objects.values_list("pk", flat=True)) == [other.pk]
+
+
+class TestConditionalRequests:
+    """Test ETag validators of the task API."""
+
+    @staticmethod
+    def test_list_api_not_modified(
+        client: Client, user_fixture: User, task_fixture: Task
+    ) -> None:
+        """Test list API answers 304 until a task of the user changes."""
+        url = reverse_lazy("api-1.0.0:task_list")
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        etag = client.get(url, headers=headers).headers["ETag"]
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        task_fixture.status = "done"
+        task_fixture.save()
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == HTTPStatus.OK
+
+    @staticmethod
+    def test_update_api_if_match(
+        client: Client, user_fixture: User, user_fixture2: User, task_fixture: Task
+    ) -> None:
+        """Test If-Match is checked against the tasks of the user only."""
+        data = {"title": "title", "description": "description", "status": "new"}
+        url = reverse_lazy("api-1.0.0:task_update", args=[task_fixture.pk])
+        response = client.put(
+            url,
+            headers={
+                "Authorization": f"Bearer {user_fixture.token}",
+                "If-Match": '"stale"',
+            },
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+        response = client.put(
+            url,
+            headers={
+                "Authorization": f"Bearer {user_fixture2.token}",
+                "If-Match": '"stale"',
+            },
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        task_fixture.refresh_from_db()
+        assert task_fixture.title == "Fixture task"
+
+
+class TestExportAPI:
+    """Test task export API."""
+
+    @staticmethod
+    def test_export_api_ndjson(
+        client: Client,
+        monkeypatch: pytest.MonkeyPatch,
+        user_fixture: User,
+        user_fixture2: User,
+    ) -> None:
+        """Test export streams the tasks of the user only, chunk by chunk."""
+        monkeypatch.setattr("main_project.export.EXPORT_CHUNK_SIZE", 2)
+        tasks = Task.objects.bulk_create(
+            Task(title=f"task {index}", created_by=user_fixture, status="new")
+            for index in range(3)
+        )
+        Task.objects.create(title="other", created_by=user_fixture2, status="new")
+        url = reverse_lazy("api-1.0.0:task_export")
+        response = client.get(
+            url, headers={"Authorization": f"Bearer {user_fixture.token}"}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert 'filename="tasks.ndjson"' in response["Content-Disposition"]
+        chunks = list(response.streaming_content)
+        assert len(chunks) == 2  # noqa: PLR2004
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        assert [row["id"] for row in rows] == [task.pk for task in tasks]
+        assert rows[0]["title"] == "task 0"
+        assert rows[0]["created_at"] == JSON_ENCODER.default(tasks[0].created_at)
+
+    @staticmethod
+    def test_export_api_csv_gzip(
+        client: Client, user_fixture: User, task_fixture: Task
+    ) -> None:
+        """Test export as a gzip compressed CSV file."""
+        url = reverse_lazy("api-1.0.0:task_export")
+        response = client.get(
+            f"{url}?file_format=csv&gzip=true",
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "application/gzip"
+        assert 'filename="tasks.csv.gz"' in response["Content-Disposition"]
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        header, row = csv.reader(io.StringIO(content))
+        assert header == [
+            "id",
+            "title",
+            "description",
+            "status",
+            "created_at",
+            "updated_at",
+        ]
+        assert row[:4] == [
+            str(task_fixture.pk),
+            task_fixture.title,
+            task_fixture.description,
+            task_fixture.status,
+        ]
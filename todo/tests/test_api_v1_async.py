@@ -0,0 +1,152 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from ninja.testing import TestAsyncClient
+
+from authentication.models import User
+from authentication.tokens import issue_tokens
+from todo.api import api_v1_async
+from todo.api.api_v1 import NO_ACCESS
+from todo.models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAsyncTaskAPI:
+    """Test the async task API routes."""
+
+    @staticmethod
+    def test_list_api_bad_credentials(async_api_client: TestAsyncClient) -> None:
+        """Test async auth rejects unknown tokens."""
+        response = async_to_sync(async_api_client.get)(
+            "/todo/task", headers={"Authorization": "Bearer test"}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @staticmethod
+    def test_list_api(
+        async_api_client: TestAsyncClient, user_fixture: User, task_fixture: Task
+    ) -> None:
+        """Test list API with a stored token and offset pagination."""
+        response = async_to_sync(async_api_client.get)(
+            "/todo/task", headers={"Authorization": f"Bearer {user_fixture.token}"}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["count"] == 1
+        assert response.json()["items"][0]["id"] == task_fixture.pk
+        assert response.json()["items"][0]["created_by"] == user_fixture.email
+
+    @staticmethod
+    def test_list_api_cursor(
+        async_api_client: TestAsyncClient, user_fixture: User
+    ) -> None:
+        """Test list API with a signed token and cursor pagination."""
+        tasks = Task.objects.bulk_create(
+            Task(title=f"task {index}", created_by=user_fixture, status="new")
+            for index in range(3)
+        )
+        headers = {
+            "Authorization": f"Bearer {issue_tokens(user_fixture)['access_token']}"
+        }
+        response = async_to_sync(async_api_client.get)(
+            "/todo/task?sort=id&limit=2&cursor=", headers=headers
+        )
+        page = response.json()
+        assert [item["id"] for item in page["items"]] == [task.pk for task in tasks[:2]]
+        response = async_to_sync(async_api_client.get)(
+            f"/todo/task?sort=id&limit=2&cursor={page['next_cursor']}", headers=headers
+        )
+        assert [item["id"] for item in response.json()["items"]] == [tasks[2].pk]
+        assert "next_cursor" not in response.json()
+
+    @staticmethod
+    def test_detail_api_not_modified(
+        async_api_client: TestAsyncClient,
+        user_fixture: User,
+        user_fixture2: User,
+        task_fixture: Task,
+    ) -> None:
+        """Test detail API answers 304 to the owner and 403 to other users."""
+        headers = {"Authorization": f"Bearer {user_fixture.token}"}
+        url = f"/todo/task/{task_fixture.pk}"
+        response = async_to_sync(async_api_client.get)(url, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        response = async_to_sync(async_api_client.get)(
+            url, headers=headers, META={"HTTP_IF_NONE_MATCH": response["ETag"]}
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = async_to_sync(async_api_client.get)(
+            url, headers={"Authorization": f"Bearer {user_fixture2.token}"}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert response.json() == {"message": NO_ACCESS}
+
+    @staticmethod
+    def test_create_api(async_api_client: TestAsyncClient, user_fixture: User) -> None:
+        """Test create API loads the owner email deferred by signed tokens."""
+        data = {"title": "title", "description": "description", "status": "new"}
+        response = async_to_sync(async_api_client.post)(
+            "/todo/task",
+            json=data,
+            headers={
+                "Authorization": f"Bearer {issue_tokens(user_fixture)['access_token']}"
+            },
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["created_by"] == user_fixture.email
+        assert Task.objects.get(pk=response.json()["id"]).title == data["title"]
+
+    @staticmethod
+    def test_bulk_create_api(
+        async_api_client: TestAsyncClient, user_fixture: User
+    ) -> None:
+        """Test bulk create API inserts every task."""
+        data = {
+            "tasks": [
+                {"title": f"task {index}", "description": "", "status": "new"}
+                for index in range(3)
+            ]
+        }
+        response = async_to_sync(async_api_client.post)(
+            "/todo/task/bulk",
+            json=data,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [item["status"] for item in response.json()] == [HTTPStatus.OK] * 3
+        assert Task.objects.filter(created_by=user_fixture).count() == 3  # noqa: PLR2004
+
+    @staticmethod
+    def test_update_api_if_match(
+        async_api_client: TestAsyncClient, user_fixture: User, task_fixture: Task
+    ) -> None:
+        """Test locking writes run the sync route, preconditions included."""
+        data = {"title": "title", "description": "description", "status": "new"}
+        response = async_to_sync(async_api_client.put)(
+            f"/todo/task/{task_fixture.pk}",
+            json=data,
+            headers={"Authorization": f"Bearer {user_fixture.token}"},
+            META={"HTTP_IF_MATCH": '"stale"'},
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+        task_fixture.refresh_from_db()
+        assert task_fixture.title == "Fixture task"
+
+    @staticmethod
+    def test_export_api(
+        rf: RequestFactory, user_fixture: User, task_fixture: Task
+    ) -> None:
+        """Test export streams rows read with an async iterator."""
+        request = rf.get("/todo/task/export")
+        request.user = user_fixture
+
+        async def export() -> bytes:
+            response = await api_v1_async.export_task(request, gzip=True)
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        rows = gzip.decompress(async_to_sync(export)()).splitlines()
+        assert [json.loads(row)["id"] for row in rows] == [task_fixture.pk]
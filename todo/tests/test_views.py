@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from http import HTTPStatus
 
 import pytest
@@ -6,7 +7,9 @@ from django.urls import reverse_lazy
 
 from authentication.models import User
 from authentication.tests.fixtures import USER_PASSWORD
+from common.tests.query_budget import PAGE_SIZES, QueryBudget
 from todo.models import Task
+from todo.views import TaskList
 
 pytestmark = pytest.mark.django_db
 
@@ -76,6 +79,39 @@ class TestTaskListView:
         assert task_fixture.title not in str(response.content)
 
 
+@pytest.mark.usefixtures("locmem_cache")
+class TestTaskTableCache:
+    """Test cached HTMX task tables."""
+
+    @staticmethod
+    def test_task_table(
+        client: Client,
+        user_fixture: User,
+        user_fixture2: User,
+        task_fixture: Task,
+        django_capture_on_commit_callbacks: Callable,
+    ) -> None:
+        """Test task tables are cached per user until a task changes."""
+        url = reverse_lazy("todo:task_list")
+        headers = {"Hx-Request": "true"}
+        client.force_login(user_fixture)
+        client.get(url, {"sort": "-created_at"}, headers=headers)
+        response = client.get(url, {"sort": "-created_at"}, headers=headers)
+        assert response.headers["X-Cache"] == "HIT"
+        assert task_fixture.title in response.content.decode()
+        client.force_login(user_fixture2)
+        response = client.get(url, {"sort": "-created_at"}, headers=headers)
+        assert "X-Cache" not in response.headers
+        assert task_fixture.title not in response.content.decode()
+        client.force_login(user_fixture)
+        task_fixture.title = "renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            task_fixture.save()
+        response = client.get(url, {"sort": "-created_at"}, headers=headers)
+        assert "X-Cache" not in response.headers
+        assert "renamed" in response.content.decode()
+
+
 class TestCreateView:
     """Test create view."""
 
@@ -326,3 +362,27 @@ class TestDeleteView:
         url = reverse_lazy("todo:task_delete", args=[task_fixture.pk])
         response = client.post(url, args=[task_fixture.pk])
         assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestQueryBudget:
+    """Test the task list runs the same queries for pages of any size."""
+
+    @staticmethod
+    def test_task_list_page_sizes(
+        client: Client,
+        user_fixture: User,
+        query_budget: QueryBudget,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test task pages of 1 and 50 tasks."""
+        Task.objects.bulk_create(
+            Task(title=f"Task {index}", created_by=user_fixture)
+            for index in range(PAGE_SIZES[-1])
+        )
+        client.force_login(user_fixture)
+        url = reverse_lazy("todo:task_list")
+        for size in PAGE_SIZES:
+            monkeypatch.setattr(TaskList, "paginate_by", size)
+            response = client.get(url)
+            assert len(response.context["tasks"]) == size
+        assert len(set(query_budget.counts)) == 1
@@ -12,18 +12,22 @@ from django.views.generic import (
     UpdateView,
 )
 
+from main_project.cache import FragmentCacheMixin
 from main_project.settings import PAGINATION_SIZE
 from todo.forms import TaskForm
 from todo.models import Task
 
 
-class TaskList(LoginRequiredMixin, ListView):
+class TaskList(LoginRequiredMixin, FragmentCacheMixin, ListView):
     """Task generic list view."""
 
     model = Task
     context_object_name = "tasks"
     paginate_by = PAGINATION_SIZE
     ordering = "created_at"
+    fragment_dependencies = (Task,)
+    # Users only list their own tasks.
+    fragment_per_user = True
 
     def get_template_names(self: Self) -> str:
         """Get template names.
@@ -0,0 +1,12 @@
+#!/bin/bash
+
+set -o errexit
+set -o nounset
+
+# Async API routes, each process serves many concurrent requests.
+export API_ASYNC=1
+uv run uvicorn main_project.asgi:application \
+    --host 0.0.0.0 \
+    --port "${PORT:-8000}" \
+    --workers "${WEB_CONCURRENCY:-2}" \
+    --lifespan off